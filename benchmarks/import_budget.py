@@ -0,0 +1,120 @@
+#!/usr/bin/python3
+
+# Import-time budget for Typhoon's start-up modules. Each module is imported
+# in a fresh interpreter under `python -X importtime`; the check fails when
+# the cumulative time exceeds the budget, or when a module that should only
+# be loaded on first use (dbus, gi, numpy, ...) is imported eagerly.
+#
+#     python3 benchmarks/import_budget.py
+#     python3 benchmarks/import_budget.py --module typhoon_window --budget-ms 400
+#
+# Times vary with the machine and disk cache, so each module is imported
+# several times and the fastest run is compared with the budget.
+#
+# A module that fails to import (e.g. without PyQt) is reported as skipped
+# and fails the check, unless --allow-skip is given.
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+TYPHOON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "typhoon")
+
+# Module, budget in ms, and modules it must not import.
+BUDGETS = (
+    ("typhoon_main", 60, ("PyQt6", "PyQt5", "dbus", "gi", "numpy")),
+    ("typhoon_cli", 120, ("PyQt6", "PyQt5", "dbus", "gi", "numpy")),
+    (
+        "typhoon_window",
+        600,
+        ("dbus", "gi", "numpy", "cairosvg", "configparser", "subprocess"),
+    ),
+)
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def measure(module):
+    """Return {module: cumulative µs} for one cold import, or None."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=TYPHOON_DIR,
+        env=dict(os.environ, PYTHONDONTWRITEBYTECODE="1"),
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        last_line = (result.stderr.strip().splitlines() or [""])[-1]
+        print(f"{module}: import failed: {last_line}")
+        return None
+    timings = {}
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            timings[match.group(4)] = int(match.group(2))
+    return timings
+
+
+def check(module, budget_ms, forbidden, runs, top):
+    best = None
+    for _ in range(runs):
+        timings = measure(module)
+        if timings is None:
+            return None
+        if best is None or timings.get(module, 0) < best.get(module, 0):
+            best = timings
+
+    total_ms = best.get(module, 0) / 1000
+    ok = total_ms <= budget_ms
+    print(f"{module}: {total_ms:.1f} ms (budget {budget_ms} ms){'' if ok else '  OVER BUDGET'}")
+    eager = sorted(
+        name for name in best if name.split(".")[0] in forbidden or name in forbidden
+    )
+    if eager:
+        ok = False
+        print(f"  imported eagerly: {', '.join(eager)}")
+    # Top-level packages only, so PyQt6 isn't listed once per submodule.
+    packages = {}
+    for name, micros in best.items():
+        if name != module:
+            root = name.split(".")[0]
+            packages[root] = max(packages.get(root, 0), micros)
+    for name, micros in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {micros / 1000:8.1f} ms  {name}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check Typhoon's import-time budget.")
+    parser.add_argument("--module", help="check only this module")
+    parser.add_argument("--budget-ms", type=float, help="override the module's budget")
+    parser.add_argument("--runs", type=int, default=5, help="imports per module (default: 5)")
+    parser.add_argument("--top", type=int, default=8, help="slowest imports to list (default: 8)")
+    parser.add_argument(
+        "--allow-skip",
+        action="store_true",
+        help="don't fail when a module can't be imported here (e.g. PyQt is missing)",
+    )
+    args = parser.parse_args()
+
+    failed = skipped = False
+    for module, budget_ms, forbidden in BUDGETS:
+        if args.module and module != args.module:
+            continue
+        ok = check(module, args.budget_ms or budget_ms, forbidden, args.runs, args.top)
+        if ok is None:
+            skipped = True
+            print(f"{module}: SKIPPED, not measured")
+        elif not ok:
+            failed = True
+    # A module that could not be imported was not checked, so the budget
+    # only passes with --allow-skip.
+    if failed or (skipped and not args.allow_skip):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/python3
+
+# Wallpaper palette benchmark. Writes a synthetic 4K wallpaper as JPEG and
+# PNG, then times the whole extract_palette() path used for chameleonic
+# colours: decoding the file at reduced size, reading its pixels and the
+# median cut. The check fails when the fastest run of a format exceeds the
+# budget.
+#
+#     python3 benchmarks/palette_benchmark.py
+#     python3 benchmarks/palette_benchmark.py --budget-ms 30 --runs 20
+#
+# Needs PyQt and NumPy; without NumPy extract_palette() falls back to the
+# mean colour and there is no palette to measure.
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "typhoon")
+)
+
+WIDTH, HEIGHT = 3840, 2160
+FORMATS = ("jpg", "png")
+
+
+def make_wallpaper(path):
+    """Save a 4K image with gradients and noise, so it compresses like a photo."""
+    import numpy
+    from typhoon_wallpaper import QT_FORMAT_RGB32, QImage
+
+    y, x = numpy.mgrid[0:HEIGHT, 0:WIDTH]
+    noise = numpy.random.default_rng(0).integers(0, 24, size=(HEIGHT, WIDTH), dtype=numpy.uint8)
+    red = (x * 200 // WIDTH + noise).astype(numpy.uint32)
+    green = ((x + y) * 120 // (WIDTH + HEIGHT) + noise).astype(numpy.uint32)
+    blue = (y * 220 // HEIGHT + noise).astype(numpy.uint32)
+    # RGB32 pixels are 0xffRRGGBB words in native byte order.
+    pixels = numpy.ascontiguousarray(0xFF000000 | (red << 16) | (green << 8) | blue)
+    image = QImage(pixels.data, WIDTH, HEIGHT, WIDTH * 4, QT_FORMAT_RGB32)
+    if not image.save(path):
+        raise RuntimeError(f"Could not write {path}")
+
+
+def check(path, budget_ms, runs):
+    from typhoon_wallpaper import extract_palette
+
+    best = None
+    palette = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        palette = extract_palette(path)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+
+    ok = palette is not None and best <= budget_ms
+    name = os.path.splitext(path)[1][1:]
+    print(f"{name}: {best:.1f} ms (budget {budget_ms} ms){'' if ok else '  OVER BUDGET'}")
+    if palette is None:
+        print("  no palette extracted")
+    else:
+        print(f"  background {palette['background']}, palette {' '.join(palette['palette'])}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time wallpaper palette extraction on a 4K image.")
+    parser.add_argument("--budget-ms", type=float, default=50, help="budget per image (default: 50)")
+    parser.add_argument("--runs", type=int, default=10, help="extractions per format (default: 10)")
+    args = parser.parse_args()
+
+    try:
+        import numpy  # noqa: F401
+        import typhoon_wallpaper  # noqa: F401
+    except ImportError as e:
+        print(f"palette benchmark: skipped: {e}")
+        return 2
+
+    try:
+        from PyQt6.QtCore import QCoreApplication
+    except ImportError:
+        from PyQt5.QtCore import QCoreApplication
+
+    # Image format plugins (JPEG, WebP, ...) are loaded through the application.
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])  # noqa: F841
+    failed = False
+    with tempfile.TemporaryDirectory() as directory:
+        for extension in FORMATS:
+            path = os.path.join(directory, f"wallpaper.{extension}")
+            make_wallpaper(path)
+            if not check(path, args.budget_ms, args.runs):
+                failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -25,6 +25,7 @@ Requires:       python3-pyqt6-webengine
 Requires:       libportal
 Requires:       python3-gobject-base
 Recommends:     python3-cairosvg
+Recommends:     python3-numpy
 
 %description
 Typhoon is a free and open source weather application. It is a continuation
@@ -1,15 +1,151 @@
 // Fetch current weather data from Open-Meteo
 // Global refresh interval (ms). Can be overridden via `localStorage.typhoon_refresh_ms`.
 var TYPHOON_REFRESH_MS = parseInt(localStorage.typhoon_refresh_ms || '1200000', 10);
+// Forecast horizon in days (1-16). Can be overridden via `localStorage.typhoon_forecast_days`.
+var TYPHOON_FORECAST_DAYS = Math.max(1, Math.min(16, parseInt(localStorage.typhoon_forecast_days || '7', 10) || 7));
 // Global notifications enabled flag (initialized from localStorage at app start)
 var TYPHOON_NOTIFICATIONS_ENABLED = (localStorage.typhoon_notifications !== 'disabled');
-// Track last manual location navigation to prevent immediate auto-refresh
-var lastManualNavigationTime = 0;
-var NAVIGATION_REFRESH_DELAY = 3000; // Wait 3 seconds after manual navigation before allowing auto-refresh
 // Debounce mechanism for navigation/delete button refresh
 var navigationRefreshTimeout = null;
 const NAVIGATION_REFRESH_DEBOUNCE_MS = 2000; // 2 seconds after navigation/delete to trigger refresh
 var displayedHourlyForecast = null;
+// Requests go through the host's fetch engine, which keeps pooled keep-alive
+// connections to Open-Meteo and Nominatim (see typhoon_fetch.py).
+const TYPHOON_API = 'typhoon-api://weather';
+
+// Page <-> host bridge over QWebChannel. State changes made while handling
+// one event are coalesced into a single updateState() call, and values the
+// host already has are not sent again.
+var typhoonHost = null;
+var pendingHostState = {};
+var sentHostState = {};
+var hostStateFlushTimer = null;
+var pendingHostCalls = [];
+
+function setHostState(key, value) {
+    if (sentHostState[key] === value && !(key in pendingHostState)) {
+        return;
+    }
+    pendingHostState[key] = value;
+    if (hostStateFlushTimer === null) {
+        hostStateFlushTimer = setTimeout(flushHostState, 0);
+    }
+}
+
+function flushHostState() {
+    hostStateFlushTimer = null;
+    if (!typhoonHost) return; // Flushed once the channel connects.
+    const changes = {};
+    Object.keys(pendingHostState).forEach(function(key) {
+        if (sentHostState[key] !== pendingHostState[key]) {
+            changes[key] = pendingHostState[key];
+            sentHostState[key] = pendingHostState[key];
+        }
+    });
+    pendingHostState = {};
+    if (Object.keys(changes).length > 0) {
+        typhoonHost.updateState(changes);
+    }
+}
+
+function callHost(method) {
+    const args = Array.prototype.slice.call(arguments, 1);
+    if (!typhoonHost) {
+        pendingHostCalls.push([method, args]);
+        return;
+    }
+    flushHostState();
+    typhoonHost[method].apply(typhoonHost, args);
+}
+
+function applyHostState(state) {
+    if (!state) return;
+    if (state.accentColor) receiveMessage(state.accentColor);
+    if (state.windowAlpha !== undefined) setWindowAlpha(state.windowAlpha);
+    if (state.trayEnabled !== undefined) setSystemTrayEnabled(state.trayEnabled);
+    if (state.traceEnabled !== undefined) traceEnabled = !!state.traceEnabled;
+    if (state.online !== undefined) hostOnline = !!state.online;
+    if (state.widgetLocation !== undefined) setWidgetLocation(state.widgetLocation);
+    if (state.weatherOverdueAfterMs !== undefined) {
+        dataStaleAfterMs = state.weatherOverdueAfterMs;
+        updateDataAge();
+    }
+    if (state.weatherRevision !== undefined) showRefreshedWeather();
+}
+
+// Periodic refreshes are scheduled and fetched by the host (see
+// typhoon_scheduler.py); it bumps weatherRevision once the cache is updated.
+// While the host reports no connectivity the page shows cached data only and
+// leaves the refresh to the host once the network is back.
+var hostOnline = true;
+
+function showRefreshedWeather() {
+    if (currentLocations.length === 0) return;
+    displayCachedLocationOnly(currentLocations[currentLocationIndex]);
+}
+
+// Preferences the host needs to keep the tray icon, launcher count and
+// alerts current while no page is loaded (low-memory tray mode).
+function syncHostPreferences() {
+    setHostState('locations', currentLocations.slice());
+    setHostState('location', currentLocations[currentLocationIndex] || '');
+    setHostState('temperatureUnit', getTemperatureUnit());
+    setHostState('notificationsEnabled', TYPHOON_NOTIFICATIONS_ENABLED);
+    setHostState('notifyThreshold', parseInt(localStorage.typhoon_notify_threshold || '35', 10));
+    setHostState('refreshMs', TYPHOON_REFRESH_MS);
+    setHostState('forecastDays', TYPHOON_FORECAST_DAYS);
+}
+
+// Timing spans are recorded with performance.measure() and forwarded to the
+// host when it runs with --trace, which merges them into its trace file.
+var traceEnabled = false;
+performance.mark('page: script.js evaluated');
+
+function traceSpan(name, start) {
+    try {
+        performance.measure(name, { start: start, end: performance.now() });
+    } catch (e) {
+        // User Timing Level 3 unavailable; skip the span.
+    }
+}
+
+function flushTrace() {
+    if (!typhoonHost) return; // Keep entries until the host says whether to send them.
+    const entries = performance.getEntriesByType('mark')
+        .concat(performance.getEntriesByType('measure'))
+        .map(function (entry) {
+            return {
+                name: entry.name,
+                entryType: entry.entryType,
+                startTime: entry.startTime,
+                duration: entry.duration
+            };
+        });
+    performance.clearMarks();
+    performance.clearMeasures();
+    if (traceEnabled && entries.length > 0) {
+        typhoonHost.trace(performance.timeOrigin, entries);
+    }
+}
+
+function connectHostBridge() {
+    const connectStart = performance.now();
+    if (typeof QWebChannel === 'undefined' || !window.qt || !qt.webChannelTransport) {
+        console.error("Host bridge unavailable");
+        return;
+    }
+    new QWebChannel(qt.webChannelTransport, function(channel) {
+        typhoonHost = channel.objects.typhoonHost;
+        typhoonHost.stateChanged.connect(applyHostState);
+        applyHostState(typhoonHost.state);
+        flushHostState();
+        pendingHostCalls.splice(0).forEach(function(call) {
+            typhoonHost[call[0]].apply(typhoonHost, call[1]);
+        });
+        traceSpan('page: bridge connect', connectStart);
+        flushTrace();
+    });
+}
 var hourlyForecastView = localStorage.typhoon_hourly_view === 'list' ? 'list' : 'chart';
 function initOpaqueTooltips() {
     if ($('#typhoonTooltip').length === 0) {
@@ -44,238 +180,81 @@ function initOpaqueTooltips() {
     });
 }
 
+// The host resolves locations through a permanent registry, so a saved
+// location is only ever geocoded against Nominatim once.
 function getLocationData(cityName, callback) {
-    geocodeWithNominatim(cityName, callback);
-}
-
-function geocodeWithNominatim(cityName, callback) {
-    // JSONP avoids file:// CORS issues and requires no API key.
     $.ajax({
-        url: 'https://nominatim.openstreetmap.org/search',
-        dataType: 'jsonp',
-        jsonp: 'json_callback',
+        url: `${TYPHOON_API}/geocode`,
+        dataType: 'json',
         timeout: 10000,
-        data: {
-            q: cityName,
-            format: 'jsonv2',
-            limit: 1
-        }
-    }).done(function (geoData) {
-        if (geoData && geoData.length > 0) {
-            const data = geoData[0];
-            if (!data.name && data.display_name) {
-                data.name = data.display_name.split(',')[0].trim();
-            }
-            console.log("Nominatim geocoding succeeded:", data);
-            callback(data);
+        data: { q: cityName }
+    }).done(function (locationData) {
+        if (locationData) {
+            callback(locationData);
         } else {
-            console.error("Nominatim geocoding failed:", geoData);
+            console.error("Geocoding found no match for:", cityName);
             $("#locationLoader").attr("class", "loader").html("&#10005;");
             showError('Location not found. Please try again.');
             callback(null);
         }
     }).fail(function (jqXHR, textStatus, errorThrown) {
-        console.error("Nominatim geocoding request failed:", textStatus, errorThrown);
-        console.error("Response Text:", jqXHR && jqXHR.responseText);
+        console.error("Geocoding request failed:", textStatus, errorThrown);
         $("#locationLoader").attr("class", "loader").html("&#10005;");
         showError('Network error. Please try again.');
         callback(null);
     });
 }
 
-function getWeatherDataForLocation(locationData, callback) {
-    if (!locationData || locationData.lat === undefined || locationData.lon === undefined) {
-        callback(null, null);
-        return;
-    }
-    const latitude = locationData.lat;
-    const longitude = locationData.lon;
-    const weatherUrl = `https://api.open-meteo.com/v1/forecast?latitude=${latitude}&longitude=${longitude}&current_weather=true&temperature_unit=fahrenheit&wind_speed_unit=mph&timezone=auto&hourly=temperature_2m,relative_humidity_2m,apparent_temperature,precipitation_probability,wind_direction_10m`;
-
-    $.get(weatherUrl, function (weatherData) {
-        console.log("API Response (Current Weather):", weatherData); // Log the API response for debugging
-
-        if (weatherData && weatherData.current_weather && weatherData.hourly) {
-            console.log("Total Rain Probability Data:", weatherData.hourly.precipitation_probability); // Log rain probability data
-            const currentWeather = weatherData.current_weather;
-            const currentHour = String(currentWeather.time || '').slice(0, 13) + ":00";
-            let timeIndex = weatherData.hourly.time.findIndex(hour => hour === currentHour);
-            if (timeIndex === -1) {
-                timeIndex = weatherData.hourly.time.findIndex(hour => hour >= currentHour);
-            }
-
-            console.log("Time Index:", timeIndex);
-
-            if (timeIndex !== -1) {
-                const previousHours = timeIndex === 0
-                    ? [weatherData.hourly.precipitation_probability[timeIndex]]
-                    : weatherData.hourly.precipitation_probability.slice(Math.max(0, timeIndex - 1), timeIndex);
-                const currentHourRain = [weatherData.hourly.precipitation_probability[timeIndex]];
-                const nextHours = weatherData.hourly.precipitation_probability.slice(timeIndex + 1, timeIndex + 6);
-                const combinedHours = [...previousHours, ...currentHourRain, ...nextHours];
-                const rainPercentage = combinedHours.length > 0 ? Math.max(...combinedHours) : 0;
-
-                console.log("Current Rain Probability Data:", combinedHours);
-
-                currentWeather.rain_percentage = rainPercentage;
-                currentWeather.relative_humidity_2m = weatherData.hourly.relative_humidity_2m[timeIndex];
-                currentWeather.feels_like = weatherData.hourly.apparent_temperature[timeIndex];
-                currentWeather.wind_direction_10m = weatherData.hourly.wind_direction_10m[timeIndex];
-                currentWeather.hourly_forecast = {
-                    time: weatherData.hourly.time.slice(timeIndex, timeIndex + 24),
-                    rain: weatherData.hourly.precipitation_probability.slice(timeIndex, timeIndex + 24),
-                    temperature: weatherData.hourly.temperature_2m.slice(timeIndex, timeIndex + 24)
-                };
+// Refresh several saved locations with a single forecast request. The host
+// resolves their coordinates, uses Open-Meteo's comma-separated
+// multi-location form and stores one cache entry per location. With
+// staleOnly, locations whose cached entry is still fresh are skipped.
+function fetchAndCacheWeather(cityNames, callback, staleOnly) {
+    const requestStart = performance.now();
+    $.ajax({
+        url: `${TYPHOON_API}/weather`,
+        dataType: 'json',
+        traditional: true,
+        data: { location: cityNames, stale_only: staleOnly ? 1 : 0, days: TYPHOON_FORECAST_DAYS }
+    }).done(function (data) {
+        traceSpan('api: weather', requestStart);
+        const results = {};
+        if (!data || !Array.isArray(data.locations)) {
+            console.error("Unexpected API response:", data);
+            callback(results);
+            return;
+        }
 
-                console.log("Current Humidity:", currentWeather.relative_humidity_2m);
-                console.log("Feels Like Temperature:", currentWeather.feels_like);
-                console.log("Wind Direction:", currentWeather.wind_direction_10m);
+        $('#errorMessage').fadeOut(350); // Hide the error message if the request succeeds
+        data.locations.forEach(function (item) {
+            if (item.entry) {
+                results[item.query] = item.entry;
             } else {
-                console.error("No matching time found in hourly data.");
+                console.error("No weather data for:", item.query);
             }
-
-            console.log("Full Address:", locationData.display_name);
-            console.log("is_day:", currentWeather.is_day);
-            console.log("weathercode:", currentWeather.weathercode);
-
-            $('#errorMessage').fadeOut(350); // Hide the error message if the request succeeds
-            callback(currentWeather, locationData);
-        } else {
-            console.error("Unexpected API response:", weatherData);
-            $("#locationLoader").attr("class", "loader").html("&#10005;");
-            callback(null, locationData);
-        }
+        });
+        callback(results);
     }).fail(function (jqXHR, textStatus, errorThrown) {
         console.error("API request failed:", textStatus, errorThrown);
         console.error("Response Text:", jqXHR.responseText); // Log the response text for debugging
-        showError('Network error. Please try again.');
-        callback(null, locationData);
+        // Callers decide whether to show an error; stale data may be on screen.
+        callback({});
     });
 }
 
-function getWeatherData(cityName, callback) {
-    getLocationData(cityName, function(locationData) {
-        if (!locationData) {
-            callback(null, null);
-            return;
-        }
-        getWeatherDataForLocation(locationData, callback);
-    });
-}
-
-// Fetch weekly forecast data from Open-Meteo
-function getWeeklyForecast(locationData, callback) {
-    if (!locationData || locationData.lat === undefined || locationData.lon === undefined) {
-        showError('City not found. Please enter a valid city name.');
-        callback(null);
-        return;
-    }
-    const latitude = locationData.lat;
-    const longitude = locationData.lon;
-    const forecastUrl = `https://api.open-meteo.com/v1/forecast?latitude=${latitude}&longitude=${longitude}&daily=temperature_2m_min,temperature_2m_max,weathercode&temperature_unit=fahrenheit&timezone=auto`;
-
-    $.get(forecastUrl, function (forecastData) {
-        console.log("API Response (Weekly Forecast):", forecastData); // Log the API response for debugging
-        if (forecastData && forecastData.daily) {
-            const dailyForecasts = processForecastData(forecastData.daily);
-            callback(dailyForecasts);
-        } else {
-            console.error("Unexpected API response:", forecastData);
-            showError('Invalid data received from the weather API.');
-            callback(null);
-        }
-    }).fail(function (jqXHR, textStatus, errorThrown) {
-        console.error("API request failed:", textStatus, errorThrown);
-        console.error("Response Text:", jqXHR.responseText); // Log the response text for debugging
-        showError('Network error. Please try again.');
+// Read the cached entry for one location from the host's weather store.
+function loadCachedWeather(cityName, callback) {
+    $.ajax({
+        url: `${TYPHOON_API}/cache`,
+        dataType: 'json',
+        data: { location: cityName }
+    }).done(function (cached) {
+        callback(cached && cached.entry ? cached : null);
+    }).fail(function () {
         callback(null);
     });
 }
 
-function getCacheConfig() {
-    const maxEntries = parseInt(localStorage.typhoon_cache_max_entries || '8', 10);
-    const ttlMs = parseInt(localStorage.typhoon_cache_ttl_ms || '21600000', 10); // 6h
-    return {
-        maxEntries: Number.isFinite(maxEntries) && maxEntries > 0 ? maxEntries : 8,
-        ttlMs: Number.isFinite(ttlMs) && ttlMs > 0 ? ttlMs : 21600000,
-    };
-}
-
-function compactLocationData(locationData) {
-    return {
-        name: locationData.name,
-        display_name: locationData.display_name,
-        lat: locationData.lat,
-        lon: locationData.lon,
-    };
-}
-
-function pruneWeatherCache() {
-    const config = getCacheConfig();
-    const now = Date.now();
-    const validEntries = [];
-
-    Object.keys(weatherCache).forEach(function(city) {
-        const entry = weatherCache[city];
-        if (!entry || typeof entry !== 'object') return;
-        if (!entry.timestamp || (now - entry.timestamp) > config.ttlMs) return;
-        if (!entry.currentWeather || !entry.locationData || !entry.weeklyData) return;
-        validEntries.push({ city: city, timestamp: entry.timestamp, entry: entry });
-    });
-
-    validEntries.sort(function(a, b) { return b.timestamp - a.timestamp; });
-    const trimmed = validEntries.slice(0, config.maxEntries);
-    const nextCache = {};
-    trimmed.forEach(function(item) {
-        nextCache[item.city] = item.entry;
-    });
-    weatherCache = nextCache;
-}
-
-// Process forecast data from Open-Meteo
-function processForecastData(dailyData) {
-    const { time, temperature_2m_min, temperature_2m_max, weathercode } = dailyData;
-
-    const slicedTime = time.slice(0, 4); // Get the first four days of data
-
-    // Include the first four days (indices 0 to 3)
-    return slicedTime.map((date, index) => ({
-        day: new Date(date + 'T00:00:00Z').toLocaleDateString('en-US', { weekday: 'short', timeZone: 'UTC' }),
-        tempMin: temperature_2m_min[index],
-        tempMax: temperature_2m_max[index],
-        icon: weathercode[index],
-    }));
-}
-
-function fetchAndCacheWeather(cityName, callback) {
-    getWeatherData(cityName, function (currentWeather, locationData) {
-        if (!currentWeather || !locationData) {
-            callback(null);
-            return;
-        }
-
-        getWeeklyForecast(locationData, function (weeklyData) {
-            if (!weeklyData) {
-                callback(null);
-                return;
-            }
-
-            weatherCache[cityName] = {
-                currentWeather: currentWeather,
-                locationData: compactLocationData(locationData),
-                weeklyData: weeklyData,
-                timestamp: Date.now()
-            };
-            saveWeatherCache();
-            callback({
-                currentWeather: currentWeather,
-                locationData: locationData,
-                weeklyData: weeklyData,
-            });
-        });
-    });
-}
-
 function getTemperatureUnit() {
     return localStorage.typhoon_measurement || "f";
 }
@@ -324,126 +303,229 @@ function formatLocationLabel(locationData) {
 
 // Update the render function to use Open-Meteo data
 function render(cityName) {
+    const renderStart = performance.now();
     $('.border .sync').addClass('busy');
     $(".border .settings").show();
-    pruneWeatherCache();
 
     // Check if we have cached data for instant display
-    if (weatherCache[cityName]) {
-        const cached = weatherCache[cityName];
-        // Keep spinner running while fresh data is fetched in background.
-        displayCachedWeather(cached.currentWeather, cached.locationData, cached.weeklyData, true);
+    let freshDisplayed = false;
+    let cachedDisplayed = false;
+    loadCachedWeather(cityName, function (cached) {
+        if (cached && !freshDisplayed) {
+            const entry = cached.entry;
+            cachedDisplayed = true;
+            // Keep spinner running while fresh data is fetched in background.
+            displayCachedWeather(entry.currentWeather, entry.locationData, entry.weeklyData, true, cached.timestamp);
+            traceSpan('render: cached paint', renderStart);
+        }
+    });
+
+    if (!hostOnline) {
+        $('.border .sync').removeClass('busy');
+        return;
     }
 
-    // Fetch fresh data in background
-    fetchAndCacheWeather(cityName, function (result) {
+    // Fetch fresh data in background. Every saved location is refreshed by
+    // the same request so switching locations stays instant.
+    const cityNames = [cityName].concat(currentLocations.filter(function (city) {
+        return city && city !== cityName && !cacheWarmInFlight[city];
+    }));
+    cacheLocationsWeather(cityNames, function (results) {
+        const result = results[cityName];
         if (!result) {
             console.error("Failed to fetch weather data.");
-            showError('Failed to fetch weather data. Please try again.');
+            // Keep showing saved weather, with its age, if there is any.
+            if (!cachedDisplayed) {
+                showError('Failed to fetch weather data. Please try again.');
+            }
             $('.border .sync').removeClass('busy');
             return;
         }
         // Display the fresh weather data
+        freshDisplayed = true;
         displayCachedWeather(result.currentWeather, result.locationData, result.weeklyData);
+        // Restarts the host's refresh timer, as the data is now fresh.
+        callHost('weatherFetched');
+        traceSpan('render: refresh cycle', renderStart);
+        flushTrace();
     });
 }
 
-// Function to display weather data (from cache or fresh)
-function displayCachedWeather(currentWeather, locationData, weeklyData, preserveBusy) {
-    // Update the city div with a hyperlink
-    const mapUrl = `https://www.openstreetmap.org/?mlat=${locationData.lat}&mlon=${locationData.lon}#map=10/${locationData.lat}/${locationData.lon}`;
-    const locationLink = $('<a>').attr('href', mapUrl).text(formatLocationLabel(locationData));
-    $('#city span').empty().append(locationLink);
+// Weather older than this is shown with an "Updated X ago" badge. The host
+// replaces it with the scheduler's current interval plus its slack, which
+// can reach well over an hour in calm weather on battery, so the badge only
+// appears once a refresh is actually overdue (typhoon_scheduler.py).
+var dataStaleAfterMs = 60 * 60 * 1000;
+var displayedWeatherTimestamp = null;
+var dataAgeTimer = null;
+
+function formatDataAge(ageMs) {
+    const minutes = Math.floor(ageMs / 60000);
+    if (minutes < 60) return `${minutes} min`;
+    const hours = Math.floor(minutes / 60);
+    if (hours < 48) return `${hours} h`;
+    return `${Math.floor(hours / 24)} days`;
+}
+
+function updateDataAge() {
+    const age = displayedWeatherTimestamp === null ? 0 : Date.now() - displayedWeatherTimestamp;
+    if (age < dataStaleAfterMs) {
+        $('#dataAge').hide();
+        if (dataAgeTimer !== null) {
+            clearInterval(dataAgeTimer);
+            dataAgeTimer = null;
+        }
+        return;
+    }
+    $('#dataAge').text(`Updated ${formatDataAge(age)} ago`).show();
+    if (dataAgeTimer === null) {
+        dataAgeTimer = setInterval(updateDataAge, 60 * 1000);
+    }
+}
+
+// The main view is patched, not rebuilt: displayCachedWeather() derives a
+// flat view model and only the nodes whose value changed are written, so
+// refreshes and location flips cause as little style and layout work as
+// possible. The markup itself is static in typhoon.html.
+var renderedWeatherView = {};
+var cachedWeatherViewPatchers = null;
+var renderedWeeklyView = {};
+var cachedWeeklyViewPatchers = null;
+
+function textPatcher(element) {
+    return function (value) { element.textContent = value; };
+}
+
+function weatherViewPatchers() {
+    if (cachedWeatherViewPatchers !== null) return cachedWeatherViewPatchers;
+    const cityLink = document.querySelector('#city span a');
+    const code = document.getElementById('code');
+    const windArrow = document.querySelector('#windDirection .wind-arrow');
+    const umbrella = document.getElementById('umbrellaIcon');
+    cachedWeatherViewPatchers = {
+        cityLabel: textPatcher(cityLink),
+        mapUrl: function (value) { cityLink.setAttribute('href', value); },
+        forecastLocation: textPatcher(document.getElementById('rainForecastLocation')),
+        codeIcon: textPatcher(code),
+        codeClass: function (value) { code.className = value; },
+        thermometer: textPatcher(document.getElementById('thermometer')),
+        temperature: textPatcher(document.getElementById('temperature')),
+        windSpeed: textPatcher(document.getElementById('windSpeed')),
+        windUnit: textPatcher(document.getElementById('windUnit')),
+        windDirection: function (value) {
+            windArrow.style.transform = `translate(-50%,-50%) rotate(${value}deg)`;
+        },
+        humidity: textPatcher(document.getElementById('humidityValue')),
+        feelsLike: textPatcher(document.getElementById('feelsLike')),
+        rainPercentage: textPatcher(document.getElementById('rainValue')),
+        rainShake: function (value) { umbrella.classList.toggle('shake-umbrella', value); }
+    };
+    return cachedWeatherViewPatchers;
+}
+
+function weeklyViewPatchers() {
+    if (cachedWeeklyViewPatchers !== null) return cachedWeeklyViewPatchers;
+    cachedWeeklyViewPatchers = {};
+    $('.week > div').each(function (index) {
+        const temp = this.querySelector('.temp');
+        const code = this.querySelector('.code');
+        cachedWeeklyViewPatchers['day' + index] = textPatcher(this.querySelector('.day'));
+        if (!temp || !code) return;
+        cachedWeeklyViewPatchers['icon' + index] = textPatcher(code);
+        cachedWeeklyViewPatchers['iconClass' + index] = function (value) { code.className = value; };
+        cachedWeeklyViewPatchers['temp' + index] = textPatcher(temp);
+        cachedWeeklyViewPatchers['tempSize' + index] = function (value) { temp.style.fontSize = value; };
+    });
+    return cachedWeeklyViewPatchers;
+}
+
+// Writes the entries of `model` that differ from what was last rendered.
+function patchView(patchers, rendered, model) {
+    for (const key in model) {
+        if (rendered[key] !== model[key] && patchers[key]) {
+            patchers[key](model[key]);
+            rendered[key] = model[key];
+        }
+    }
+}
+
+function thermometerIcon(temperature) {
+    if (temperature < 32) return "_";
+    if (temperature < 55) return "+";
+    if (temperature < 85) return "Q";
+    if (temperature < 100) return "W";
+    return "E";
+}
+
+function buildWeatherViewModel(currentWeather, locationData, tempUnit, speedUnit) {
+    const label = formatLocationLabel(locationData);
+    const iconChar = weather_code(currentWeather.weathercode, currentWeather.is_day);
+    return {
+        cityLabel: label,
+        mapUrl: `https://www.openstreetmap.org/?mlat=${locationData.lat}&mlon=${locationData.lon}#map=10/${locationData.lat}/${locationData.lon}`,
+        forecastLocation: label,
+        codeIcon: iconChar,
+        codeClass: "w" + currentWeather.weathercode + (iconChar === "/" ? " moon-large" : ""),
+        thermometer: thermometerIcon(currentWeather.temperature),
+        temperature: formatTemperatureValue(currentWeather.temperature, tempUnit, true),
+        windSpeed: String(convertWindSpeedFromMph(currentWeather.windspeed, speedUnit)),
+        windUnit: speedUnit === "ms" ? "m/s" : (speedUnit === "kph" ? "km/h" : speedUnit),
+        windDirection: currentWeather.wind_direction_10m || 0,
+        humidity: `${currentWeather.relative_humidity_2m} %`,
+        feelsLike: `Feels Like: ${formatTemperatureValue(currentWeather.feels_like, tempUnit, false)}`,
+        rainPercentage: `${currentWeather.rain_percentage}%`,
+        rainShake: currentWeather.rain_percentage > 35
+    };
+}
+
+function buildWeeklyViewModel(weeklyData, unit) {
+    const model = {};
+    // The week row has four columns; longer horizons only feed the chart.
+    weeklyData.slice(0, 4).forEach(function (day, index) {
+        const temperatureRange = formatForecastRange(day.tempMin, day.tempMax, unit);
+        model['day' + index] = day.day;
+        model['icon' + index] = weather_code(day.icon, 1);
+        model['iconClass' + index] = `code w${day.icon}`;
+        model['temp' + index] = temperatureRange;
+        model['tempSize' + index] = unit === "k" || temperatureRange.length > 11 ? "0.85em" : "1em";
+    });
+    return model;
+}
+
+// Function to display weather data (from cache or fresh). `timestamp` is
+// when the data was fetched; omitted for data fetched just now.
+function displayCachedWeather(currentWeather, locationData, weeklyData, preserveBusy, timestamp) {
+    const displayStart = performance.now();
+    displayedWeatherTimestamp = timestamp || Date.now();
+    updateDataAge();
+    const tempUnit = getTemperatureUnit();
+    const displayedTemp = Math.round(convertTemperatureFromFahrenheit(currentWeather.temperature, tempUnit));
+    const trayTemp = displayedTemp + (tempUnit === "k" ? "K" : "°" + tempUnit.toUpperCase());
     displayedHourlyForecast = currentWeather.hourly_forecast
-        && Array.isArray(currentWeather.hourly_forecast.time)
+        && (typeof currentWeather.hourly_forecast.start === 'string' || Array.isArray(currentWeather.hourly_forecast.time))
         && Array.isArray(currentWeather.hourly_forecast.rain)
         && Array.isArray(currentWeather.hourly_forecast.temperature)
         ? currentWeather.hourly_forecast
         : null;
-    $('#rainForecastLocation').text(formatLocationLabel(locationData));
-    const iconChar = weather_code(currentWeather.weathercode, currentWeather.is_day);
-    const codeClass = "w" + currentWeather.weathercode;
-    $("#code").text(iconChar).attr("class", codeClass + (iconChar === "/" ? " moon-large" : ""));
-    const tempUnit = getTemperatureUnit();
-    const displayedTemp = Math.round(convertTemperatureFromFahrenheit(currentWeather.temperature, tempUnit));
-    const trayTemp = displayedTemp + (tempUnit === "k" ? "K" : "°" + tempUnit.toUpperCase());
+    patchView(weatherViewPatchers(), renderedWeatherView,
+        buildWeatherViewModel(currentWeather, locationData, tempUnit, localStorage.typhoon_speed || "mph"));
 
-    if (currentWeather.temperature < 32) {
-            $("#thermometer").text("_");
-        } else if (currentWeather.temperature < 55) {
-            $("#thermometer").text("+");
-        } else if (currentWeather.temperature < 85) {
-            $("#thermometer").text("Q");
-        } else if (currentWeather.temperature < 100) {
-            $("#thermometer").text("W");
-        } else {
-            $("#thermometer").text("E");
-        }
-
-        $("#temperature").text(formatTemperatureValue(currentWeather.temperature, tempUnit, true));
-        
-        // Only set temperature as title if launcher count is enabled
+        // Only send the launcher count if it is enabled
         if (localStorage.typhoon_launcher === "checked") {
-            setTimeout(function() {
-                document.title = displayedTemp;
-            }, 25); // Delay to allow "enable_launcher" title to be registered first
+            setHostState('launcherCount', displayedTemp);
         }
         if (localStorage.typhoon_tray === "checked") {
-            document.title = "tray_temperature=" + trayTemp;
+            setHostState('trayTemperature', trayTemp);
         }
 
-        const speedUnit = localStorage.typhoon_speed || "mph";
-        const windSpeed = convertWindSpeedFromMph(currentWeather.windspeed, speedUnit);
-        $("#windSpeed").text(windSpeed);
-        $("#windUnit").text(speedUnit === "ms" ? "m/s" : (speedUnit === "kph" ? "km/h" : speedUnit));
-        
-        // Display wind direction
-        const windDirection = currentWeather.wind_direction_10m || 0;
-        // Render a small compass: N above, W left, E right, the circular arrow, and S below.
-        // The arrow is centered using translate so rotation doesn't displace it.
-        $("#windDirection").html(`
-            <span class="wind-compass">
-                <span class="compass-label north">N</span>
-                <span class="compass-label west">W</span>
-                <span class="wind-arrow" style="transform: translate(-50%,-50%) rotate(${windDirection}deg);">↓</span>
-                <span class="compass-label east">E</span>
-                <span class="compass-label south">S</span>
-            </span>
-        `);
-        
-        $("#humidity").html(
-            `<div title="Humidity" style="display: inline-block; position: relative; padding: 0px;">
-            <img id="humidityIcon" src="humidity.svg" height="18" style="vertical-align: middle; filter: none; box-shadow: none;"> 
-            ${currentWeather.relative_humidity_2m} %
-            </div>`
-        );
-
-        // Update "Feels Like" and "Rain Propability"
-        const feelsLike = formatTemperatureValue(currentWeather.feels_like, tempUnit, false);
-
-        $("#feelsLike").text(`Feels Like: ${feelsLike}`);
-        const shouldShake = currentWeather.rain_percentage > 35;
-        $("#rainPercentage").html(
-            `<span id="umbrellaIcon" style="font-family: 'ClimaconsRegular'; font-size: 1.2em; vertical-align: top;${shouldShake ? '' : ''}"${shouldShake ? ' class="shake-umbrella"' : ''}>{</span>${currentWeather.rain_percentage}%`
-        );
-        // Send a system notification via the host app when heavy precipitation or extreme weather is detected.
-        // Show once immediately on app run (first session render), then respect throttle using localStorage.typhoon_last_notify_time.
+        // Propose a system notification to the host when heavy precipitation or extreme weather is detected.
+        // The host alone decides whether to show it: it shows the first alert of a run at once and
+        // throttles the rest to the refresh interval, with one timestamp shared with its own refreshes.
         (function() {
             try {
                 // Respect notifications toggle (use in-memory flag set on app start)
-                if (!TYPHOON_NOTIFICATIONS_ENABLED) return;
+                if (!TYPHOON_NOTIFICATIONS_ENABLED || !pageSendsAlerts) return;
                 const notifyThreshold = parseInt(localStorage.typhoon_notify_threshold || '35', 10); // percent
-                const now = Date.now();
-                const throttleMs = TYPHOON_REFRESH_MS; // throttle notifications to the app refresh interval
-                const lastNotify = parseInt(localStorage.typhoon_last_notify_time || '0', 10);
-                const sessionNotified = sessionStorage.typhoon_notified === '1';
-
-                function sendNotification(msg) {
-                    // update last notify time (persist across runs) and mark session as notified
-                    localStorage.typhoon_last_notify_time = String(now);
-                    sessionStorage.typhoon_notified = '1';
-                    document.title = 'notify:' + msg;
-                }
 
                 // Determine if weathercode indicates snow/thunderstorm/extreme
                 const code = parseInt(currentWeather.weathercode, 10);
@@ -463,15 +545,7 @@ function displayCachedWeather(currentWeather, locationData, weeklyData, preserve
                 };
 
                 const message = buildMessage();
-                if (!message) return;
-
-                if (!sessionNotified) {
-                    // First run in this session: show notification immediately
-                    sendNotification(message);
-                } else if (now - lastNotify > throttleMs) {
-                    // Subsequent runs: respect throttle
-                    sendNotification(message);
-                }
+                if (message) callHost('notify', message);
             } catch (e) {
                 console.error('Notification error:', e);
             }
@@ -485,6 +559,7 @@ function displayCachedWeather(currentWeather, locationData, weeklyData, preserve
 
     // Show Icon
     $('.border .sync, .border .settings, .border .hourly-forecast, #locationNav .nav-remove, #locationNav .nav-arrow').css("opacity", "0.8");
+    $('#errorMessage').fadeOut(350);
     $('#actualWeather').fadeIn(500);
     $("#humidityIcon").css("opacity", "1");
     $("#locationModal").fadeOut(500);
@@ -496,136 +571,430 @@ function displayCachedWeather(currentWeather, locationData, weeklyData, preserve
     if (weeklyData) {
         renderWeeklyForecast(weeklyData);
     }
+
+    traceSpan('page: displayCachedWeather', displayStart);
+    // Lets the host fade out its startup snapshot and capture a new one.
+    callHost('rendered');
 }
 
 function renderWeeklyForecast(weeklyData) {
-    const unit = getTemperatureUnit();
-    // Render the weekly forecast in the "week" div
-    weeklyData.forEach((day, index) => {
-        const tempElement = $(`#${index} .temp`);
-        const temperatureRange = formatForecastRange(day.tempMin, day.tempMax, unit);
-        tempElement.css("font-size", unit === "k" || temperatureRange.length > 11 ? "0.85em" : "1em");
-
-        // Update the DOM with the converted temperatures and Climacons icon
-        $(`#${index} .day`).text(day.day);
-        $(`#${index} .code`)
-            .text(weather_code(day.icon, 1))
-            .attr("class", `code w${day.icon}`);
-        tempElement.text(temperatureRange);
-    });
+    patchView(weeklyViewPatchers(), renderedWeeklyView,
+        buildWeeklyViewModel(weeklyData, getTemperatureUnit()));
 }
 
-function formatHourlyForecastTime(time, index) {
+// Intl formatters are costly to create, so they are made once and the
+// labels they produce are cached per timestamp.
+var hourlyTimeFormat = null;
+var hourlyWeekdayFormat = null;
+var hourlyTimeLabels = new Map();
+
+function hourlyTimeLabel(time) {
+    let label = hourlyTimeLabels.get(time);
+    if (label !== undefined) return label;
+    if (hourlyTimeFormat === null) {
+        hourlyTimeFormat = new Intl.DateTimeFormat([], { hour: 'numeric', minute: '2-digit', timeZone: 'UTC' });
+        hourlyWeekdayFormat = new Intl.DateTimeFormat([], { weekday: 'short', timeZone: 'UTC' });
+    }
     // Open-Meteo returns wall-clock time in the requested location's timezone.
     // Treat it as UTC while formatting so the host machine does not shift it again.
     const date = new Date(`${time}Z`);
-    if (Number.isNaN(date.getTime())) return time;
-    const label = date.toLocaleTimeString([], { hour: 'numeric', minute: '2-digit', timeZone: 'UTC' });
-    if (index === 0) return `Now · ${label}`;
-    if (date.getUTCHours() === 0) {
-        return `${date.toLocaleDateString([], { weekday: 'short', timeZone: 'UTC' })} · ${label}`;
+    if (Number.isNaN(date.getTime())) {
+        label = { time: time, day: null, weekday: null, valid: false };
+    } else {
+        const day = hourlyWeekdayFormat.format(date);
+        label = {
+            time: hourlyTimeFormat.format(date),
+            day: day,
+            weekday: date.getUTCHours() === 0 ? day : null,
+            valid: true
+        };
     }
+    if (hourlyTimeLabels.size > 2048) hourlyTimeLabels.clear();
+    hourlyTimeLabels.set(time, label);
     return label;
 }
 
-function renderRainChart() {
-    const chart = $('#rainForecastChart').empty();
-    chart.removeClass('list-view');
-    const unit = getTemperatureUnit();
+// Cached forecasts store the first hour and one value per hour; older
+// entries carry every hour's timestamp instead.
+function hourlyForecastTime(forecast, index) {
+    if (Array.isArray(forecast.time)) return forecast.time[index];
+    const start = Date.parse(`${forecast.start}Z`);
+    if (Number.isNaN(start)) return forecast.start;
+    return new Date(start + index * 3600000).toISOString().slice(0, 16);
+}
 
-    if (!displayedHourlyForecast || !displayedHourlyForecast.time.length) {
-        chart.append($('<div class="rain-forecast-empty">').text('Hourly forecast is not available yet. Refresh to try again.'));
-        return;
+function formatHourlyForecastTime(time, index) {
+    const label = hourlyTimeLabel(time);
+    if (!label.valid) return time;
+    if (index === 0) return `Now · ${label.time}`;
+    if (label.weekday) return `${label.weekday} · ${label.time}`;
+    return label.time;
+}
+
+// Hourly chart. Every point gets a fixed-width slot, so longer series scroll
+// horizontally. Series that would be wider than `maxWidth` pixels are
+// downsampled to fit: the temperature line keeps the points picked by LTTB
+// and each rain bar shows the highest chance in its span of hours. The SVG
+// and its nodes are created once and reused; only the slots inside the
+// scroller's viewport (plus some overscan) are drawn, with the SVG's viewBox
+// following the scroll position.
+const SVG_NS = 'http://www.w3.org/2000/svg';
+const RAIN_CHART = { height: 235, left: 34, right: 46, top: 18, bottom: 32, step: 640 / 24, overscan: 6, maxWidth: 2560 };
+var rainChartView = null;
+var rainListView = null;
+var rainForecastEmptyNode = null;
+
+function showRainForecastContent(node) {
+    const container = document.getElementById('rainForecastChart');
+    if (container.childNodes.length === 1 && container.firstChild === node) return;
+    // Detach without jQuery's cleanup so the reused views keep their handlers.
+    while (container.firstChild) container.removeChild(container.firstChild);
+    container.appendChild(node);
+}
+
+function showRainForecastEmpty() {
+    if (rainForecastEmptyNode === null) {
+        rainForecastEmptyNode = document.createElement('div');
+        rainForecastEmptyNode.className = 'rain-forecast-empty';
+        rainForecastEmptyNode.textContent = 'Hourly forecast is not available yet. Refresh to try again.';
     }
+    showRainForecastContent(rainForecastEmptyNode);
+}
 
-    const width = 720, height = 235, left = 34, right = 46, top = 18, bottom = 32;
-    const plotWidth = width - left - right;
-    const plotHeight = height - top - bottom;
-    const rain = displayedHourlyForecast.rain.map(value => Math.max(0, Math.min(100, Number(value) || 0)));
-    const temperatures = displayedHourlyForecast.temperature.map(value => convertTemperatureFromFahrenheit(Number(value), unit));
-    const minTemp = Math.floor(Math.min(...temperatures) - 2);
-    const maxTemp = Math.ceil(Math.max(...temperatures) + 2);
-    const tempSuffix = unit === 'k' ? ' K' : '°';
+function createRainChartView() {
+    const root = document.createElement('div');
+    root.className = 'rain-chart';
+    root.innerHTML = `<div class="rain-chart-scroller"><div class="rain-chart-track"><svg role="img">
+        <defs><linearGradient id="temperatureFill" x1="0" y1="0" x2="0" y2="1"><stop offset="0" stop-color="#ffd08a" stop-opacity=".32"/><stop offset="1" stop-color="#ffd08a" stop-opacity="0"/></linearGradient></defs>
+        <g class="rain-chart-grid"><line/><line/><line/></g>
+        <g class="rain-chart-bars"></g>
+        <polygon class="temp-chart-area"/>
+        <polyline class="temp-chart-line"/>
+        <g class="rain-chart-points"></g>
+        <g class="rain-chart-labels"></g>
+    </svg></div></div>
+    <div class="rain-chart-axis rain-axis"><span>100%</span><span>50%</span><span>0%</span></div>
+    <div class="rain-chart-axis temp-axis"><span></span><span></span><span></span><span></span></div>
+    <div id="rainChartValue" role="status"></div>`;
+    const view = {
+        root: root,
+        scroller: root.querySelector('.rain-chart-scroller'),
+        track: root.querySelector('.rain-chart-track'),
+        svg: root.querySelector('svg'),
+        gridLines: root.querySelectorAll('.rain-chart-grid line'),
+        bars: root.querySelector('.rain-chart-bars'),
+        area: root.querySelector('.temp-chart-area'),
+        line: root.querySelector('.temp-chart-line'),
+        points: root.querySelector('.rain-chart-points'),
+        labels: root.querySelector('.rain-chart-labels'),
+        tempAxis: root.querySelectorAll('.temp-axis span'),
+        barPool: [],
+        pointPool: [],
+        labelPool: [],
+        series: null,
+        first: -1,
+        last: -1,
+        frame: null
+    };
+    view.scroller.addEventListener('scroll', function () {
+        $('#rainChartValue').removeClass('visible');
+        if (view.frame === null) {
+            view.frame = requestAnimationFrame(function () {
+                view.frame = null;
+                drawRainChartWindow();
+            });
+        }
+    }, { passive: true });
+    return view;
+}
+
+// Largest-Triangle-Three-Buckets: returns the indexes of `threshold` points
+// of `values` that best keep the line's visual shape.
+function largestTriangleThreeBuckets(values, threshold) {
+    const count = values.length;
+    if (threshold >= count || threshold < 3) {
+        return Array.from({ length: count }, function (_, i) { return i; });
+    }
+    const picked = new Array(threshold);
+    const bucketSize = (count - 2) / (threshold - 2);
+    let previous = 0;
+    picked[0] = 0;
+    for (let bucket = 0; bucket < threshold - 2; bucket++) {
+        // The next bucket's average is the triangle's third corner.
+        const nextStart = Math.floor((bucket + 1) * bucketSize) + 1;
+        const nextEnd = Math.min(Math.floor((bucket + 2) * bucketSize) + 1, count);
+        let averageX = 0, averageY = 0;
+        for (let i = nextStart; i < nextEnd; i++) {
+            averageX += i;
+            averageY += values[i];
+        }
+        averageX /= nextEnd - nextStart;
+        averageY /= nextEnd - nextStart;
+
+        const start = Math.floor(bucket * bucketSize) + 1;
+        const end = Math.floor((bucket + 1) * bucketSize) + 1;
+        let maxArea = -1;
+        let chosen = start;
+        for (let i = start; i < end; i++) {
+            const area = Math.abs((previous - averageX) * (values[i] - values[previous])
+                - (previous - i) * (averageY - values[previous]));
+            if (area > maxArea) {
+                maxArea = area;
+                chosen = i;
+            }
+        }
+        picked[bucket + 1] = chosen;
+        previous = chosen;
+    }
+    picked[threshold - 1] = count - 1;
+    return picked;
+}
+
+function bindRainChartSeries(forecast, unit) {
+    const view = rainChartView;
+    const count = forecast.rain.length;
+    const rain = new Array(count);
+    const temperatures = new Array(count);
+    let minTemp = Infinity, maxTemp = -Infinity;
+    for (let i = 0; i < count; i++) {
+        rain[i] = Math.max(0, Math.min(100, Number(forecast.rain[i]) || 0));
+        temperatures[i] = convertTemperatureFromFahrenheit(Number(forecast.temperature[i]), unit);
+        if (temperatures[i] < minTemp) minTemp = temperatures[i];
+        if (temperatures[i] > maxTemp) maxTemp = temperatures[i];
+    }
+    minTemp = Math.floor(minTemp - 2);
+    maxTemp = Math.ceil(maxTemp + 2);
     const tempRange = Math.max(1, maxTemp - minTemp);
-    const step = plotWidth / rain.length;
-    const pointCoordinates = temperatures.map(function(temp, index) {
-        const x = left + index * step + step / 2;
-        const y = top + (maxTemp - temp) / tempRange * plotHeight;
-        return { x: x.toFixed(1), y: y.toFixed(1) };
+    const tempSuffix = unit === 'k' ? ' K' : '°';
+
+    const slots = Math.min(count, Math.floor(RAIN_CHART.maxWidth / RAIN_CHART.step));
+    const pointIndexes = largestTriangleThreeBuckets(temperatures, slots);
+    const barStarts = new Array(slots + 1);
+    const barIndexes = new Array(slots);
+    for (let i = 0; i <= slots; i++) barStarts[i] = Math.floor(i * count / slots);
+    for (let i = 0; i < slots; i++) {
+        let wettest = barStarts[i];
+        for (let hour = wettest + 1; hour < barStarts[i + 1]; hour++) {
+            if (rain[hour] > rain[wettest]) wettest = hour;
+        }
+        barIndexes[i] = wettest;
+    }
+    const width = RAIN_CHART.left + slots * RAIN_CHART.step + RAIN_CHART.right;
+
+    view.series = {
+        forecast: forecast,
+        unit: unit,
+        count: count,
+        slots: slots,
+        hourWidth: slots * RAIN_CHART.step / count,
+        pointIndexes: pointIndexes,
+        barStarts: barStarts,
+        barIndexes: barIndexes,
+        rain: rain,
+        temperatures: temperatures,
+        maxTemp: maxTemp,
+        tempRange: tempRange,
+        width: width
+    };
+    view.first = view.last = -1;
+    view.track.style.width = `${width}px`;
+    view.svg.setAttribute('aria-label', `Temperature line and rain probability bars for the next ${count} hours`);
+    view.tempAxis[0].textContent = `${maxTemp}${tempSuffix}`;
+    view.tempAxis[1].textContent = `${Math.round(maxTemp - tempRange / 3)}${tempSuffix}`;
+    view.tempAxis[2].textContent = `${Math.round(maxTemp - tempRange * 2 / 3)}${tempSuffix}`;
+    view.tempAxis[3].textContent = `${minTemp}${tempSuffix}`;
+}
+
+// Returns `count` nodes from `pool`, creating any that are missing and
+// hiding the rest.
+function pooledSvgNodes(pool, parent, tagName, count, init) {
+    while (pool.length < count) {
+        const node = document.createElementNS(SVG_NS, tagName);
+        init(node);
+        parent.appendChild(node);
+        pool.push(node);
+    }
+    for (let i = 0; i < pool.length; i++) {
+        const display = i < count ? '' : 'none';
+        if (pool[i].style.display !== display) pool[i].style.display = display;
+    }
+    return pool;
+}
+
+function initRainChartBar(node) {
+    node.setAttribute('class', 'rain-chart-bar');
+    node.setAttribute('data-series', 'rain');
+    node.setAttribute('tabindex', '0');
+    node.setAttribute('role', 'button');
+}
+
+function initTemperaturePoint(node) {
+    node.setAttribute('class', 'temp-chart-point');
+    node.setAttribute('data-series', 'temperature');
+    node.setAttribute('tabindex', '0');
+    node.setAttribute('role', 'button');
+    node.setAttribute('r', '2');
+}
+
+function initRainChartLabel(node) {
+    node.setAttribute('y', '228');
+    node.setAttribute('text-anchor', 'middle');
+}
+
+function rainChartAxisLabel(series, slot) {
+    if (slot === 0) return 'Now';
+    const label = hourlyTimeLabel(hourlyForecastTime(series.forecast, series.barStarts[slot]));
+    if (series.count <= 24) return label.time;
+    // Beyond a day, the first label of each day is its weekday instead.
+    const previous = hourlyTimeLabel(hourlyForecastTime(series.forecast, series.barStarts[slot - (slot % 3 || 3)]));
+    return label.day !== null && label.day !== previous.day ? label.day : label.time;
+}
+
+function drawRainChartWindow() {
+    const view = rainChartView;
+    const series = view.series;
+    if (!series) return;
+    const { height, left, top, bottom, step, overscan } = RAIN_CHART;
+    const plotHeight = height - top - bottom;
+    const scrollLeft = view.scroller.scrollLeft;
+    const viewport = view.scroller.clientWidth || 720;
+    const first = Math.max(0, Math.floor((scrollLeft - left) / step) - overscan);
+    const last = Math.min(series.slots - 1, Math.ceil((scrollLeft + viewport - left) / step) + overscan);
+    if (first === view.first && last === view.last) return;
+    view.first = first;
+    view.last = last;
+
+    const x0 = first === 0 ? 0 : left + first * step;
+    const x1 = last === series.slots - 1 ? series.width : left + (last + 1) * step;
+    view.svg.style.left = `${x0}px`;
+    view.svg.style.width = `${x1 - x0}px`;
+    view.svg.setAttribute('viewBox', `${x0} 0 ${x1 - x0} ${height}`);
+    [top, top + plotHeight / 2, top + plotHeight].forEach(function (y, i) {
+        const line = view.gridLines[i];
+        line.setAttribute('x1', Math.max(left, x0));
+        line.setAttribute('x2', Math.min(series.width - RAIN_CHART.right, x1));
+        line.setAttribute('y1', y);
+        line.setAttribute('y2', y);
     });
-    const points = pointCoordinates.map(point => `${point.x},${point.y}`).join(' ');
-    const bars = rain.map(function(chance, index) {
+
+    const count = last - first + 1;
+    const bars = pooledSvgNodes(view.barPool, view.bars, 'rect', count, initRainChartBar);
+    const points = pooledSvgNodes(view.pointPool, view.points, 'circle', count, initTemperaturePoint);
+    // Bars, points and labels are placed by hour, so that downsampled
+    // points sit where their hour falls.
+    const hourWidth = series.hourWidth;
+    const coordinates = new Array(count);
+    const labelSlots = [];
+    for (let i = 0; i < count; i++) {
+        const slot = first + i;
+        const barIndex = series.barIndexes[slot];
+        const chance = series.rain[barIndex];
         const barHeight = chance / 100 * plotHeight;
-        const time = formatHourlyForecastTime(displayedHourlyForecast.time[index], index);
-        return `<rect class="rain-chart-bar" data-series="rain" data-index="${index}" tabindex="0" role="button" aria-label="${time}: ${Math.round(chance)}% rain" x="${(left + index * step + 2).toFixed(1)}" y="${(top + plotHeight - barHeight).toFixed(1)}" width="${Math.max(1, step - 4).toFixed(1)}" height="${barHeight.toFixed(1)}"/>`;
-    }).join('');
-    const temperaturePoints = pointCoordinates.map(function(point, index) {
-        const time = formatHourlyForecastTime(displayedHourlyForecast.time[index], index);
-        const temperature = formatTemperatureValue(displayedHourlyForecast.temperature[index], unit, false);
-        return `<circle class="temp-chart-point" data-series="temperature" data-index="${index}" tabindex="0" role="button" aria-label="${time}: ${temperature}" cx="${point.x}" cy="${point.y}" r="2"/>`;
-    }).join('');
-    const labels = [0, 3, 6, 9, 12, 15, 18, 21, rain.length - 1].map(function(index) {
-        const x = left + index * step + step / 2;
-        const label = index === 0 ? 'Now' : formatHourlyForecastTime(displayedHourlyForecast.time[index], index).replace(/^.*· /, '');
-        return `<text x="${x.toFixed(1)}" y="228" text-anchor="middle">${label}</text>`;
-    }).join('');
-
-    const scroller = $('<div class="rain-chart-scroller">').html(`<svg viewBox="0 0 ${width} ${height}" role="img" aria-label="Temperature line and rain probability bars for the next 24 hours">
-        <defs><linearGradient id="temperatureFill" x1="0" y1="0" x2="0" y2="1"><stop offset="0" stop-color="#ffd08a" stop-opacity=".32"/><stop offset="1" stop-color="#ffd08a" stop-opacity="0"/></linearGradient></defs>
-        <g class="rain-chart-grid"><line x1="${left}" y1="${top}" x2="${width - right}" y2="${top}"/><line x1="${left}" y1="${top + plotHeight / 2}" x2="${width - right}" y2="${top + plotHeight / 2}"/><line x1="${left}" y1="${top + plotHeight}" x2="${width - right}" y2="${top + plotHeight}"/></g>
-        ${bars}
-        <polygon class="temp-chart-area" points="${left + step / 2},${top + plotHeight} ${points} ${width - right - step / 2},${top + plotHeight}"/>
-        <polyline class="temp-chart-line" points="${points}"/>
-        ${temperaturePoints}
-        <g class="rain-chart-labels">${labels}</g>
-    </svg>`);
-    const rainAxis = $('<div class="rain-chart-axis rain-axis">').append('<span>100%</span><span>50%</span><span>0%</span>');
-    const tempAxis = $('<div class="rain-chart-axis temp-axis">').append(
-        $('<span>').text(`${maxTemp}${tempSuffix}`),
-        $('<span>').text(`${Math.round(maxTemp - tempRange / 3)}${tempSuffix}`),
-        $('<span>').text(`${Math.round(maxTemp - tempRange * 2 / 3)}${tempSuffix}`),
-        $('<span>').text(`${minTemp}${tempSuffix}`)
-    );
-    chart.append(scroller, rainAxis, tempAxis, '<div id="rainChartValue" role="status"></div>');
-    scroller.on('scroll', function() { $('#rainChartValue').removeClass('visible'); });
-    scroller.scrollLeft(0);
+        const barStart = series.barStarts[slot];
+        const bar = bars[i];
+        bar.setAttribute('data-index', barIndex);
+        bar.setAttribute('aria-label',
+            `${formatHourlyForecastTime(hourlyForecastTime(series.forecast, barIndex), barIndex)}: ${Math.round(chance)}% rain`);
+        bar.setAttribute('x', (left + barStart * hourWidth + 2).toFixed(1));
+        bar.setAttribute('y', (top + plotHeight - barHeight).toFixed(1));
+        bar.setAttribute('width', Math.max(1, (series.barStarts[slot + 1] - barStart) * hourWidth - 4).toFixed(1));
+        bar.setAttribute('height', barHeight.toFixed(1));
+
+        const index = series.pointIndexes[slot];
+        const x = (left + (index + 0.5) * hourWidth).toFixed(1);
+        const y = (top + (series.maxTemp - series.temperatures[index]) / series.tempRange * plotHeight).toFixed(1);
+        const point = points[i];
+        point.setAttribute('data-index', index);
+        point.setAttribute('aria-label',
+            `${formatHourlyForecastTime(hourlyForecastTime(series.forecast, index), index)}: ${formatTemperatureValue(series.forecast.temperature[index], series.unit, false)}`);
+        point.setAttribute('cx', x);
+        point.setAttribute('cy', y);
+        coordinates[i] = `${x},${y}`;
+        if (slot % 3 === 0 || slot === series.slots - 1) labelSlots.push(slot);
+    }
+    const pointList = coordinates.join(' ');
+    const baseline = top + plotHeight;
+    view.line.setAttribute('points', pointList);
+    view.area.setAttribute('points',
+        `${coordinates[0].split(',')[0]},${baseline} ${pointList} ${coordinates[count - 1].split(',')[0]},${baseline}`);
+
+    const labels = pooledSvgNodes(view.labelPool, view.labels, 'text', labelSlots.length, initRainChartLabel);
+    labelSlots.forEach(function (slot, i) {
+        labels[i].setAttribute('x', (left + (series.barStarts[slot] + 0.5) * hourWidth).toFixed(1));
+        labels[i].textContent = rainChartAxisLabel(series, slot);
+    });
+}
+
+function renderRainChart(resetScroll) {
+    $('#rainForecastChart').removeClass('list-view');
+    if (!displayedHourlyForecast || !displayedHourlyForecast.rain.length) {
+        showRainForecastEmpty();
+        return;
+    }
+    if (rainChartView === null) rainChartView = createRainChartView();
+    const unit = getTemperatureUnit();
+    const series = rainChartView.series;
+    if (!series || series.forecast !== displayedHourlyForecast || series.unit !== unit) {
+        bindRainChartSeries(displayedHourlyForecast, unit);
+    }
+    showRainForecastContent(rainChartView.root);
+    if (resetScroll) rainChartView.scroller.scrollLeft = 0;
+    drawRainChartWindow();
 }
 
 function renderRainList() {
-    const content = $('#rainForecastChart').empty().addClass('list-view');
-    if (!displayedHourlyForecast || !displayedHourlyForecast.time.length) {
-        content.append($('<div class="rain-forecast-empty">').text('Hourly forecast is not available yet. Refresh to try again.'));
+    $('#rainForecastChart').addClass('list-view');
+    if (!displayedHourlyForecast || !displayedHourlyForecast.rain.length) {
+        showRainForecastEmpty();
         return;
     }
+    if (rainListView === null) {
+        const root = document.createElement('div');
+        root.innerHTML = '<div class="rain-forecast-columns"><span>Time</span><span>Rain</span><span>Temp</span></div><div class="rain-forecast-rows"></div>';
+        rainListView = { root: root, rows: root.querySelector('.rain-forecast-rows'), pool: [] };
+    }
 
     const unit = getTemperatureUnit();
-    const rows = displayedHourlyForecast.time.map(function(time, index) {
-        const rain = displayedHourlyForecast.rain[index];
-        const temp = displayedHourlyForecast.temperature[index];
-        return $('<div class="rain-forecast-row">').append(
-            $('<span>').text(formatHourlyForecastTime(time, index)),
-            $('<span class="rain-chance">').text(rain == null ? '--%' : `${Math.round(Number(rain))}%`),
-            $('<span>').text(temp == null ? '--' : formatTemperatureValue(Number(temp), unit, false))
-        );
+    const forecast = displayedHourlyForecast;
+    const pool = rainListView.pool;
+    while (pool.length < forecast.rain.length) {
+        const row = document.createElement('div');
+        row.className = 'rain-forecast-row';
+        row.innerHTML = '<span></span><span class="rain-chance"></span><span></span>';
+        rainListView.rows.appendChild(row);
+        pool.push(row);
+    }
+    pool.forEach(function (row, index) {
+        if (index >= forecast.rain.length) {
+            row.style.display = 'none';
+            return;
+        }
+        const rain = forecast.rain[index];
+        const temp = forecast.temperature[index];
+        row.style.display = '';
+        row.children[0].textContent = formatHourlyForecastTime(hourlyForecastTime(forecast, index), index);
+        row.children[1].textContent = rain == null ? '--%' : `${Math.round(Number(rain))}%`;
+        row.children[2].textContent = temp == null ? '--' : formatTemperatureValue(Number(temp), unit, false);
     });
-    content.append(
-        $('<div class="rain-forecast-columns">').append('<span>Time</span><span>Rain</span><span>Temp</span>'),
-        $('<div class="rain-forecast-rows">').append(rows)
-    );
+    showRainForecastContent(rainListView.root);
 }
 
-function renderRainForecast() {
+function renderRainForecast(resetScroll) {
     const showList = hourlyForecastView === 'list';
+    const hours = displayedHourlyForecast ? displayedHourlyForecast.rain.length : 0;
+    // Whole days only, so a horizon cut short by the API is not overstated.
+    $('#rainForecastTitle').text(hours > 24 ? `Next ${Math.floor(hours / 24)} days` : 'Next 24 hours');
     $('.rain-forecast-legend').toggle(!showList);
     $('#rainForecastViewToggle')
         .text(showList ? 'Chart' : 'List')
         .attr('aria-label', showList ? 'Show hourly forecast as a chart' : 'Show hourly forecast as a list');
-    if (showList) renderRainList(); else renderRainChart();
+    if (showList) renderRainList(); else renderRainChart(resetScroll);
 }
 
 function openRainForecast() {
-    renderRainForecast();
     $('#rainForecastPanel').attr('aria-hidden', 'false').addClass('visible');
+    // Drawn once visible, so that the scroller has its real width.
+    renderRainForecast(true);
     $('#rainForecastClose').focus();
 }
 
@@ -633,62 +1002,45 @@ function closeRainForecast() {
     $('#rainForecastPanel').attr('aria-hidden', 'true').removeClass('visible');
 }
 
+function hexToRgbArray(hex) {
+    if (hex[0] == '#') hex = hex.slice(1);
+    if (hex.length == 3) hex = hex[0] + hex[0] + hex[1] + hex[1] + hex[2] + hex[2];
+    return [parseInt(hex.slice(0, 2), 16), parseInt(hex.slice(2, 4), 16), parseInt(hex.slice(4, 6), 16)];
+}
+
+// Temperature gradient stops, parsed once rather than on every render.
+const BACKGROUND_GRADIENT = [
+    { pos: 0, color: hexToRgbArray('#0081d3') },
+    { pos: 10, color: hexToRgbArray('#007bc2') },
+    { pos: 20, color: hexToRgbArray('#0071b2') },
+    { pos: 30, color: hexToRgbArray('#2766a2') },
+    { pos: 40, color: hexToRgbArray('#575591') },
+    { pos: 50, color: hexToRgbArray('#94556b') },
+    { pos: 60, color: hexToRgbArray('#af4744') },
+    { pos: 70, color: hexToRgbArray('#bb4434') },
+    { pos: 80, color: hexToRgbArray('#c94126') },
+    { pos: 90, color: hexToRgbArray('#d6411b') },
+    { pos: 100, color: hexToRgbArray('#e44211') }
+];
+
+// Skips the style write (and the repaint) when the colour is unchanged.
+var renderedBackground = null;
+function setContainerBackground(value) {
+    if (value === renderedBackground) return;
+    renderedBackground = value;
+    $("#container").css("background", value);
+}
+
 function background(temp) {
     // Convert RGB array to CSS
     var convert = function(i) {
-        // Array to RGB
-        if (typeof(i) == 'object') {
-            return 'rgb(' + i.join(', ') + ')';
-
-        // Hex to array
-        } else if (typeof(i) == 'string') {
-            var output = [];
-            if (i[0] == '#') i = i.slice(1);
-            if (i.length == 3)    i = i[0] + i[0] + i[1] + i[1] + i[2] + i[2];
-            output.push(parseInt(i.slice(0,2), 16))
-            output.push(parseInt(i.slice(2,4), 16))
-            output.push(parseInt(i.slice(4,6), 16))
-            return output;
-        }
+        return 'rgb(' + i.join(', ') + ')';
     };
 
     // Get color at position
     var blend = function(x) {
         x = Number(x)
-        var gradient = [{
-            pos: 0,
-            color: convert('#0081d3')
-        }, {
-            pos: 10,
-            color: convert('#007bc2')
-        }, {
-            pos: 20,
-            color: convert('#0071b2')
-        }, {
-            pos: 30,
-            color: convert('#2766a2')
-        }, {
-            pos: 40,
-            color: convert('#575591')
-        }, {
-            pos: 50,
-            color: convert('#94556b')
-        }, {
-            pos: 60,
-            color: convert('#af4744')
-        }, {
-            pos: 70,
-            color: convert('#bb4434')
-        }, {
-            pos: 80,
-            color: convert('#c94126')
-        }, {
-            pos: 90,
-            color: convert('#d6411b')
-        }, {
-            pos: 100,
-            color: convert('#e44211')
-        }];
+        var gradient = BACKGROUND_GRADIENT;
 
         var left = {
             pos: -1,
@@ -736,14 +1088,14 @@ function background(temp) {
     //Sets Background Color
     if (localStorage.typhoon_color == "gradient") {
         var percentage = Math.round((temp - 45) *  2.2)
-        $("#container").css("background", blend(percentage))
+        setContainerBackground(blend(percentage))
     } else if (localStorage.typhoon_color == "chameleonic") {
-        $("#container").css("background", '#' + localStorage.typhoon_special_color)
+        setContainerBackground('#' + localStorage.typhoon_special_color)
         $('.color span[data-color=chameleonic]').css("background", '#' + localStorage.typhoon_special_color)
     } else if (localStorage.typhoon_color == "custom" && localStorage.typhoon_custom_color) {
-        $("#container").css("background", localStorage.typhoon_custom_color);
+        setContainerBackground(localStorage.typhoon_custom_color);
     } else {
-        $("#container").css("background", "#" + localStorage.typhoon_color)
+        setContainerBackground("#" + localStorage.typhoon_color)
     }
 // Custom Color Picker logic (Hue + Saturation + Darkness)
 $(function() {
@@ -829,7 +1181,7 @@ $(function() {
         if (persistSelection !== false) {
             localStorage.typhoon_color = 'custom';
             localStorage.typhoon_custom_color = hex;
-            $("#container").css("background", hex);
+            setContainerBackground(hex);
         }
         customColorPicker.css("background-color", hex);
     }
@@ -936,15 +1288,32 @@ function weather_code(iconCode, isDay) {
 function receiveMessage(message) {
     // Save the received message as a localStorage item
     localStorage.setItem("typhoon_special_color", message);
+    // The host pushes a new colour whenever the wallpaper or accent changes.
+    if (localStorage.typhoon_color === "chameleonic") {
+        background(null);
+    }
 }
 
 // Global variables for multiple locations
 var currentLocations = [];
 var currentLocationIndex = 0;
-var weatherCache = {}; // Cache weather data for each location
-var cacheWarmInProgress = false;
-var cacheWarmQueue = [];
 var cacheWarmInFlight = {};
+// In widget mode (typhoon --widgets) the host opens one page per saved
+// location, naming it in the URL. Such a page starts on that location and
+// keeps its navigation to itself.
+var widgetLocation = new URLSearchParams(window.location.search).get('widget');
+// Widget pages leave weather alerts to the main window, so several windows
+// don't each announce the same weather.
+var pageSendsAlerts = new URLSearchParams(window.location.search).get('alerts') !== '0';
+
+// The host pins the main window once it has a location to show in widget mode.
+function setWidgetLocation(query) {
+    widgetLocation = query || null;
+    const index = widgetLocation === null ? -1 : currentLocations.indexOf(widgetLocation);
+    if (index !== -1 && index !== currentLocationIndex) {
+        navigateToLocation(index);
+    }
+}
 
 // Initialize locations from localStorage
 function initLocations() {
@@ -960,136 +1329,82 @@ function initLocations() {
     if (localStorage.typhoon_current_index) {
         currentLocationIndex = parseInt(localStorage.typhoon_current_index, 10);
     }
-    
-    // Load weather cache
-    if (localStorage.typhoon_weather_cache) {
-        try {
-            weatherCache = JSON.parse(localStorage.typhoon_weather_cache);
-            pruneWeatherCache();
-        } catch (e) {
-            weatherCache = {};
-        }
+    if (widgetLocation !== null && currentLocations.indexOf(widgetLocation) !== -1) {
+        currentLocationIndex = currentLocations.indexOf(widgetLocation);
     }
+    
+    // The weather cache now lives in the host's store, and the alert
+    // throttle in its settings.
+    localStorage.removeItem('typhoon_weather_cache');
+    localStorage.removeItem('typhoon_last_notify_time');
 }
 
 // Save locations to localStorage
 function saveLocations() {
     localStorage.typhoon_locations = JSON.stringify(currentLocations);
-    localStorage.typhoon_current_index = currentLocationIndex;
-}
-
-// Save weather cache to localStorage
-function saveWeatherCache() {
-    pruneWeatherCache();
-    localStorage.typhoon_weather_cache = JSON.stringify(weatherCache);
+    if (widgetLocation === null) {
+        localStorage.typhoon_current_index = currentLocationIndex;
+    }
+    syncHostPreferences();
 }
 
 // Navigate to a specific location
 // Display location using only cached data - no network calls
-function displayCachedLocationOnly(cityName) {
-    pruneWeatherCache();
-    if (!weatherCache[cityName]) {
-        return; // No cached data available, don't display anything
-    }
-    
-    const cached = weatherCache[cityName];
-    displayCachedWeather(cached.currentWeather, cached.locationData, cached.weeklyData);
-}
-
-function hasFreshCache(cityName) {
-    if (!cityName || !weatherCache[cityName]) {
-        return false;
-    }
-    const entry = weatherCache[cityName];
-    const config = getCacheConfig();
-    const now = Date.now();
-    if (!entry.timestamp || (now - entry.timestamp) > config.ttlMs) {
-        return false;
-    }
-    return !!(entry.currentWeather && entry.locationData && entry.weeklyData);
+function displayCachedLocationOnly(cityName, callback) {
+    loadCachedWeather(cityName, function (cached) {
+        if (cached) {
+            const entry = cached.entry;
+            displayCachedWeather(entry.currentWeather, entry.locationData, entry.weeklyData, false, cached.timestamp);
+        }
+        if (callback) callback(cached);
+    });
 }
 
-function cacheLocationWeather(cityName, callback) {
-    if (!cityName) {
-        if (callback) callback(false);
-        return;
-    }
-    if (cacheWarmInFlight[cityName]) {
-        if (callback) callback(false);
-        return;
-    }
-
-    cacheWarmInFlight[cityName] = true;
-    fetchAndCacheWeather(cityName, function(result) {
-        delete cacheWarmInFlight[cityName];
-        if (callback) callback(!!result);
+function cacheLocationsWeather(cityNames, callback, staleOnly) {
+    cityNames.forEach(function (cityName) {
+        cacheWarmInFlight[cityName] = true;
     });
+    fetchAndCacheWeather(cityNames, function (results) {
+        cityNames.forEach(function (cityName) {
+            delete cacheWarmInFlight[cityName];
+        });
+        if (callback) callback(results);
+    }, staleOnly);
 }
 
-function warmCacheForAllLocations(excludeCityName) {
-    pruneWeatherCache();
-
+function warmCacheForAllLocations(excludeCityName, callback) {
     const pendingCities = currentLocations.filter(function(city) {
         if (!city) return false;
         if (excludeCityName && city === excludeCityName) return false;
-        if (hasFreshCache(city)) return false;
         if (cacheWarmInFlight[city]) return false;
         return true;
     });
 
-    if (pendingCities.length > 0) {
-        const queueSet = new Set(cacheWarmQueue);
-        pendingCities.forEach(function(city) {
-            if (!queueSet.has(city)) {
-                cacheWarmQueue.push(city);
-                queueSet.add(city);
-            }
-        });
-    }
-
-    if (cacheWarmInProgress || cacheWarmQueue.length === 0) {
-        return;
-    }
-
-    cacheWarmInProgress = true;
-
-    function warmNext() {
-        if (cacheWarmQueue.length === 0) {
-            cacheWarmInProgress = false;
-            return;
-        }
-        const cityName = cacheWarmQueue.shift();
-        if (!cityName || hasFreshCache(cityName) || cacheWarmInFlight[cityName]) {
-            setTimeout(warmNext, 100);
-            return;
-        }
-        cacheLocationWeather(cityName, function() {
-            // Small spacing avoids burst requests to APIs.
-            setTimeout(warmNext, 250);
-        });
+    if (hostOnline && pendingCities.length > 0) {
+        // The host skips cities whose cached entry is still fresh.
+        cacheLocationsWeather(pendingCities, callback, true);
+    } else if (callback) {
+        callback({});
     }
-
-    warmNext();
 }
 
 function navigateToLocation(index) {
     if (index >= 0 && index < currentLocations.length) {
         closeRainForecast();
         currentLocationIndex = index;
-        lastManualNavigationTime = Date.now(); // Record time of manual navigation
         saveLocations();
         const cityName = currentLocations[currentLocationIndex];
 
         // Navigation should be instant from cache. Fresh network refresh is debounced.
-        displayCachedLocationOnly(cityName);
+        displayCachedLocationOnly(cityName, function (cached) {
+            // If cache is missing for this location, queue background warming too.
+            if (!cached) {
+                $('.border .sync').addClass('busy');
+                warmCacheForAllLocations(cityName);
+            }
+        });
         updateLocationNav();
         scheduleNavigationRefresh();
-
-        // If cache is missing/stale for this location, queue background warming too.
-        if (!hasFreshCache(cityName)) {
-            $('.border .sync').addClass('busy');
-            warmCacheForAllLocations(cityName);
-        }
     }
 }
 
@@ -1123,6 +1438,8 @@ function updateLocationNav() {
 }
 
 $(document).ready(function() {
+    traceSpan('page: navigation to DOM ready', 0);
+    connectHostBridge();
     // Set the size
     scaleContent();
     initOpaqueTooltips();
@@ -1149,7 +1466,7 @@ $(document).ready(function() {
         .on('click', '.rain-chart-bar, .temp-chart-point', function(event) {
             event.stopPropagation();
             const index = Number($(this).attr('data-index'));
-            const time = formatHourlyForecastTime(displayedHourlyForecast.time[index], index);
+            const time = formatHourlyForecastTime(hourlyForecastTime(displayedHourlyForecast, index), index);
             const value = $(this).attr('data-series') === 'rain'
                 ? `Rain: ${Math.round(Number(displayedHourlyForecast.rain[index]))}%`
                 : `Temperature: ${formatTemperatureValue(displayedHourlyForecast.temperature[index], getTemperatureUnit(), false)}`;
@@ -1187,17 +1504,6 @@ $(document).ready(function() {
         updateLocationNav();
         // Warm cache for other saved locations so navigation is instant.
         warmCacheForAllLocations(currentLocations[currentLocationIndex]);
-
-        setInterval(function() {
-            // Skip auto-refresh if it's too soon after manual navigation
-            if (Date.now() - lastManualNavigationTime < NAVIGATION_REFRESH_DELAY) {
-                return;
-            }
-            console.log("Updating Data...")
-            document.title = "refreshing data";
-            // Refresh the current location directly instead of clicking sync button
-            render(currentLocations[currentLocationIndex])
-        }, TYPHOON_REFRESH_MS)
     }
 
     // Navigation button handlers
@@ -1223,8 +1529,7 @@ $(document).ready(function() {
             // Remove current location
             const removedCity = currentLocations[currentLocationIndex];
             currentLocations.splice(currentLocationIndex, 1);
-            delete weatherCache[removedCity];
-            saveWeatherCache();
+            callHost('forgetLocation', removedCity);
             
             // Adjust index if needed
             if (currentLocationIndex >= currentLocations.length && currentLocationIndex > 0) {
@@ -1252,7 +1557,7 @@ $(document).ready(function() {
     // Add event listener for the reset button
     $('#resetButton').click(function () {
             localStorage.clear(); // Clear all local storage
-            document.title = "reset";
+            callHost('windowAction', 'reset');
             location.reload(); // Reload the page to apply default settings
     });
 
@@ -1282,26 +1587,23 @@ $(document).ready(function() {
 function init_settings() {
     // Prevents Dragging on certain elements
     $('.border .settings, .border .sync, .border .close, .border .minimize, #locationModal input, #locationModal .measurement span, #locationModal .speed span, #locationLoader, #locationModal a, #locationModal .color, #locationModal .btn, #errorMessage .btn, #city span, #locationModal img, #locationNav, #locationModal .slider-switch, #customColorPanel, #customColorPanel *, .hourly-forecast-trigger, .hourly-forecast-trigger *, #rainForecastPanel, #rainForecastPanel *').mouseover(function() {
-        document.title = "disabledrag";
+        setHostState('dragEnabled', false);
     }).mouseout(function() {
-        document.title = "enabledrag";
+        setHostState('dragEnabled', true);
     }).click(function() {
         if ($(this).hasClass("close")) {
-            document.title = 'close';
+            callHost('windowAction', 'close');
         } else if ($(this).hasClass("minimize")) {
-            document.title = 'minimize';
+            callHost('windowAction', 'minimize');
         } else if ($(this).hasClass("settings")) {
             show_settings("all");
         } else if ($(this).hasClass("sync")) {
             if (localStorage.typhoon_color === "chameleonic") {
-                location.reload();
-                document.title = "enabledrag"
-            } else {
-                // Show loading state and clear cache to force fresh fetch
-                $('.border .sync').addClass('busy');
-                delete weatherCache[currentLocations[currentLocationIndex]];
-                render(currentLocations[currentLocationIndex]);
+                callHost('refreshAccentColor');
             }
+            // Show loading state; render always fetches fresh data
+            $('.border .sync').addClass('busy');
+            render(currentLocations[currentLocationIndex]);
         }
     });
 
@@ -1322,7 +1624,7 @@ function init_settings() {
     function doneTyping() {
         $("#locationLoader").attr("class", "loading loader").html("|");
         const cityName = locationInput.val();
-        getWeatherData(cityName, function(data) {
+        getLocationData(cityName, function(data) {
             if (data) {
                 $("#locationLoader").attr("class", "tick loader").html("&#10003;").attr("data-city", cityName);
             } else {
@@ -1368,6 +1670,7 @@ function init_settings() {
     $('#locationModal .toggleswitch span').click(function() {
         $(this).parent().children().removeClass('selected')
         localStorage.setItem("typhoon_" + $(this).parent().attr("class").replace("toggleswitch ", ""), $(this).addClass('selected').attr("data-type"))
+        syncHostPreferences();
         if ($('#rainForecastPanel').hasClass('visible')) renderRainForecast();
         $(".border .settings").hide()
     })
@@ -1383,27 +1686,16 @@ function init_settings() {
     $('.color span[data-color=chameleonic]').click(function() {
         $(".border .settings").hide()
         localStorage.typhoon_color = "chameleonic"
-        location.reload()
-        document.title = "enabledrag"
         $(this).css('background', '#' + localStorage.typhoon_special_color)
     })
     
 
     // Launcher switch
-    if (localStorage.typhoon_launcher === "checked") {
-        $('#launcherswitch').prop("checked", true);
-        document.title = "enable_launcher";
-    } else {
-        $('#launcherswitch').prop("checked", false);
-        document.title = "disable_launcher";
-    }
+    $('#launcherswitch').prop("checked", localStorage.typhoon_launcher === "checked");
+    setHostState('launcherVisible', localStorage.typhoon_launcher === "checked");
     $('#launcherswitch').click(function() {
         localStorage.typhoon_launcher = $('#launcherswitch').prop("checked") ? "checked" : "unchecked";
-        if (localStorage.typhoon_launcher === "checked") {
-            document.title = "enable_launcher";
-        } else {
-            document.title = "disable_launcher";
-        }
+        setHostState('launcherVisible', localStorage.typhoon_launcher === "checked");
     });
 
     // Notifications switch (new)
@@ -1418,15 +1710,16 @@ function init_settings() {
     $('#notificationswitch').click(function() {
         TYPHOON_NOTIFICATIONS_ENABLED = $('#notificationswitch').prop('checked');
         localStorage.typhoon_notifications = TYPHOON_NOTIFICATIONS_ENABLED ? 'enabled' : 'disabled';
+        syncHostPreferences();
     });
 
     // System tray switch. The host switches this back off if the desktop does
     // not provide a usable tray (common on some Linux shell configurations).
     $('#trayswitch').prop('checked', localStorage.typhoon_tray === 'checked');
-    document.title = localStorage.typhoon_tray === 'checked' ? 'enable_tray' : 'disable_tray';
+    setHostState('trayEnabled', localStorage.typhoon_tray === 'checked');
     $('#trayswitch').click(function() {
         localStorage.typhoon_tray = $(this).prop('checked') ? 'checked' : 'unchecked';
-        document.title = localStorage.typhoon_tray === 'checked' ? 'enable_tray' : 'disable_tray';
+        setHostState('trayEnabled', localStorage.typhoon_tray === 'checked');
     });
 
     // Window control position switch
@@ -1447,6 +1740,8 @@ function init_settings() {
 
     // NOTE: do not overwrite the entire .launcher inputs here (would clobber notifications checkbox)
 
+    syncHostPreferences();
+
     //Control CSS.
     $("span[data-color]:not([data-color=gradient])").map(function() { $(this).css('background', '#' + $(this).attr("data-color")) })
 
@@ -1535,31 +1830,27 @@ function opacity() {
     // On first run, opacity would be 0.8
     if (localStorage.getItem("app_opacity") === null) {
         localStorage.app_opacity = 0.8;
-        document.title = "o" + localStorage.app_opacity;
     }
 
     const slider = $('#slider');
     slider.val(localStorage.app_opacity);
-    document.title = "o" + localStorage.app_opacity;
+    setHostState('opacity', parseFloat(localStorage.app_opacity));
 
     // Update opacity dynamically as the slider value changes
     slider.off('input.opacity').on('input.opacity', function () {
         const newOpacity = $(this).val();
         console.log("Opacity value:", newOpacity); // Print the value to the console
-        document.title = "o" + newOpacity; // Update the title dynamically
+        setHostState('opacity', parseFloat(newOpacity));
         localStorage.app_opacity = newOpacity; // Save the new value to localStorage
     });
 }
 
-function setSystemTrayAvailable(available) {
-    if (available) return;
-    localStorage.typhoon_tray = 'unchecked';
-    $('#trayswitch').prop('checked', false);
-}
-
+// The host reports the tray state it actually applied, e.g. off when the
+// desktop provides no tray or always on for Windows notifications.
 function setSystemTrayEnabled(enabled) {
     localStorage.typhoon_tray = enabled ? 'checked' : 'unchecked';
     $('#trayswitch').prop('checked', enabled);
+    sentHostState.trayEnabled = enabled;
 }
 
 function setWindowAlpha(alpha) {
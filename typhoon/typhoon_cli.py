@@ -0,0 +1,113 @@
+# `typhoon --print`: current conditions for status bars such as waybar or
+# polybar. Reads the host's weather store and the preferences it mirrors to
+# settings.json, and only goes to the network when the entry is stale. It
+# must not import Qt, dbus or gi, so that a poll takes milliseconds.
+
+import argparse
+import json
+import os
+import sys
+
+from typhoon_fetch import DEFAULT_FORECAST_DAYS, FetchEngine, FetchError
+from typhoon_registry import LocationRegistry
+from typhoon_settings import SettingsStore, get_config_dir
+from typhoon_store import WeatherStore
+from typhoon_summary import current_conditions, notify_threshold
+
+DEFAULT_FORMAT = "{text} {description}"
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="typhoon --print", description="Print the current weather from Typhoon's cache."
+    )
+    parser.add_argument("--print", action="store_true", help=argparse.SUPPRESS)
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument("--json", action="store_true", help="print every field as JSON")
+    output.add_argument(
+        "--format",
+        default=DEFAULT_FORMAT,
+        help="template with {field} placeholders, as named in --json "
+        f"(default: {DEFAULT_FORMAT!r})",
+    )
+    parser.add_argument(
+        "--location",
+        metavar="N",
+        help="saved location number, starting at 1, or a place name "
+        "(default: the location shown in the window)",
+    )
+    return parser.parse_args(argv)
+
+
+def choose_location(preferences, choice):
+    locations = [query for query in preferences.get("locations") or [] if query]
+    if choice is None:
+        return preferences.get("location") or (locations[0] if locations else None)
+    if choice.isdigit():
+        index = int(choice) - 1
+        if not 0 <= index < len(locations):
+            raise ValueError(
+                f"there is no saved location {choice}; {len(locations)} saved"
+                if locations else "no saved location; add one in the Typhoon window"
+            )
+        return locations[index]
+    return choice
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    config_dir = get_config_dir()
+    preferences = SettingsStore(os.path.join(config_dir, "settings.json")).get("page", {})
+    try:
+        query = choose_location(preferences, args.location)
+    except ValueError as e:
+        print(f"typhoon: {e}", file=sys.stderr)
+        return 1
+    if not query:
+        print("typhoon: no saved location; add one in the Typhoon window", file=sys.stderr)
+        return 1
+
+    engine = FetchEngine(
+        LocationRegistry(os.path.join(config_dir, "locations.json")),
+        WeatherStore(os.path.join(config_dir, "weather.sqlite3")),
+        max_workers=1,
+    )
+    try:
+        if not engine.store.is_fresh(query):
+            days = preferences.get("forecastDays") or DEFAULT_FORECAST_DAYS
+            try:
+                engine.weather([query], days=days)
+            except (FetchError, OSError, ValueError, KeyError, TypeError) as e:
+                # Fall back to whatever the cache still has; a status bar
+                # should never get a traceback from an odd response.
+                print(f"typhoon: could not refresh the weather: {e}", file=sys.stderr)
+        cached = engine.store.get(query)
+        fresh = engine.store.is_fresh(query)
+    finally:
+        engine.shutdown()
+    if cached is None:
+        print(f"typhoon: no weather available for {query}", file=sys.stderr)
+        return 1
+
+    entry, fetched_at = cached
+    conditions = current_conditions(
+        query,
+        entry,
+        fetched_at,
+        fresh,
+        preferences.get("temperatureUnit") or "f",
+        notify_threshold(preferences),
+    )
+    if args.json:
+        print(json.dumps(conditions, ensure_ascii=False))
+        return 0
+    try:
+        print(args.format.format_map(conditions))
+    except (KeyError, IndexError, ValueError) as e:
+        print(f"typhoon: bad --format: {e}", file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,418 @@
+import datetime
+import http.client
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urlencode, urlsplit
+
+from typhoon_registry import normalize_query, place_key
+from typhoon_trace import tracer
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "Typhoon Weather App (https://github.com/archisman-panigrahi/typhoon)"
+
+# Upstream services can be pointed at a local stand-in server for testing.
+OPEN_METEO_URL = os.environ.get(
+    "TYPHOON_OPEN_METEO_URL", "https://api.open-meteo.com/v1/forecast"
+)
+NOMINATIM_URL = os.environ.get(
+    "TYPHOON_NOMINATIM_URL", "https://nominatim.openstreetmap.org/search"
+)
+
+# Nominatim's usage policy allows at most one request per second.
+NOMINATIM_MIN_INTERVAL = 1.0
+
+# Current, hourly and daily variables are requested together so that one
+# forecast request serves a whole refresh.
+FORECAST_QUERY = {
+    "current_weather": "true",
+    "temperature_unit": "fahrenheit",
+    "wind_speed_unit": "mph",
+    "timezone": "auto",
+    "hourly": "temperature_2m,relative_humidity_2m,apparent_temperature,"
+    "precipitation_probability,wind_direction_10m",
+    "daily": "temperature_2m_min,temperature_2m_max,weathercode",
+}
+
+# Open-Meteo serves up to 16 days; without forecast_days it sends 7.
+DEFAULT_FORECAST_DAYS = 7
+MAX_FORECAST_DAYS = 16
+# The page's week row always has this many columns.
+MIN_DAILY_DAYS = 4
+# How long a request waits for another one already fetching its location.
+IN_FLIGHT_WAIT_S = 30
+# How long shutdown waits for running requests to store their results.
+SHUTDOWN_WAIT_S = 3
+
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+
+class FetchError(Exception):
+    pass
+
+
+def forecast_days(value):
+    """Clamp a requested horizon to what Open-Meteo serves."""
+    try:
+        days = int(value)
+    except (TypeError, ValueError):
+        return DEFAULT_FORECAST_DAYS
+    return max(1, min(MAX_FORECAST_DAYS, days))
+
+
+def build_entry(place, forecast, days=DEFAULT_FORECAST_DAYS):
+    """Shape one Open-Meteo result into the cache entry displayed by the page.
+
+    The hourly forecast covers ``days`` days from the current hour, or up
+    to Open-Meteo's last hour at the 16-day limit. It is kept compact: the first hour plus one value per hour for each series.
+    """
+    current = forecast.get("current_weather")
+    hourly = forecast.get("hourly")
+    daily = forecast.get("daily")
+    if not current or not hourly or not daily:
+        logger.error("Unexpected API response for %s", place.get("display_name"))
+        return None
+
+    current = dict(current)
+    times = hourly.get("time", [])
+    current_hour = str(current.get("time", ""))[:13] + ":00"
+    index = next((i for i, hour in enumerate(times) if hour == current_hour), -1)
+    if index == -1:
+        index = next((i for i, hour in enumerate(times) if hour >= current_hour), -1)
+
+    if index != -1:
+        rain = hourly["precipitation_probability"]
+        # Rain chance is the worst of the previous, current and next five hours.
+        window = [value for value in rain[max(0, index - 1):index + 6] if value is not None]
+        current["rain_percentage"] = max(window) if window else 0
+        current["relative_humidity_2m"] = hourly["relative_humidity_2m"][index]
+        current["feels_like"] = hourly["apparent_temperature"][index]
+        current["wind_direction_10m"] = hourly["wind_direction_10m"][index]
+        end = index + days * 24
+        current["hourly_forecast"] = {
+            "start": times[index],
+            "rain": rain[index:end],
+            "temperature": [
+                None if value is None else round(value, 1)
+                for value in hourly["temperature_2m"][index:end]
+            ],
+        }
+    else:
+        logger.error("No matching time found in hourly data")
+
+    weekly = [
+        {
+            "day": WEEKDAYS[datetime.date.fromisoformat(day).weekday()],
+            "tempMin": daily["temperature_2m_min"][i],
+            "tempMax": daily["temperature_2m_max"][i],
+            "icon": daily["weathercode"][i],
+        }
+        for i, day in enumerate(daily.get("time", [])[:max(days, MIN_DAILY_DAYS)])
+    ]
+    return {"currentWeather": current, "locationData": place, "weeklyData": weekly}
+
+
+class ConnectionPool:
+    """Keep-alive HTTP(S) connections, pooled per scheme and host."""
+
+    def __init__(self, max_idle_per_host=2, timeout=10):
+        self.max_idle_per_host = max_idle_per_host
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._idle = {}
+
+    def _new_connection(self, scheme, netloc):
+        if scheme == "https":
+            return http.client.HTTPSConnection(netloc, timeout=self.timeout)
+        if scheme == "http":
+            return http.client.HTTPConnection(netloc, timeout=self.timeout)
+        raise FetchError(f"Unsupported URL scheme: {scheme}")
+
+    def _acquire(self, key):
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop(), True
+        return self._new_connection(*key), False
+
+    def _release(self, key, conn):
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def get(self, url, headers=None):
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+        request_headers = {"User-Agent": USER_AGENT, "Accept": "application/json"}
+        if headers:
+            request_headers.update(headers)
+
+        while True:
+            conn, reused = self._acquire(key)
+            try:
+                conn.request("GET", target, headers=request_headers)
+                response = conn.getresponse()
+                body = response.read()
+            except (http.client.HTTPException, OSError) as e:
+                conn.close()
+                if reused:
+                    # The server dropped an idle keep-alive connection; retry
+                    # once more on another (possibly fresh) connection.
+                    continue
+                raise FetchError(f"Request to {parts.netloc} failed: {e}") from e
+
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(key, conn)
+            return response.status, body
+
+    def close(self):
+        with self._lock:
+            connections = [conn for idle in self._idle.values() for conn in idle]
+            self._idle.clear()
+        for conn in connections:
+            conn.close()
+
+
+class FetchEngine:
+    """Runs upstream requests on worker threads over a shared connection pool."""
+
+    def __init__(self, registry=None, store=None, pool=None, max_workers=4):
+        self.registry = registry
+        self.store = store
+        self.pool = pool or ConnectionPool()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="typhoon-fetch"
+        )
+        self._geocode_lock = threading.Lock()
+        self._last_geocode = 0.0
+        # Queries with no match, when there is no registry to remember them.
+        self._misses = set()
+        self._in_flight_lock = threading.Lock()
+        self._in_flight = {}
+        self._futures = set()
+
+    def submit(self, function, *args):
+        future = self._executor.submit(function, *args)
+        self._futures.add(future)
+        future.add_done_callback(self._futures.discard)
+        return future
+
+    def get_json(self, url, params):
+        parts = urlsplit(url)
+        url = f"{url}?{urlencode(params)}"
+        logger.info("Fetching %s", url)
+        with tracer.span(f"GET {parts.netloc}{parts.path}", "network"):
+            status, body = self.pool.get(url)
+        if not 200 <= status < 300:
+            raise FetchError(f"{parts.netloc} returned HTTP {status}")
+        try:
+            return json.loads(body.decode("utf-8"))
+        except ValueError as e:
+            # Covers JSONDecodeError and UnicodeDecodeError alike.
+            raise FetchError(f"{parts.netloc} returned an invalid response: {e}") from e
+
+    def _is_miss(self, query):
+        if self.registry is not None:
+            return self.registry.is_miss(query)
+        return normalize_query(query) in self._misses
+
+    @tracer.traced("geocode", "network")
+    def geocode(self, query):
+        if self.registry is not None:
+            place = self.registry.lookup(query)
+            if place is not None:
+                return place
+        if self._is_miss(query):
+            return None
+
+        with self._geocode_lock:
+            if self.registry is not None:
+                # Another worker may have resolved it while we waited.
+                place = self.registry.lookup(query)
+                if place is not None:
+                    return place
+            if self._is_miss(query):
+                return None
+            wait = NOMINATIM_MIN_INTERVAL - (time.monotonic() - self._last_geocode)
+            if wait > 0:
+                time.sleep(wait)
+            try:
+                results = self.get_json(
+                    NOMINATIM_URL, {"q": query, "format": "jsonv2", "limit": 1}
+                )
+            finally:
+                self._last_geocode = time.monotonic()
+
+        if not results:
+            logger.info("Nominatim found no match for %r", query)
+            if self.registry is not None:
+                self.registry.register_miss(query)
+            else:
+                self._misses.add(normalize_query(query))
+            return None
+        data = results[0]
+        name = data.get("name") or str(data.get("display_name", "")).split(",")[0].strip()
+        place = {
+            "name": name,
+            "display_name": data.get("display_name", name),
+            "lat": float(data["lat"]),
+            "lon": float(data["lon"]),
+        }
+        if self.registry is None:
+            return place
+        return self.registry.register(query, place)
+
+    def forecast(self, places, days=DEFAULT_FORECAST_DAYS):
+        params = dict(FORECAST_QUERY)
+        # Hourly data starts at local midnight, so one extra day keeps a full
+        # ``days * 24`` hours after the current hour. At Open-Meteo's 16-day
+        # limit the hourly series ends a little short of the horizon instead.
+        params["forecast_days"] = min(MAX_FORECAST_DAYS, max(days, MIN_DAILY_DAYS) + 1)
+        params["latitude"] = ",".join(str(place["lat"]) for place in places)
+        params["longitude"] = ",".join(str(place["lon"]) for place in places)
+        data = self.get_json(OPEN_METEO_URL, params)
+        forecasts = data if isinstance(data, list) else [data]
+        if len(forecasts) != len(places):
+            raise FetchError("Open-Meteo returned an unexpected number of locations")
+        return forecasts
+
+    @tracer.traced("refresh weather", "network")
+    def weather(self, queries, stale_only=False, days=DEFAULT_FORECAST_DAYS):
+        """Refresh locations with one forecast request and store the results.
+
+        With ``stale_only``, locations that already have a fresh cache entry
+        are left out of the request. ``days`` is the forecast horizon.
+        Locations another request is already fetching are not requested
+        again; that request's results are shared once it is done.
+        """
+        days = forecast_days(days)
+        if stale_only and self.store is not None:
+            queries = [query for query in queries if not self.store.is_fresh(query)]
+        queries = list(dict.fromkeys(queries))
+        owned, waiting = [], {}
+        with self._in_flight_lock:
+            for query in queries:
+                if query in self._in_flight:
+                    waiting[query] = self._in_flight[query]
+                else:
+                    self._in_flight[query] = {"done": threading.Event(), "result": None}
+                    owned.append(query)
+        results = {}
+        try:
+            for item in self._fetch_weather(owned, days):
+                results[item["query"]] = item
+                self._in_flight[item["query"]]["result"] = item
+        finally:
+            with self._in_flight_lock:
+                for query in owned:
+                    self._in_flight.pop(query)["done"].set()
+
+        for query, other in waiting.items():
+            other["done"].wait(IN_FLIGHT_WAIT_S)
+            # No result means the other request failed.
+            results[query] = other["result"] or {
+                "query": query, "entry": None, "timestamp": int(time.time() * 1000)
+            }
+        return {"locations": [results[query] for query in queries]}
+
+    def _try_geocode(self, query):
+        """Geocode one query of a batch; a failure only drops that query."""
+        try:
+            return self.geocode(query)
+        except (FetchError, KeyError, TypeError, ValueError) as e:
+            logger.warning("Could not geocode %r: %s", query, e)
+            return None
+
+    def _fetch_weather(self, queries, days):
+        if not queries:
+            return []
+        places = [self._try_geocode(query) for query in queries]
+        # Spellings of the same place share one slot in the request.
+        unique = {}
+        for place in places:
+            if place is not None:
+                unique.setdefault(place_key(place["lat"], place["lon"]), place)
+        forecasts = (
+            dict(zip(unique, self.forecast(list(unique.values()), days))) if unique else {}
+        )
+
+        results = []
+        for query, place in zip(queries, places):
+            entry = None
+            fetched_at = time.time()
+            if place is not None:
+                forecast = forecasts[place_key(place["lat"], place["lon"])]
+                entry = build_entry(place, forecast, days)
+            else:
+                logger.info("No location found for %r", query)
+            if entry is not None and self.store is not None:
+                fetched_at = self.store.put(query, entry)
+            results.append(
+                {"query": query, "entry": entry, "timestamp": int(fetched_at * 1000)}
+            )
+        if self.store is not None:
+            self.store.evict()
+        return results
+
+    def cached(self, location):
+        cached = self.store.get(location) if self.store is not None else None
+        if cached is None:
+            return None
+        entry, fetched_at = cached
+        return {"entry": entry, "timestamp": int(fetched_at * 1000)}
+
+    def forget(self, location):
+        if self.store is not None:
+            self.store.delete(location)
+
+    def handle(self, endpoint, params):
+        """Answer a typhoon-api:// request and return the JSON body."""
+        values = {}
+        for key, value in params:
+            values.setdefault(key, []).append(value)
+
+        def first(key):
+            return (values.get(key) or [""])[0]
+
+        if endpoint == "/weather":
+            result = self.weather(
+                values.get("location", []),
+                stale_only=first("stale_only") == "1",
+                days=first("days") or DEFAULT_FORECAST_DAYS,
+            )
+        elif endpoint == "/cache":
+            result = self.cached(first("location"))
+        elif endpoint == "/geocode":
+            query = first("q")
+            result = self.geocode(query) if query.strip() else None
+        else:
+            raise FetchError(f"Unknown API endpoint: {endpoint}")
+        return json.dumps(result).encode("utf-8")
+
+    def shutdown(self):
+        """Drop queued requests and let running ones finish before closing.
+
+        The pool and store are only closed once no worker can still use
+        them; a request still running after SHUTDOWN_WAIT_S keeps them open
+        and its result is lost with the process.
+        """
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        _, running = wait(list(self._futures), timeout=SHUTDOWN_WAIT_S)
+        if running:
+            logger.warning("Exiting with %d weather requests still running", len(running))
+            return
+        self.pool.close()
+        if self.store is not None:
+            self.store.close()
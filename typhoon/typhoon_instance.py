@@ -0,0 +1,67 @@
+# Single-instance handoff. A second launch sends its arguments to the
+# running instance over a local socket (a named pipe on Windows) and exits.
+# This side uses only the standard library so that a launch that is handed
+# off never loads Qt; the listening end is a QLocalServer in typhoon_window.
+
+import getpass
+import json
+import logging
+import os
+import socket
+import tempfile
+
+from typhoon_settings import APP_ID, IS_WINDOWS
+
+logger = logging.getLogger(__name__)
+
+WINDOWS_PIPE_PREFIX = "\\\\.\\pipe\\"
+CONNECT_TIMEOUT_S = 1.0
+
+
+def instance_address():
+    """Return the QLocalServer name the running instance listens on."""
+    if IS_WINDOWS:
+        return f"{APP_ID}-{getpass.getuser()}"
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return os.path.join(runtime_dir, f"{APP_ID}.sock")
+    return os.path.join(tempfile.gettempdir(), f"{APP_ID}-{os.getuid()}.sock")
+
+
+def encode_message(args):
+    message = {"args": list(args)}
+    # Lets the running instance take focus on Wayland.
+    token = os.environ.get("XDG_ACTIVATION_TOKEN")
+    if token:
+        message["activationToken"] = token
+    return json.dumps(message).encode("utf-8") + b"\n"
+
+
+def decode_message(data):
+    try:
+        message = json.loads(data.decode("utf-8"))
+    except (UnicodeDecodeError, ValueError):
+        return None
+    if not isinstance(message, dict) or not isinstance(message.get("args", []), list):
+        return None
+    return message
+
+
+def forward_to_running_instance(args):
+    """Send ``args`` to a running instance; return False if there is none."""
+    message = encode_message(args)
+    address = instance_address()
+    try:
+        if IS_WINDOWS:
+            with open(WINDOWS_PIPE_PREFIX + address, "wb", buffering=0) as pipe:
+                pipe.write(message)
+        else:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+                connection.settimeout(CONNECT_TIMEOUT_S)
+                connection.connect(address)
+                connection.sendall(message)
+    except OSError:
+        # Nothing listening, or a socket left behind by a crashed instance.
+        return False
+    logger.info("Handed off to the running instance")
+    return True
@@ -0,0 +1,56 @@
+# Optional backends are imported on first use rather than at start-up:
+# dbus-python, PyGObject typelibs, numpy and cairosvg together take longer
+# to import than it takes to show the window, and many runs never touch
+# some of them. Each loader returns None when the backend is unavailable
+# and remembers the outcome, so failed imports are not retried.
+
+import functools
+import importlib
+import logging
+
+from typhoon_settings import IS_WINDOWS
+from typhoon_trace import tracer
+
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=None)
+def optional_module(name):
+    """Import the module ``name``, or return None if that fails."""
+    try:
+        with tracer.span(f"import {name}", "startup"):
+            return importlib.import_module(name)
+    except Exception as e:
+        logger.debug("Optional module %s unavailable: %s", name, e)
+        return None
+
+
+@functools.lru_cache(maxsize=None)
+def load_dbus():
+    """Return dbus-python with its GLib main loop and service support."""
+    if IS_WINDOWS:
+        return None
+    dbus = optional_module("dbus")
+    if dbus is None:
+        return None
+    if optional_module("dbus.mainloop.glib") is None or optional_module("dbus.service") is None:
+        return None
+    return dbus
+
+
+@functools.lru_cache(maxsize=None)
+def load_gi(namespace, version=None):
+    """Return the ``gi.repository`` module for a typelib, or None."""
+    if IS_WINDOWS:
+        return None
+    gi = optional_module("gi")
+    if gi is None:
+        return None
+    try:
+        if version is not None:
+            gi.require_version(namespace, version)
+        with tracer.span(f"import gi.repository.{namespace}", "startup"):
+            return importlib.import_module(f"gi.repository.{namespace}")
+    except Exception as e:
+        logger.debug("Typelib %s unavailable: %s", namespace, e)
+        return None
@@ -0,0 +1,25 @@
+#!/usr/bin/python3
+
+# Launcher. `--print` answers from the weather cache, and when Typhoon is
+# already running the arguments are handed to it; either way this process
+# exits before Qt or QtWebEngine are imported.
+
+import sys
+
+from typhoon_instance import forward_to_running_instance
+
+
+def main():
+    if "--print" in sys.argv[1:]:
+        import typhoon_cli
+
+        sys.exit(typhoon_cli.main(sys.argv[1:]))
+    if forward_to_running_instance(sys.argv[1:]):
+        return
+    import typhoon_window
+
+    typhoon_window.main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# How long a query Nominatim could not resolve is answered from the registry
+# before it is looked up again.
+MISS_TTL_S = 24 * 60 * 60
+
+
+def normalize_query(query):
+    return " ".join(str(query).split()).casefold()
+
+
+def place_key(lat, lon):
+    return f"{float(lat):.4f},{float(lon):.4f}"
+
+
+class LocationRegistry:
+    """Permanent map from saved location strings to canonical coordinates.
+
+    Places are deduplicated by coordinates, so different spellings that
+    geocode to the same spot share one entry. Queries with no match are
+    remembered for ``MISS_TTL_S`` so they are not looked up on every refresh.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._aliases = {}
+        self._places = {}
+        self._misses = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+            self._aliases = dict(data.get("aliases", {}))
+            self._places = dict(data.get("places", {}))
+            self._misses = dict(data.get("misses", {}))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning("Could not read location registry: %s", e)
+
+    def _save(self):
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(
+                {"aliases": self._aliases, "places": self._places, "misses": self._misses},
+                file,
+                ensure_ascii=False,
+                indent=1,
+            )
+        os.replace(temp_path, self.path)
+
+    def lookup(self, query):
+        with self._lock:
+            key = self._aliases.get(normalize_query(query))
+            place = self._places.get(key) if key else None
+            return dict(place) if place else None
+
+    def register(self, query, place):
+        key = place_key(place["lat"], place["lon"])
+        with self._lock:
+            canonical = self._places.setdefault(key, place)
+            self._aliases[normalize_query(query)] = key
+            self._misses.pop(normalize_query(query), None)
+            self._save_quietly()
+            return dict(canonical)
+
+    def is_miss(self, query):
+        with self._lock:
+            missed_at = self._misses.get(normalize_query(query))
+            return missed_at is not None and time.time() - missed_at < MISS_TTL_S
+
+    def register_miss(self, query):
+        now = time.time()
+        with self._lock:
+            self._misses = {
+                key: missed_at
+                for key, missed_at in self._misses.items()
+                if now - missed_at < MISS_TTL_S
+            }
+            self._misses[normalize_query(query)] = now
+            self._save_quietly()
+
+    def _save_quietly(self):
+        try:
+            self._save()
+        except OSError as e:
+            logger.warning("Could not save location registry: %s", e)
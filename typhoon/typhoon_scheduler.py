@@ -0,0 +1,411 @@
+import logging
+import os
+import random
+import time
+
+try:
+    from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+except ImportError:
+    from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from typhoon_lazy import load_dbus, optional_module
+from typhoon_settings import IS_WINDOWS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REFRESH_MS = 20 * 60 * 1000
+MIN_REFRESH_MS = 5 * 60 * 1000
+MAX_REFRESH_MS = 2 * 60 * 60 * 1000
+# Precipitation chances (%) above/below which the cadence doubles/halves.
+WET_RAIN_PERCENTAGE = 60
+CALM_RAIN_PERCENTAGE = 10
+STORM_CODES = range(95, 100)
+# Open-Meteo publishes new model runs shortly after the top of each hour.
+MODEL_UPDATE_PERIOD_S = 3600
+MODEL_UPDATE_OFFSET_S = 5 * 60
+RETRY_BASE_MS = 30 * 1000
+RETRY_MAX_MS = 30 * 60 * 1000
+# Random spread added to each delay so idle desktops don't fetch in lockstep.
+JITTER_MS = 60 * 1000
+BATTERY_FACTOR = 2
+POWER_SUPPLY_DIR = "/sys/class/power_supply"
+# How often the power source is re-read where UPower can't report changes.
+POWER_POLL_MS = 5 * 60 * 1000
+
+# These all live on the system bus; point DBUS_SYSTEM_BUS_ADDRESS at a private
+# bus to try them against stand-in services.
+LOGIND_BUS_NAME = "org.freedesktop.login1"
+LOGIND_PATH = "/org/freedesktop/login1"
+LOGIND_INTERFACE = "org.freedesktop.login1.Manager"
+UPOWER_BUS_NAME = "org.freedesktop.UPower"
+UPOWER_PATH = "/org/freedesktop/UPower"
+UPOWER_INTERFACE = "org.freedesktop.UPower"
+NM_BUS_NAME = "org.freedesktop.NetworkManager"
+NM_PATH = "/org/freedesktop/NetworkManager"
+NM_INTERFACE = "org.freedesktop.NetworkManager"
+PROPERTIES_INTERFACE = "org.freedesktop.DBus.Properties"
+# NMConnectivityState; UNKNOWN also covers connectivity checking being off.
+NM_CONNECTIVITY_UNKNOWN = 0
+NM_CONNECTIVITY_FULL = 4
+
+
+def on_battery_power():
+    """Return True when the machine reports running from a battery."""
+    if IS_WINDOWS:
+        ctypes = optional_module("ctypes")
+        if ctypes is None or optional_module("ctypes.wintypes") is None:
+            return False
+
+        class SYSTEM_POWER_STATUS(ctypes.Structure):
+            _fields_ = [
+                ("ACLineStatus", ctypes.c_ubyte),
+                ("BatteryFlag", ctypes.c_ubyte),
+                ("BatteryLifePercent", ctypes.c_ubyte),
+                ("SystemStatusFlag", ctypes.c_ubyte),
+                ("BatteryLifeTime", ctypes.wintypes.DWORD),
+                ("BatteryFullLifeTime", ctypes.wintypes.DWORD),
+            ]
+
+        status = SYSTEM_POWER_STATUS()
+        try:
+            if not ctypes.windll.kernel32.GetSystemPowerStatus(ctypes.byref(status)):
+                return False
+        except Exception:
+            return False
+        return status.ACLineStatus == 0
+
+    # Any online mains/USB supply means we're plugged in; a discharging
+    # battery with no such supply means we're not.
+    discharging = False
+    try:
+        supplies = [os.path.join(POWER_SUPPLY_DIR, name) for name in os.listdir(POWER_SUPPLY_DIR)]
+    except OSError:
+        return False
+    for supply in supplies:
+        try:
+            with open(os.path.join(supply, "type"), "r", encoding="utf-8") as file:
+                kind = file.read().strip()
+            if kind == "Battery":
+                with open(os.path.join(supply, "status"), "r", encoding="utf-8") as file:
+                    discharging = discharging or file.read().strip() == "Discharging"
+            else:
+                with open(os.path.join(supply, "online"), "r", encoding="utf-8") as file:
+                    if file.read().strip() == "1":
+                        return False
+        except OSError:
+            continue
+    return discharging
+
+
+def refresh_interval(entry, base_ms, on_battery=False):
+    """Return how long ``entry`` can be shown before it is worth refetching."""
+    interval = base_ms
+    current = (entry or {}).get("currentWeather") or {}
+    try:
+        rain = float(current.get("rain_percentage") or 0)
+    except (TypeError, ValueError):
+        rain = 0
+    try:
+        code = int(current.get("weathercode"))
+    except (TypeError, ValueError):
+        code = None
+    if rain >= WET_RAIN_PERCENTAGE or code in STORM_CODES:
+        interval //= 2
+    elif entry and rain <= CALM_RAIN_PERCENTAGE and (code is None or code < 50):
+        interval *= 2
+    if on_battery:
+        interval *= BATTERY_FACTOR
+    return max(MIN_REFRESH_MS, min(MAX_REFRESH_MS, interval))
+
+
+def align_to_model_update(now, delay_ms):
+    """Move a refresh due in ``delay_ms`` onto the nearest model update.
+
+    The refresh is only moved when an update falls within a quarter of the
+    delay either side, so short intervals are left alone.
+    """
+    target = now + delay_ms / 1000
+    period, offset = MODEL_UPDATE_PERIOD_S, MODEL_UPDATE_OFFSET_S
+    previous = (target - offset) // period * period + offset
+    for update in (previous, previous + period):
+        if update > now and abs(update - target) <= delay_ms / 4000:
+            return int((update - now) * 1000)
+    return delay_ms
+
+
+def retry_delay(failures):
+    return min(RETRY_MAX_MS, RETRY_BASE_MS * 2 ** max(0, failures - 1))
+
+
+class RefreshScheduler(QObject):
+    """Decides when the host refetches the weather.
+
+    The cadence follows the latest forecast (see ``refresh_interval``), backs
+    off exponentially after failures and is suspended while nothing shows
+    the weather, while offline and during system sleep. ``due`` is emitted
+    when the owner should refresh; it must then report back with
+    ``succeeded(entry)`` or ``failed()``.
+    """
+
+    due = pyqtSignal()
+    # Age (ms) past which the weather is overdue for a refresh; see overdue_after_ms().
+    overdue_after_changed = pyqtSignal(int)
+
+    def __init__(self, parent=None, base_ms=DEFAULT_REFRESH_MS):
+        super().__init__(parent)
+        self.base_ms = base_ms
+        self._active = False
+        self._online = True
+        self._sleeping = False
+        self._on_battery = False
+        self._in_flight = False
+        # A refresh asked for over D-Bus, which runs even while inactive.
+        self._requested = False
+        self._failures = 0
+        self._entry = None
+        self._last_success = None
+        self._overdue_after_ms = None
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._fire)
+
+    @property
+    def active(self):
+        return self._active
+
+    def set_base_interval(self, base_ms):
+        try:
+            base_ms = int(base_ms)
+        except (TypeError, ValueError):
+            return
+        if base_ms > 0 and base_ms != self.base_ms:
+            self.base_ms = base_ms
+            self._schedule()
+
+    def set_active(self, active):
+        """Start or stop refreshing; restarting refreshes at once if overdue."""
+        if active != self._active:
+            self._active = active
+            self._resume_or_pause()
+
+    def set_online(self, online):
+        if online != self._online:
+            self._online = online
+            logger.info("Network %s", "connected" if online else "disconnected")
+            self._resume_or_pause()
+
+    def set_sleeping(self, sleeping):
+        if sleeping != self._sleeping:
+            self._sleeping = sleeping
+            logger.info("System %s", "going to sleep" if sleeping else "resumed")
+            self._resume_or_pause()
+
+    def set_on_battery(self, on_battery):
+        if on_battery != self._on_battery:
+            self._on_battery = on_battery
+            logger.info("Running on %s power", "battery" if on_battery else "mains")
+            self._schedule()
+
+    def _running(self):
+        return self._active and self._online and not self._sleeping
+
+    def _resume_or_pause(self):
+        if not self._running():
+            self._requested = False
+            self._timer.stop()
+            return
+        # One refresh covers everything missed while paused; the timer is
+        # single-shot, so bursts of state changes still fire it once.
+        if self._failures or self.is_stale():
+            self._timer.start(0)
+        else:
+            self._schedule()
+
+    def restore(self, entry, fetched_at):
+        """Start from weather fetched earlier, e.g. by a previous run."""
+        self._entry = entry
+        self._last_success = fetched_at
+
+    def postpone(self):
+        """Restart the wait, e.g. after the page fetched on its own."""
+        self._last_success = time.time()
+        self._requested = False
+        self._schedule()
+
+    def refresh_now(self):
+        if self._running() and not self._in_flight:
+            self._timer.start(0)
+
+    def request_refresh(self):
+        """Refresh for another program; return False if the data is recent.
+
+        Joins a refresh that is already running, and refuses while offline,
+        asleep or within MIN_REFRESH_MS of the last refresh.
+        """
+        if self._in_flight or self._requested:
+            return True
+        if not self._online or self._sleeping:
+            return False
+        if self._last_success is not None and (
+            (time.time() - self._last_success) * 1000 < MIN_REFRESH_MS
+        ):
+            return False
+        self._requested = True
+        self._timer.start(0)
+        return True
+
+    def refresh_if_stale(self):
+        if self.is_stale():
+            self.refresh_now()
+
+    def is_stale(self):
+        # Wall-clock time, as the monotonic clock stops while suspended.
+        if self._last_success is None:
+            return True
+        age_ms = (time.time() - self._last_success) * 1000
+        return age_ms >= self._interval()
+
+    def succeeded(self, entry):
+        self._in_flight = False
+        self._requested = False
+        self._failures = 0
+        self._entry = entry
+        self._last_success = time.time()
+        self._schedule()
+
+    def failed(self):
+        self._in_flight = False
+        self._requested = False
+        self._failures += 1
+        if self._running():
+            delay = retry_delay(self._failures)
+            logger.info("Weather refresh failed; retrying in %d s", delay // 1000)
+            self._timer.start(delay)
+
+    def _interval(self):
+        return refresh_interval(self._entry, self.base_ms, self._on_battery)
+
+    def overdue_after_ms(self):
+        """Age past which weather means a refresh is late, not just pending.
+
+        Covers the current interval plus the most that model-update
+        alignment and jitter can add to it.
+        """
+        return int(self._interval() * 1.25) + JITTER_MS
+
+    def _schedule(self):
+        overdue_after = self.overdue_after_ms()
+        if overdue_after != self._overdue_after_ms:
+            self._overdue_after_ms = overdue_after
+            self.overdue_after_changed.emit(overdue_after)
+        if not self._running() or self._in_flight or self._requested:
+            return
+        delay = self._interval()
+        if self._last_success is not None:
+            delay -= int((time.time() - self._last_success) * 1000)
+        delay = align_to_model_update(time.time(), max(0, delay))
+        delay += random.randint(0, JITTER_MS)
+        logger.debug("Next weather refresh in %d s", delay // 1000)
+        self._timer.start(delay)
+
+    def _fire(self):
+        if not (self._running() or self._requested) or self._in_flight:
+            return
+        self._in_flight = True
+        self.due.emit()
+
+
+class SystemWatcher(QObject):
+    """Reports system sleep (logind), connectivity (NetworkManager) and the
+    power source (UPower, or a slow poll of on_battery_power()).
+    """
+
+    sleeping_changed = pyqtSignal(bool)
+    online_changed = pyqtSignal(bool)
+    on_battery_changed = pyqtSignal(bool)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.online = True
+        self.on_battery = False
+        self._power_timer = QTimer(self)
+        self._power_timer.setInterval(POWER_POLL_MS)
+        self._power_timer.timeout.connect(self._poll_power)
+
+    def start(self):
+        self._poll_power()
+        self._power_timer.start()
+        dbus = load_dbus()
+        if dbus is None:
+            return
+        try:
+            dbus.mainloop.glib.DBusGMainLoop(set_as_default=True)
+            bus = dbus.SystemBus()
+        except Exception as e:
+            logger.warning("Could not connect to the system bus: %s", e)
+            return
+        try:
+            bus.add_signal_receiver(
+                self._on_prepare_for_sleep,
+                signal_name="PrepareForSleep",
+                dbus_interface=LOGIND_INTERFACE,
+                bus_name=LOGIND_BUS_NAME,
+                path=LOGIND_PATH,
+            )
+        except Exception as e:
+            logger.warning("Could not watch logind for sleep: %s", e)
+        try:
+            bus.add_signal_receiver(
+                self._on_properties_changed,
+                signal_name="PropertiesChanged",
+                dbus_interface=PROPERTIES_INTERFACE,
+                bus_name=NM_BUS_NAME,
+                path=NM_PATH,
+            )
+            manager = bus.get_object(NM_BUS_NAME, NM_PATH, introspect=False)
+            # Asynchronous so that a missing NetworkManager can't stall startup.
+            manager.Get(
+                NM_INTERFACE,
+                "Connectivity",
+                dbus_interface=PROPERTIES_INTERFACE,
+                reply_handler=self._set_connectivity,
+                error_handler=self._on_connectivity_error,
+            )
+        except Exception as e:
+            logger.warning("Could not watch NetworkManager connectivity: %s", e)
+        try:
+            bus.add_signal_receiver(
+                self._on_properties_changed,
+                signal_name="PropertiesChanged",
+                dbus_interface=PROPERTIES_INTERFACE,
+                bus_name=UPOWER_BUS_NAME,
+                path=UPOWER_PATH,
+            )
+        except Exception as e:
+            logger.warning("Could not watch UPower for the power source: %s", e)
+
+    def _on_prepare_for_sleep(self, sleeping):
+        self.sleeping_changed.emit(bool(sleeping))
+
+    def _on_properties_changed(self, interface, changed, invalidated):
+        if interface == NM_INTERFACE and "Connectivity" in changed:
+            self._set_connectivity(changed["Connectivity"])
+        elif interface == UPOWER_INTERFACE and "OnBattery" in changed:
+            self._set_on_battery(bool(changed["OnBattery"]))
+
+    def _poll_power(self):
+        self._set_on_battery(on_battery_power())
+
+    def _set_on_battery(self, on_battery):
+        if on_battery != self.on_battery:
+            self.on_battery = on_battery
+            self.on_battery_changed.emit(on_battery)
+
+    def _set_connectivity(self, state):
+        online = int(state) in (NM_CONNECTIVITY_UNKNOWN, NM_CONNECTIVITY_FULL)
+        if online != self.online:
+            self.online = online
+            self.online_changed.emit(online)
+
+    def _on_connectivity_error(self, error):
+        logger.info("NetworkManager connectivity unavailable: %s", error)
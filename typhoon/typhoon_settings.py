@@ -0,0 +1,139 @@
+import copy
+import json
+import logging
+import os
+import sys
+import threading
+
+logger = logging.getLogger(__name__)
+
+IS_WINDOWS = sys.platform.startswith("win")
+APP_ID = "io.github.archisman_panigrahi.typhoon"
+
+# Files written by older versions; imported into settings.json once.
+LEGACY_SIZE_FILE = "typhoon_size_qt.conf"
+LEGACY_POSITION_FILE = "typhoon_position_qt.conf"
+
+_config_dir = None
+
+
+def get_config_dir():
+    """Return the app's config directory, creating it on first use."""
+    global _config_dir
+    if _config_dir is None:
+        if IS_WINDOWS:
+            base = os.getenv("APPDATA", os.path.expanduser("~"))
+        else:
+            base = os.getenv("XDG_CONFIG_HOME", os.path.expanduser("~/.config"))
+        path = os.path.join(base, APP_ID)
+        os.makedirs(path, exist_ok=True)
+        _config_dir = path
+    return _config_dir
+
+
+def _read_legacy_pair(path, separator):
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            first, second = file.read().strip().split(separator)
+            return int(first), int(second)
+    except (OSError, ValueError):
+        return None
+
+
+class SettingsStore:
+    """App settings kept in memory and persisted to a single JSON file.
+
+    Updates only mark the store dirty and call ``on_change``; the owner
+    decides when to ``flush()``, which writes the whole file atomically.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.on_change = None
+        self._lock = threading.Lock()
+        self._data = {}
+        self._dirty = False
+        self._legacy_files = []
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+            if isinstance(data, dict):
+                self._data = data
+            return
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning("Could not read settings, starting afresh: %s", e)
+            return
+        self._import_legacy_files()
+
+    def _import_legacy_files(self):
+        directory = os.path.dirname(self.path)
+        window = {}
+        size_file = os.path.join(directory, LEGACY_SIZE_FILE)
+        size = _read_legacy_pair(size_file, "x")
+        if size:
+            window["width"], window["height"] = size
+        position_file = os.path.join(directory, LEGACY_POSITION_FILE)
+        position = _read_legacy_pair(position_file, ",")
+        if position:
+            window["x"], window["y"] = position
+        if window:
+            self._data["window"] = window
+            self._dirty = True
+        self._legacy_files = [
+            path for path in (size_file, position_file) if os.path.exists(path)
+        ]
+
+    @property
+    def dirty(self):
+        return self._dirty
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            return copy.deepcopy(self._data[key])
+
+    def set(self, key, value):
+        with self._lock:
+            if self._data.get(key) == value:
+                return False
+            self._data[key] = copy.deepcopy(value)
+            self._dirty = True
+        if self.on_change is not None:
+            self.on_change()
+        return True
+
+    def update(self, key, **values):
+        """Merge ``values`` into the dict stored under ``key``."""
+        section = self.get(key, {})
+        section.update(values)
+        return self.set(key, section)
+
+    def flush(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = json.dumps(self._data, indent=1, ensure_ascii=False)
+            self._dirty = False
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as file:
+                file.write(payload)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logger.warning("Could not save settings: %s", e)
+            with self._lock:
+                self._dirty = True
+            return
+
+        for path in self._legacy_files:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._legacy_files = []
@@ -0,0 +1,102 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS weather (
+    location TEXT PRIMARY KEY,
+    entry TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS weather_fetched_at ON weather (fetched_at);
+CREATE INDEX IF NOT EXISTS weather_accessed_at ON weather (accessed_at);
+"""
+
+
+class WeatherStore:
+    """Per-location weather cache in SQLite with expiry and LRU eviction.
+
+    Entries are fresh for ``ttl`` seconds and are still served, as stale
+    data to show while revalidating, until ``max_age``. Saving an entry is a
+    single-row upsert, so its cost does not depend on how many other
+    locations are cached.
+    """
+
+    def __init__(self, path, ttl=3600, max_age=2 * 24 * 3600, max_entries=32):
+        self.path = path
+        self.ttl = ttl
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+
+    def get(self, location):
+        """Return ``(entry, fetched_at)`` for an unexpired entry, or None.
+
+        The entry may be stale; compare ``fetched_at`` with ``ttl``.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT entry, fetched_at FROM weather WHERE location = ? AND fetched_at >= ?",
+                (location, now - self.max_age),
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute(
+                "UPDATE weather SET accessed_at = ? WHERE location = ?", (now, location)
+            )
+        try:
+            return json.loads(row[0]), row[1]
+        except ValueError:
+            logger.warning("Discarding unreadable cache entry for %s", location)
+            self.delete(location)
+            return None
+
+    def is_fresh(self, location):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT 1 FROM weather WHERE location = ? AND fetched_at >= ?",
+                (location, time.time() - self.ttl),
+            ).fetchone()
+        return row is not None
+
+    def put(self, location, entry, fetched_at=None):
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO weather (location, entry, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (location) DO UPDATE SET "
+                "entry = excluded.entry, fetched_at = excluded.fetched_at, "
+                "accessed_at = excluded.accessed_at",
+                (location, json.dumps(entry, separators=(",", ":")), fetched_at, fetched_at),
+            )
+        return fetched_at
+
+    def delete(self, location):
+        with self._lock:
+            self._db.execute("DELETE FROM weather WHERE location = ?", (location,))
+
+    def evict(self):
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM weather WHERE fetched_at < ?", (time.time() - self.max_age,)
+            )
+            self._db.execute(
+                "DELETE FROM weather WHERE location NOT IN "
+                "(SELECT location FROM weather ORDER BY accessed_at DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+
+    def close(self):
+        with self._lock:
+            self._db.close()
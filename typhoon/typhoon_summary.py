@@ -0,0 +1,170 @@
+# Mirrors what script.js derives from a weather entry for the tray icon,
+# launcher count and weather alerts, so the host can produce them without a
+# page loaded. Also shapes entries for `typhoon --print` and the D-Bus
+# weather interface.
+
+import math
+import time
+
+SNOW_CODES = (71, 73, 75, 77, 85, 86)
+FREEZING_RAIN_CODES = (66, 67)
+# Rain chance (%) that triggers an alert unless the user picked another.
+DEFAULT_NOTIFY_THRESHOLD = 35
+
+# WMO weather interpretation codes, as used by Open-Meteo.
+WEATHER_DESCRIPTIONS = {
+    0: "Clear",
+    1: "Mainly clear",
+    2: "Partly cloudy",
+    3: "Overcast",
+    45: "Fog",
+    48: "Rime fog",
+    51: "Light drizzle",
+    53: "Drizzle",
+    55: "Heavy drizzle",
+    56: "Freezing drizzle",
+    57: "Heavy freezing drizzle",
+    61: "Light rain",
+    63: "Rain",
+    65: "Heavy rain",
+    66: "Freezing rain",
+    67: "Heavy freezing rain",
+    71: "Light snow",
+    73: "Snow",
+    75: "Heavy snow",
+    77: "Snow grains",
+    80: "Light showers",
+    81: "Showers",
+    82: "Violent showers",
+    85: "Snow showers",
+    86: "Heavy snow showers",
+    95: "Thunderstorm",
+    96: "Thunderstorm with hail",
+    99: "Thunderstorm with heavy hail",
+}
+
+
+def convert_temperature(temp_f, unit):
+    if unit == "c":
+        return (temp_f - 32) * 5 / 9
+    if unit == "k":
+        return (temp_f - 32) * 5 / 9 + 273.15
+    return temp_f
+
+
+def display_temperature(temp_f, unit):
+    # Same as Math.round() in the page; round() would round halves to even.
+    return math.floor(convert_temperature(float(temp_f), unit) + 0.5)
+
+
+def tray_temperature(temp_f, unit):
+    value = display_temperature(temp_f, unit)
+    return f"{value}K" if unit == "k" else f"{value}°{unit.upper()}"
+
+
+def location_name(place):
+    name = place.get("name") if place else None
+    if name:
+        return name
+    display_name = place.get("display_name") if place else None
+    return display_name.split(",")[0] if display_name else "your area"
+
+
+def notify_threshold(preferences):
+    """Return the rain chance (%) the user chose for alerts."""
+    try:
+        return int(preferences.get("notifyThreshold", DEFAULT_NOTIFY_THRESHOLD))
+    except (TypeError, ValueError):
+        return DEFAULT_NOTIFY_THRESHOLD
+
+
+def weather_alert(entry, threshold=DEFAULT_NOTIFY_THRESHOLD):
+    """Return the alert the page would show for ``entry``, or None."""
+    current = entry.get("currentWeather") or {}
+    try:
+        code = int(current.get("weathercode"))
+    except (TypeError, ValueError):
+        code = None
+    try:
+        rain = round(float(current.get("rain_percentage") or 0))
+    except (TypeError, ValueError):
+        rain = 0
+    city = location_name(entry.get("locationData"))
+
+    if code is not None and 95 <= code <= 99:
+        return f"Thunderstorm warning for {city}. Precipitation chance {rain}%"
+    if code in SNOW_CODES:
+        return f"Snow expected ({rain}% chance) in {city}."
+    if code in FREEZING_RAIN_CODES:
+        return f"Freezing rain expected ({rain}% chance) in {city}."
+    if rain >= threshold:
+        return f"Rain expected ({rain}% chance) in {city}."
+    return None
+
+
+def current_conditions(
+    query, entry, fetched_at, fresh, unit, threshold=DEFAULT_NOTIFY_THRESHOLD
+):
+    """Return the fields of `typhoon --print --json` and D-Bus GetCurrent."""
+    current = entry.get("currentWeather") or {}
+    try:
+        code = int(current.get("weathercode"))
+    except (TypeError, ValueError):
+        code = None
+
+    def temperature(key):
+        value = current.get(key)
+        return None if value is None else display_temperature(value, unit)
+
+    return {
+        "query": query,
+        "location": location_name(entry.get("locationData")),
+        "temperature": temperature("temperature"),
+        "feels_like": temperature("feels_like"),
+        "unit": unit.upper(),
+        "text": "--" if current.get("temperature") is None
+        else tray_temperature(current["temperature"], unit),
+        "weathercode": code,
+        "description": WEATHER_DESCRIPTIONS.get(code, "Unknown"),
+        "is_day": bool(current.get("is_day", 1)),
+        "humidity": current.get("relative_humidity_2m"),
+        "wind_mph": current.get("windspeed"),
+        "wind_direction": current.get("wind_direction_10m"),
+        "rain_chance": current.get("rain_percentage"),
+        "alert": weather_alert(entry, threshold) or "",
+        "updated": int(fetched_at),
+        "age_minutes": int((time.time() - fetched_at) // 60),
+        "stale": not fresh,
+    }
+
+
+def hourly_forecast(entry, unit):
+    """Return the hourly temperatures and rain chances from the current hour."""
+    hourly = (entry.get("currentWeather") or {}).get("hourly_forecast") or {}
+    return {
+        "start": hourly.get("start"),
+        "unit": unit.upper(),
+        "temperature": [
+            None if value is None else round(convert_temperature(value, unit), 1)
+            for value in hourly.get("temperature") or []
+        ],
+        "rain_chance": list(hourly.get("rain") or []),
+    }
+
+
+def daily_forecast(entry, unit):
+    """Return the daily forecast with temperatures in ``unit``."""
+
+    def temperature(value):
+        return None if value is None else display_temperature(value, unit)
+
+    return [
+        {
+            "day": day.get("day"),
+            "min": temperature(day.get("tempMin")),
+            "max": temperature(day.get("tempMax")),
+            "weathercode": day.get("icon"),
+            "description": WEATHER_DESCRIPTIONS.get(day.get("icon"), "Unknown"),
+        }
+        for day in entry.get("weeklyData") or []
+    ]
@@ -0,0 +1,150 @@
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+HOST_PID = 1
+PAGE_PID = 2
+
+
+def trace_path_from(argv, environ):
+    """Return the file given by ``--trace FILE``, ``--trace=FILE`` or $TYPHOON_TRACE."""
+    for index, arg in enumerate(argv):
+        if arg == "--trace" and index + 1 < len(argv):
+            return argv[index + 1]
+        if arg.startswith("--trace="):
+            return arg.split("=", 1)[1]
+    return environ.get("TYPHOON_TRACE") or None
+
+
+class Tracer:
+    """Collects timed spans as Chrome trace events (viewable in Perfetto).
+
+    Timestamps are wall-clock microseconds so that spans recorded by the page
+    with ``performance.mark``/``measure`` line up with the host's.
+    """
+
+    def __init__(self, path=None):
+        self.path = os.path.abspath(path) if path else None
+        self._lock = threading.Lock()
+        self._events = []
+        self._thread_names = {}
+        self._clock_offset = time.time() - time.perf_counter()
+
+    @property
+    def enabled(self):
+        return self.path is not None
+
+    def now(self):
+        return (self._clock_offset + time.perf_counter()) * 1e6
+
+    def begin(self, name, category="host"):
+        if not self.enabled:
+            return None
+        return name, category, self.now()
+
+    def end(self, token, **args):
+        if token is None:
+            return
+        name, category, start = token
+        self._add_complete(name, category, start, self.now() - start, args)
+
+    @contextmanager
+    def span(self, name, category="host", **args):
+        if not self.enabled:
+            yield
+            return
+        start = self.now()
+        try:
+            yield
+        finally:
+            self._add_complete(name, category, start, self.now() - start, args)
+
+    def traced(self, name=None, category="host"):
+        def decorator(function):
+            if not self.enabled:
+                return function
+            label = name or function.__qualname__
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.span(label, category):
+                    return function(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def _add_complete(self, name, category, start, duration, args):
+        thread = threading.current_thread()
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": start,
+            "dur": duration,
+            "pid": HOST_PID,
+            "tid": thread.ident,
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            self._thread_names.setdefault(thread.ident, thread.name)
+            self._events.append(event)
+
+    def add_page_entries(self, time_origin, entries):
+        """Add ``performance`` marks and measures reported by the page."""
+        if not self.enabled:
+            return
+        events = []
+        for entry in entries:
+            try:
+                start = (float(time_origin) + float(entry["startTime"])) * 1000
+                duration = float(entry.get("duration") or 0) * 1000
+                name = str(entry["name"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            event = {"name": name, "cat": "page", "ts": start, "pid": PAGE_PID, "tid": 1}
+            if entry.get("entryType") == "measure":
+                event.update(ph="X", dur=duration)
+            else:
+                event.update(ph="i", s="t")
+            events.append(event)
+        with self._lock:
+            self._events.extend(events)
+
+    def write(self):
+        if not self.enabled:
+            return
+        with self._lock:
+            events = list(self._events)
+            thread_names = dict(self._thread_names)
+        metadata = [
+            {"name": "process_name", "ph": "M", "pid": HOST_PID, "args": {"name": "typhoon host"}},
+            {"name": "process_name", "ph": "M", "pid": PAGE_PID, "args": {"name": "typhoon page"}},
+            {"name": "thread_name", "ph": "M", "pid": PAGE_PID, "tid": 1, "args": {"name": "main"}},
+        ]
+        metadata.extend(
+            {"name": "thread_name", "ph": "M", "pid": HOST_PID, "tid": ident, "args": {"name": name}}
+            for ident, name in thread_names.items()
+        )
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump(
+                    {"traceEvents": metadata + events, "displayTimeUnit": "ms"}, file
+                )
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logger.warning("Could not write trace file %s: %s", self.path, e)
+
+
+# Configured on import so that the module-level imports of the app can be
+# traced before main() runs.
+tracer = Tracer(trace_path_from(sys.argv[1:], os.environ))
@@ -0,0 +1,570 @@
+import glob
+import json
+import logging
+import os
+import sys
+import threading
+from urllib.parse import unquote, urlparse
+
+from typhoon_lazy import load_dbus, load_gi, optional_module
+from typhoon_settings import IS_WINDOWS
+from typhoon_trace import tracer
+
+if IS_WINDOWS:
+    try:
+        import winreg
+    except Exception:
+        winreg = None
+else:
+    winreg = None
+
+try:
+    from PyQt6.QtCore import QFileSystemWatcher, QObject, QSize, Qt, QTimer, pyqtSignal
+    from PyQt6.QtGui import QImage, QImageReader
+
+    QT_ASPECT_IGNORE = Qt.AspectRatioMode.IgnoreAspectRatio
+    QT_ASPECT_KEEP = Qt.AspectRatioMode.KeepAspectRatio
+    QT_SMOOTH_TRANSFORM = Qt.TransformationMode.SmoothTransformation
+    QT_FORMAT_RGB32 = QImage.Format.Format_RGB32
+except ImportError:
+    from PyQt5.QtCore import QFileSystemWatcher, QObject, QSize, Qt, QTimer, pyqtSignal
+    from PyQt5.QtGui import QImage, QImageReader
+
+    QT_ASPECT_IGNORE = Qt.IgnoreAspectRatio
+    QT_ASPECT_KEEP = Qt.KeepAspectRatio
+    QT_SMOOTH_TRANSFORM = Qt.SmoothTransformation
+    QT_FORMAT_RGB32 = QImage.Format_RGB32
+
+logger = logging.getLogger(__name__)
+
+# Wallpapers are decoded at most this large; JPEGs are scaled while decoding.
+DECODE_SIZE = 64
+PALETTE_DECODE_SIZE = 128
+PALETTE_SIZE = 8
+# Median cut splits dominant colours over several boxes; boxes closer than
+# this (RGB distance) are merged back into one palette entry.
+PALETTE_MERGE_DISTANCE = 24
+# The page draws white text over the chameleonic background; keep at least
+# WCAG's large-text contrast against it.
+TEXT_COLOR = (255, 255, 255)
+MIN_BACKGROUND_CONTRAST = 3.0
+# Bumped when the cached palette format or extraction changes.
+CACHE_VERSION = 3
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".bmp")
+
+KDE_CONFIG_FILE = "~/.config/plasma-org.kde.plasma.desktop-appletsrc"
+PCMANFM_CONFIG_PATTERN = "~/.config/pcmanfm/*/desktop-items-*.conf"
+
+# gsettings keys holding the wallpaper, per desktop.
+WALLPAPER_GSETTINGS = {
+    "gnome": (
+        ("org.gnome.desktop.background", "picture-uri"),
+        ("org.gnome.desktop.background", "picture-uri-dark"),
+    ),
+    "cinnamon": (("org.cinnamon.desktop.background", "picture-uri"),),
+    "mate": (("org.mate.background", "picture-filename"),),
+}
+
+
+def _check_output(args):
+    # subprocess is only needed once a wallpaper lookup runs.
+    import subprocess
+
+    return subprocess.check_output(args, text=True)
+
+
+def _gsettings_get(schema, key):
+    return _check_output(["gsettings", "get", schema, key])
+
+
+def _file_uri_to_path(value):
+    return value.strip().strip("'").split("file://")[-1]
+
+
+def get_primary_monitor():
+    try:
+        xrandr_output = _check_output(["xrandr", "--current"])
+    except Exception:
+        return None
+    connected = [
+        line for line in xrandr_output.splitlines() if " connected" in line
+    ]
+    for line in connected:
+        if "primary" in line:
+            return line.split()[0]
+    return connected[0].split()[0] if connected else None
+
+
+def get_wallpaper_path():
+    if IS_WINDOWS:
+        return get_windows_wallpaper_path()
+
+    if os.environ.get("FLATPAK_ID") is not None or os.environ.get("SNAP") is not None:
+        raise RuntimeError("Flatpak or Snap detected, use xprop/accent fallback.")
+
+    de = os.environ.get("XDG_CURRENT_DESKTOP", "").lower()
+    wallpaper = None
+
+    if "gnome" in de:
+        wallpaper = _file_uri_to_path(
+            _gsettings_get("org.gnome.desktop.background", "picture-uri")
+        )
+    elif "cinnamon" in de:
+        wallpaper = _file_uri_to_path(
+            _gsettings_get("org.cinnamon.desktop.background", "picture-uri")
+        )
+    elif "mate" in de:
+        wallpaper = _file_uri_to_path(
+            _gsettings_get("org.mate.background", "picture-filename")
+        )
+    elif "xfce" in de:
+        primary_monitor = get_primary_monitor()
+        if not primary_monitor:
+            raise RuntimeError("Could not detect primary monitor for XFCE")
+        key = f"/backdrop/screen0/monitor{primary_monitor}/workspace0/last-image"
+        wallpaper = _check_output(["xfconf-query", "-c", "xfce4-desktop", "-p", key]).strip()
+    elif "kde" in de:
+        config_file = os.path.expanduser(KDE_CONFIG_FILE)
+        with open(config_file, "r", encoding="utf-8") as file:
+            for line in file:
+                if line.strip().startswith("Image="):
+                    wallpaper = line.strip().split("=", 1)[1]
+                    parsed = urlparse(wallpaper)
+                    if parsed.scheme == "file":
+                        wallpaper = unquote(parsed.path)
+                    if os.path.isdir(wallpaper):
+                        images_dir = wallpaper
+                        if os.path.basename(os.path.normpath(images_dir)) != "images":
+                            images_dir = os.path.join(wallpaper, "contents", "images")
+                        if os.path.isdir(images_dir):
+                            for candidate in os.listdir(images_dir):
+                                if candidate.lower().endswith(IMAGE_EXTENSIONS):
+                                    wallpaper = os.path.join(images_dir, candidate)
+                                    break
+                    break
+    elif "lxde" in de or "labwc:wlroots" in de:
+        import configparser
+
+        config_files = glob.glob(os.path.expanduser(PCMANFM_CONFIG_PATTERN))
+        primary_monitor = get_primary_monitor()
+        if primary_monitor:
+            config_files.sort(key=lambda path: 0 if primary_monitor in path else 1)
+        for config_file in config_files:
+            try:
+                config = configparser.ConfigParser()
+                config.read(config_file)
+                if config.has_option("*", "wallpaper"):
+                    wallpaper = config.get("*", "wallpaper")
+                    break
+            except Exception:
+                continue
+        if not wallpaper:
+            raise RuntimeError("Could not find wallpaper in PCManFM config")
+    else:
+        raise RuntimeError(f"Unsupported desktop environment: {de}")
+
+    parsed = urlparse(wallpaper)
+    if parsed.scheme == "file":
+        wallpaper = unquote(parsed.path)
+    logger.info("Wallpaper path: %s", wallpaper)
+    return wallpaper
+
+
+def get_windows_wallpaper_path():
+    if winreg is None:
+        raise RuntimeError("winreg module unavailable")
+    try:
+        with winreg.OpenKey(winreg.HKEY_CURRENT_USER, r"Control Panel\Desktop") as key:
+            wallpaper, _ = winreg.QueryValueEx(key, "WallPaper")
+    except Exception as e:
+        raise RuntimeError(f"Could not read Windows wallpaper path: {e}") from e
+
+    wallpaper = str(wallpaper).strip()
+    if not wallpaper:
+        raise RuntimeError("Windows wallpaper path is empty")
+    logger.info("Wallpaper path: %s", wallpaper)
+    return wallpaper
+
+
+def load_scaled_image(path, size=DECODE_SIZE):
+    """Decode ``path`` at no more than ``size`` pixels on its longer side."""
+    if path.lower().endswith(".svg"):
+        cairosvg = None if IS_WINDOWS else optional_module("cairosvg")
+        if not cairosvg:
+            return None
+        image = QImage()
+        image.loadFromData(
+            cairosvg.svg2png(url=path, output_width=size, output_height=size), "PNG"
+        )
+        return image
+
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    full_size = reader.size()
+    if full_size.isValid():
+        reader.setScaledSize(full_size.scaled(QSize(size, size), QT_ASPECT_KEEP))
+    image = reader.read()
+    if image.isNull():
+        logger.info("Could not decode wallpaper %s: %s", path, reader.errorString())
+    return image
+
+
+def extract_dominant_color(path):
+    """Mean colour of the wallpaper; used when NumPy is unavailable."""
+    image = load_scaled_image(path)
+    if image is None or image.isNull():
+        return None
+
+    tiny = image.scaled(1, 1, QT_ASPECT_IGNORE, QT_SMOOTH_TRANSFORM)
+    if tiny.isNull():
+        return None
+    color = tiny.pixelColor(0, 0)
+    return color.red(), color.green(), color.blue()
+
+
+def image_pixels(image):
+    """View an image's pixels as an (n, 3) RGB array without copying them."""
+    numpy = optional_module("numpy")
+    image = image.convertToFormat(QT_FORMAT_RGB32)
+    width, height = image.width(), image.height()
+    bits = image.constBits()
+    size = image.sizeInBytes() if hasattr(image, "sizeInBytes") else image.byteCount()
+    bits.setsize(size)
+    rows = numpy.frombuffer(bits, dtype=numpy.uint8).reshape(height, image.bytesPerLine())
+    # RGB32 is stored as 0xffRRGGBB words, i.e. B, G, R, A bytes on little-endian.
+    pixels = rows[:, : width * 4].reshape(height * width, 4)
+    rgb = pixels[:, 2::-1] if sys.byteorder == "little" else pixels[:, 1:4]
+    return rgb, image
+
+
+def median_cut(pixels, count=PALETTE_SIZE * 2):
+    """Split ``pixels`` into up to ``count`` boxes; return (colour, weight) pairs."""
+    numpy = optional_module("numpy")
+    boxes = [pixels]
+    while len(boxes) < count:
+        # Split the box with the widest channel range, weighted by its size.
+        scores = [
+            (int(numpy.ptp(box, axis=0).max()) * len(box), index)
+            for index, box in enumerate(boxes)
+            if len(box) > 1
+        ]
+        if not scores:
+            break
+        score, index = max(scores)
+        if score == 0:
+            break
+        box = boxes.pop(index)
+        channel = int(numpy.ptp(box, axis=0).argmax())
+        order = numpy.argsort(box[:, channel], kind="stable")
+        middle = len(box) // 2
+        boxes.append(box[order[:middle]])
+        boxes.append(box[order[middle:]])
+
+    total = len(pixels)
+    return [(box.mean(axis=0), len(box) / total) for box in boxes if len(box)]
+
+
+def merge_colors(colors, distance=PALETTE_MERGE_DISTANCE, limit=PALETTE_SIZE):
+    """Merge near-identical colours and rank the result by weight."""
+    numpy = optional_module("numpy")
+    merged = []
+    for color, weight in sorted(colors, key=lambda item: item[1], reverse=True):
+        for entry in merged:
+            if numpy.linalg.norm(entry[0] - color) < distance:
+                total = entry[1] + weight
+                entry[0] = (entry[0] * entry[1] + color * weight) / total
+                entry[1] = total
+                break
+        else:
+            merged.append([numpy.asarray(color, dtype=float), weight])
+    merged.sort(key=lambda entry: entry[1], reverse=True)
+    return [
+        (tuple(int(round(value)) for value in color), weight)
+        for color, weight in merged[:limit]
+    ]
+
+
+def relative_luminance(rgb):
+    def linear(value):
+        value /= 255
+        return value / 12.92 if value <= 0.03928 else ((value + 0.055) / 1.055) ** 2.4
+
+    r, g, b = (linear(float(value)) for value in rgb)
+    return 0.2126 * r + 0.7152 * g + 0.0722 * b
+
+
+def contrast_ratio(first, second):
+    lighter, darker = sorted(
+        (relative_luminance(first), relative_luminance(second)), reverse=True
+    )
+    return (lighter + 0.05) / (darker + 0.05)
+
+
+def _darken_until(rgb, against, ratio):
+    color = rgb
+    for _ in range(20):
+        if contrast_ratio(color, against) >= ratio:
+            break
+        color = tuple(int(value * 0.9) for value in color)
+    return color
+
+
+def to_hex(rgb):
+    return "#{:02x}{:02x}{:02x}".format(*rgb)
+
+
+def build_palette(colors):
+    """Pick a readable background colour from ranked ``(rgb, weight)`` pairs.
+
+    The background is the dominant colour, darkened until the page's white
+    text stays readable on it.
+    """
+    ranked = [rgb for rgb, _ in colors]
+    background = _darken_until(ranked[0], TEXT_COLOR, MIN_BACKGROUND_CONTRAST)
+    return {
+        "palette": [to_hex(rgb) for rgb in ranked],
+        "background": to_hex(background),
+    }
+
+
+def extract_palette(path):
+    """Ranked palette of the wallpaper at ``path`` with a contrast-checked background."""
+    if optional_module("numpy") is None:
+        mean = extract_dominant_color(path)
+        return build_palette([(mean, 1.0)]) if mean else None
+
+    image = load_scaled_image(path, PALETTE_DECODE_SIZE)
+    if image is None or image.isNull():
+        return None
+    pixels, image = image_pixels(image)
+    return build_palette(merge_colors(median_cut(pixels)))
+
+
+def get_xprop_color():
+    output = _check_output(["xprop", "-root"])
+    line = next(
+        (
+            ln
+            for ln in output.splitlines()
+            if "_GNOME_BACKGROUND_REPRESENTATIVE_COLORS" in ln
+        ),
+        None,
+    )
+    if not line:
+        raise RuntimeError("No representative colors found in xprop output")
+
+    rgb_string = line.split('"')[1].strip()
+    rgb_values = rgb_string[4:-1].split(",")
+    rgb = tuple(map(int, rgb_values))
+    return "#{:02x}{:02x}{:02x}".format(rgb[0], rgb[1], rgb[2])
+
+
+class WallpaperColorCache:
+    """Palettes extracted from wallpapers, keyed by path, mtime and size."""
+
+    def __init__(self, path, max_entries=16):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = None
+
+    def _load(self):
+        if self._entries is not None:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                self._entries = dict(json.load(file))
+        except FileNotFoundError:
+            self._entries = {}
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning("Could not read wallpaper colour cache: %s", e)
+            self._entries = {}
+
+    def _save(self):
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(self._entries, file, indent=1)
+        os.replace(temp_path, self.path)
+
+    def palette_for(self, wallpaper_path, extract=extract_palette):
+        stat = os.stat(wallpaper_path)
+        # Palettes made without NumPy are a plain mean; keep them apart.
+        version = CACHE_VERSION if optional_module("numpy") is not None else 1
+        key = [stat.st_mtime_ns, stat.st_size, version]
+        with self._lock:
+            self._load()
+            cached = self._entries.get(wallpaper_path)
+            if cached and cached.get("key") == key:
+                return cached.get("palette")
+
+        palette = extract(wallpaper_path)
+        if palette is None:
+            return None
+
+        with self._lock:
+            # Most recently extracted last, so the oldest are dropped first.
+            self._entries.pop(wallpaper_path, None)
+            self._entries[wallpaper_path] = {"key": key, "palette": palette}
+            while len(self._entries) > self.max_entries:
+                self._entries.pop(next(iter(self._entries)))
+            try:
+                self._save()
+            except OSError as e:
+                logger.warning("Could not save wallpaper colour cache: %s", e)
+        return palette
+
+
+@tracer.traced("detect wallpaper color")
+def detect_wallpaper_color(cache):
+    """Return the wallpaper-derived colour as ``#rrggbb``, or None.
+
+    Runs off the GUI thread: it may spawn desktop tools and decode images.
+    """
+    try:
+        wallpaper_path = get_wallpaper_path()
+        palette = cache.palette_for(wallpaper_path)
+        dominant_color = palette["background"] if palette else None
+        if dominant_color and dominant_color.startswith("#"):
+            logger.info(
+                "Extracted hex color from wallpaper: %s (palette %s)",
+                dominant_color,
+                " ".join(palette["palette"]),
+            )
+            return dominant_color
+        raise ValueError("Invalid color format from wallpaper method")
+    except Exception as e:
+        logger.info("Error determining color from wallpaper: %s", e)
+
+    if IS_WINDOWS:
+        return None
+
+    try:
+        hex_color = get_xprop_color()
+        logger.info("Extracted hex color from xprop: %s", hex_color)
+        return hex_color
+    except Exception as e:
+        logger.info("Falling back to accent color: %s", e)
+        return None
+
+
+def current_desktop():
+    return os.environ.get("XDG_CURRENT_DESKTOP", "").lower()
+
+
+class ThemeWatcher(QObject):
+    """Reports changes to the wallpaper or accent colour as they happen.
+
+    Listens to gsettings, the XDG portal and xfconf, and watches the KDE and
+    PCManFM config files read by get_wallpaper_path(). Bursts of changes are
+    coalesced into one ``changed`` emission.
+    """
+
+    changed = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._settings = []
+        self._config_files = []
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(300)
+        self._debounce.timeout.connect(self.changed)
+        self._file_watcher = QFileSystemWatcher(self)
+        self._file_watcher.fileChanged.connect(self._on_file_changed)
+        self._file_watcher.directoryChanged.connect(self._on_directory_changed)
+
+    def start(self):
+        if IS_WINDOWS:
+            return
+        self._watch_gsettings()
+        self._watch_dbus()
+        self._watch_config_files()
+
+    def _schedule(self, *_):
+        self._debounce.start()
+
+    def _watch_gsettings(self):
+        Gio = load_gi("Gio", "2.0")
+        if Gio is None:
+            return
+        try:
+            source = Gio.SettingsSchemaSource.get_default()
+            de = current_desktop()
+            for desktop, keys in WALLPAPER_GSETTINGS.items():
+                if desktop not in de:
+                    continue
+                for schema_id, key in keys:
+                    # Gio aborts on unknown schemas or keys, so check first.
+                    schema = source.lookup(schema_id, True) if source else None
+                    if schema is None or not schema.has_key(key):
+                        continue
+                    settings = Gio.Settings.new(schema_id)
+                    settings.connect(f"changed::{key}", self._schedule)
+                    # Gio only emits changed for keys that have been read.
+                    settings.get_value(key)
+                    self._settings.append(settings)
+        except Exception as e:
+            logger.warning("Could not watch gsettings for wallpaper changes: %s", e)
+
+    def _watch_dbus(self):
+        dbus = load_dbus()
+        if dbus is None:
+            return
+        try:
+            dbus.mainloop.glib.DBusGMainLoop(set_as_default=True)
+            bus = dbus.SessionBus()
+            bus.add_signal_receiver(
+                self._on_portal_setting_changed,
+                signal_name="SettingChanged",
+                dbus_interface="org.freedesktop.portal.Settings",
+                path="/org/freedesktop/portal/desktop",
+            )
+            if "xfce" in current_desktop():
+                bus.add_signal_receiver(
+                    self._on_xfconf_property_changed,
+                    signal_name="PropertyChanged",
+                    dbus_interface="org.xfce.Xfconf",
+                    path="/org/xfce/Xfconf",
+                )
+        except Exception as e:
+            logger.warning("Could not watch D-Bus for theme changes: %s", e)
+
+    def _on_portal_setting_changed(self, namespace, key, value):
+        if namespace == "org.freedesktop.appearance" and key == "accent-color":
+            self._schedule()
+
+    def _on_xfconf_property_changed(self, channel, prop, value):
+        if channel == "xfce4-desktop" and prop.endswith("/last-image"):
+            self._schedule()
+
+    def _watch_config_files(self):
+        de = current_desktop()
+        if "kde" in de:
+            self._config_files = [os.path.expanduser(KDE_CONFIG_FILE)]
+        elif "lxde" in de or "labwc:wlroots" in de:
+            self._config_files = glob.glob(os.path.expanduser(PCMANFM_CONFIG_PATTERN))
+        if not self._config_files:
+            return
+        # Config files are usually replaced rather than rewritten, which drops
+        # them from the watcher; their directories tell us when to re-add them.
+        directories = {os.path.dirname(path) for path in self._config_files}
+        self._file_watcher.addPaths(sorted(directories))
+        self._rewatch_config_files()
+
+    def _rewatch_config_files(self):
+        watched = set(self._file_watcher.files())
+        missing = [
+            path for path in self._config_files
+            if path not in watched and os.path.exists(path)
+        ]
+        if missing:
+            self._file_watcher.addPaths(missing)
+        return bool(missing)
+
+    def _on_file_changed(self, path):
+        self._rewatch_config_files()
+        self._schedule()
+
+    def _on_directory_changed(self, path):
+        if self._rewatch_config_files():
+            self._schedule()
@@ -1,26 +1,35 @@
 #!/usr/bin/python3
 
-import configparser
-import glob
+import hashlib
+import json
 import logging
 import os
 import signal
-import subprocess
 import sys
 import threading
-from urllib.parse import unquote, urlparse
-
-IS_WINDOWS = sys.platform.startswith("win")
-
-if not IS_WINDOWS:
-    try:
-        import dbus
-        import dbus.mainloop.glib
-        import dbus.service
-    except Exception:
-        dbus = None
-else:
-    dbus = None
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+from typhoon_fetch import DEFAULT_FORECAST_DAYS, FetchEngine
+from typhoon_instance import decode_message, forward_to_running_instance, instance_address
+from typhoon_lazy import load_dbus, load_gi
+from typhoon_registry import LocationRegistry
+from typhoon_scheduler import DEFAULT_REFRESH_MS, RefreshScheduler, SystemWatcher
+from typhoon_settings import IS_WINDOWS, SettingsStore, get_config_dir
+from typhoon_store import WeatherStore
+from typhoon_summary import (
+    current_conditions,
+    daily_forecast,
+    display_temperature,
+    hourly_forecast,
+    location_name,
+    notify_threshold,
+    tray_temperature,
+    weather_alert,
+)
+from typhoon_trace import tracer
+from typhoon_wallpaper import ThemeWatcher, WallpaperColorCache, detect_wallpaper_color
 
 if IS_WINDOWS:
     try:
@@ -35,55 +44,72 @@ else:
     ctypes = None
     winreg = None
 
+_import_span = tracer.begin("import PyQt and QtWebEngine", "startup")
 QT_MAJOR = 6
 try:
-    from PyQt6.QtCore import QEvent, QPoint, Qt, QTimer, QUrl
-    from PyQt6.QtGui import QColor, QDesktopServices, QFont, QIcon, QImage, QPainter, QPixmap
+    from PyQt6.QtCore import (
+        QBuffer,
+        QEvent,
+        QFile,
+        QIODevice,
+        QObject,
+        QPoint,
+        Qt,
+        QTimer,
+        QUrl,
+        QVariantAnimation,
+        pyqtProperty,
+        pyqtSignal,
+        pyqtSlot,
+    )
+    from PyQt6.QtGui import QColor, QDesktopServices, QFont, QFontMetrics, QIcon, QPainter, QPixmap
+    from PyQt6.QtNetwork import QLocalServer
     from PyQt6.QtWebEngineCore import (
         QWebEnginePage,
         QWebEngineProfile,
+        QWebEngineScript,
         QWebEngineSettings,
+        QWebEngineUrlRequestJob,
+        QWebEngineUrlScheme,
+        QWebEngineUrlSchemeHandler,
     )
+    from PyQt6.QtWebChannel import QWebChannel
     from PyQt6.QtWebEngineWidgets import QWebEngineView
     from PyQt6.QtWidgets import QApplication, QMenu, QStyle, QSystemTrayIcon, QWidget
 except ImportError:
     QT_MAJOR = 5
-    from PyQt5.QtCore import QEvent, QPoint, Qt, QTimer, QUrl
-    from PyQt5.QtGui import QColor, QDesktopServices, QFont, QIcon, QImage, QPainter, QPixmap
+    from PyQt5.QtCore import (
+        QBuffer,
+        QEvent,
+        QFile,
+        QIODevice,
+        QObject,
+        QPoint,
+        Qt,
+        QTimer,
+        QUrl,
+        QVariantAnimation,
+        pyqtProperty,
+        pyqtSignal,
+        pyqtSlot,
+    )
+    from PyQt5.QtGui import QColor, QDesktopServices, QFont, QFontMetrics, QIcon, QPainter, QPixmap
+    from PyQt5.QtNetwork import QLocalServer
+    from PyQt5.QtWebEngineCore import (
+        QWebEngineUrlRequestJob,
+        QWebEngineUrlScheme,
+        QWebEngineUrlSchemeHandler,
+    )
+    from PyQt5.QtWebChannel import QWebChannel
     from PyQt5.QtWebEngineWidgets import (
         QWebEnginePage,
         QWebEngineProfile,
+        QWebEngineScript,
         QWebEngineSettings,
         QWebEngineView,
     )
     from PyQt5.QtWidgets import QApplication, QMenu, QStyle, QSystemTrayIcon, QWidget
-
-cairosvg = None
-if not IS_WINDOWS:
-    try:
-        import importlib
-
-        cairosvg = importlib.import_module("cairosvg")
-    except Exception:
-        cairosvg = None
-
-if IS_WINDOWS:
-    Xdp = None
-    Unity = None
-else:
-    try:
-        import gi
-
-        gi.require_version("Xdp", "1.0")
-        from gi.repository import Xdp
-        try:
-            gi.require_version("Unity", "7.0")
-            from gi.repository import Unity
-        except Exception:
-            Unity = None
-    except Exception:
-        Xdp = None
-        Unity = None
+tracer.end(_import_span, qt_major=QT_MAJOR)
 
 
 logger = logging.getLogger(__name__)
@@ -93,13 +119,43 @@ LAUNCHER_DESKTOP_IDS = (
     "typhoon_typhoon.desktop",
 )
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(message)s",
+# Read-only access to the cached weather for shell extensions, lock screens
+# and scripts, exported next to the launcher entry.
+DBUS_NAME = "io.github.archisman_panigrahi.typhoon"
+DBUS_PATH = "/io/github/archisman_panigrahi/typhoon"
+WEATHER_INTERFACE = "io.github.archisman_panigrahi.typhoon.Weather"
+
+# Network requests from the page are served by the Python fetch engine
+# through this scheme, e.g. typhoon-api://weather/weather?location=Paris
+API_SCHEME = b"typhoon-api"
+
+# Page preferences mirrored to the host, and persisted in settings.json, so
+# the tray can be kept current while the web view is torn down.
+PAGE_PREFERENCE_KEYS = (
+    "locations",
+    "location",
+    "temperatureUnit",
+    "notificationsEnabled",
+    "notifyThreshold",
+    "refreshMs",
+    "forecastDays",
 )
+SETTINGS_WRITE_DELAY_MS = 1000
+
+# Snapshots of the last rendered frame, one per window size and theme.
+SNAPSHOT_LIMIT = 4
+SNAPSHOT_FADE_MS = 400
+# Reveal the live page even if it never renders weather (e.g. first run).
+SNAPSHOT_REVEAL_TIMEOUT_MS = 3000
+# Widgets without a saved position are cascaded from the main window.
+WIDGET_CASCADE_PX = 32
+# A hidden page is frozen at once and discarded after this long; settable as
+# "discardHiddenPageAfterMs" in settings.json (0 keeps it frozen).
+PAGE_DISCARD_DELAY_MS = 10 * 60 * 1000
 
 if QT_MAJOR == 6:
     QT_NAV_LINK_CLICKED = QWebEnginePage.NavigationType.NavigationTypeLinkClicked
+    QT_LIFECYCLE = QWebEnginePage.LifecycleState
     QT_CURSOR_BDIAG = Qt.CursorShape.SizeBDiagCursor
     QT_CURSOR_FDIAG = Qt.CursorShape.SizeFDiagCursor
     QT_CURSOR_HOR = Qt.CursorShape.SizeHorCursor
@@ -123,17 +179,29 @@ if QT_MAJOR == 6:
     QT_ATTR_LOCAL_TO_REMOTE = QWebEngineSettings.WebAttribute.LocalContentCanAccessRemoteUrls
     QT_ATTR_LOCAL_TO_FILE = QWebEngineSettings.WebAttribute.LocalContentCanAccessFileUrls
     QT_COOKIE_FORCE_PERSIST = QWebEngineProfile.PersistentCookiesPolicy.ForcePersistentCookies
-    QT_ASPECT_IGNORE = Qt.AspectRatioMode.IgnoreAspectRatio
-    QT_SMOOTH_TRANSFORM = Qt.TransformationMode.SmoothTransformation
     QT_TEXT_ANTIALIAS = QPainter.RenderHint.TextAntialiasing
     QT_WA_TRANSLUCENT_BG = Qt.WidgetAttribute.WA_TranslucentBackground
     QT_WA_ACCEPT_TOUCH = Qt.WidgetAttribute.WA_AcceptTouchEvents
+    QT_WA_TRANSPARENT_FOR_MOUSE = Qt.WidgetAttribute.WA_TransparentForMouseEvents
+    QT_SMOOTH_PIXMAP = QPainter.RenderHint.SmoothPixmapTransform
     QT_COLOR_TRANSPARENT = Qt.GlobalColor.transparent
     QT_TRAY_INFO = QSystemTrayIcon.MessageIcon.Information
     QT_TRAY_TRIGGER = QSystemTrayIcon.ActivationReason.Trigger
     QT_STYLE_INFO_ICON = QStyle.StandardPixmap.SP_MessageBoxInformation
+    QT_IODEVICE_READ_ONLY = QIODevice.OpenModeFlag.ReadOnly
+    QT_SCHEME_SYNTAX_HOST = QWebEngineUrlScheme.Syntax.Host
+    QT_SCHEME_FLAGS = (
+        QWebEngineUrlScheme.Flag.SecureScheme | QWebEngineUrlScheme.Flag.CorsEnabled
+    )
+    QT_JOB_REQUEST_FAILED = QWebEngineUrlRequestJob.Error.RequestFailed
+    QT_JOB_URL_INVALID = QWebEngineUrlRequestJob.Error.UrlInvalid
+    QT_SCRIPT_DOCUMENT_CREATION = QWebEngineScript.InjectionPoint.DocumentCreation
+    QT_SCRIPT_MAIN_WORLD = QWebEngineScript.ScriptWorldId.MainWorld
+    QT_LOCAL_USER_ACCESS = QLocalServer.SocketOption.UserAccessOption
 else:
     QT_NAV_LINK_CLICKED = QWebEnginePage.NavigationTypeLinkClicked
+    # Page lifecycle control needs Qt 5.14.
+    QT_LIFECYCLE = getattr(QWebEnginePage, "LifecycleState", None)
     QT_CURSOR_BDIAG = Qt.SizeBDiagCursor
     QT_CURSOR_FDIAG = Qt.SizeFDiagCursor
     QT_CURSOR_HOR = Qt.SizeHorCursor
@@ -157,15 +225,23 @@ else:
     QT_ATTR_LOCAL_TO_REMOTE = QWebEngineSettings.LocalContentCanAccessRemoteUrls
     QT_ATTR_LOCAL_TO_FILE = QWebEngineSettings.LocalContentCanAccessFileUrls
     QT_COOKIE_FORCE_PERSIST = QWebEngineProfile.ForcePersistentCookies
-    QT_ASPECT_IGNORE = Qt.IgnoreAspectRatio
-    QT_SMOOTH_TRANSFORM = Qt.SmoothTransformation
     QT_TEXT_ANTIALIAS = QPainter.TextAntialiasing
     QT_WA_TRANSLUCENT_BG = Qt.WA_TranslucentBackground
     QT_WA_ACCEPT_TOUCH = Qt.WA_AcceptTouchEvents
+    QT_WA_TRANSPARENT_FOR_MOUSE = Qt.WA_TransparentForMouseEvents
+    QT_SMOOTH_PIXMAP = QPainter.SmoothPixmapTransform
     QT_COLOR_TRANSPARENT = Qt.transparent
     QT_TRAY_INFO = QSystemTrayIcon.Information
     QT_TRAY_TRIGGER = QSystemTrayIcon.Trigger
     QT_STYLE_INFO_ICON = QStyle.SP_MessageBoxInformation
+    QT_IODEVICE_READ_ONLY = QIODevice.ReadOnly
+    QT_SCHEME_SYNTAX_HOST = QWebEngineUrlScheme.Syntax.Host
+    QT_SCHEME_FLAGS = QWebEngineUrlScheme.SecureScheme | QWebEngineUrlScheme.CorsEnabled
+    QT_JOB_REQUEST_FAILED = QWebEngineUrlRequestJob.RequestFailed
+    QT_JOB_URL_INVALID = QWebEngineUrlRequestJob.UrlInvalid
+    QT_SCRIPT_DOCUMENT_CREATION = QWebEngineScript.DocumentCreation
+    QT_SCRIPT_MAIN_WORLD = QWebEngineScript.MainWorld
+    QT_LOCAL_USER_ACCESS = QLocalServer.UserAccessOption
 
 
 def event_global_point(event):
@@ -228,22 +304,375 @@ class TyphoonWebPage(QWebEnginePage):
         return super().acceptNavigationRequest(url, nav_type, is_main_frame)
 
 
-if dbus is not None:
+def write_snapshot(image, path):
+    """Save a snapshot atomically and drop the oldest ones beyond the limit."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    temp_path = path + ".tmp"
+    if not image.save(temp_path, "PNG"):
+        logger.warning("Could not save snapshot %s", path)
+        return
+    os.replace(temp_path, path)
+
+    snapshots = sorted(
+        (
+            os.path.join(directory, name)
+            for name in os.listdir(directory)
+            if name.startswith("snapshot-") and name.endswith(".png")
+        ),
+        key=os.path.getmtime,
+        reverse=True,
+    )
+    for stale in snapshots[SNAPSHOT_LIMIT:]:
+        try:
+            os.remove(stale)
+        except OSError:
+            pass
+
+
+class SnapshotOverlay(QWidget):
+    """Last rendered frame, painted over the web view while it starts."""
+
+    def __init__(self, parent, pixmap):
+        super().__init__(parent)
+        self._pixmap = pixmap
+        self._opacity = 1.0
+        self._animation = None
+        self.setAttribute(QT_WA_TRANSPARENT_FOR_MOUSE, True)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setOpacity(self._opacity)
+        painter.setRenderHint(QT_SMOOTH_PIXMAP, True)
+        painter.drawPixmap(self.rect(), self._pixmap)
+        painter.end()
+
+    def fade_out(self, duration=SNAPSHOT_FADE_MS):
+        if self._animation is not None:
+            return
+        self._animation = QVariantAnimation(self)
+        self._animation.setStartValue(1.0)
+        self._animation.setEndValue(0.0)
+        self._animation.setDuration(duration)
+        self._animation.valueChanged.connect(self._set_opacity)
+        self._animation.finished.connect(self.deleteLater)
+        self._animation.start()
+
+    def _set_opacity(self, value):
+        self._opacity = float(value)
+        self.update()
+
+
+def register_api_scheme():
+    # Custom schemes must be registered before QApplication is created.
+    scheme = QWebEngineUrlScheme(API_SCHEME)
+    scheme.setSyntax(QT_SCHEME_SYNTAX_HOST)
+    scheme.setFlags(QT_SCHEME_FLAGS)
+    QWebEngineUrlScheme.registerScheme(scheme)
+
+
+class ApiSchemeHandler(QWebEngineUrlSchemeHandler):
+    # Emitted from fetch worker threads; delivered on the GUI thread.
+    _fetch_finished = pyqtSignal(int, object)
+
+    def __init__(self, engine, parent=None):
+        super().__init__(parent)
+        self._engine = engine
+        self._jobs = {}
+        self._spans = {}
+        self._next_job_id = 0
+        self._fetch_finished.connect(self._on_fetch_finished)
+
+    def requestStarted(self, job):
+        url = urlparse(bytes(job.requestUrl().toEncoded()).decode("ascii"))
+        if url.netloc != "weather":
+            job.fail(QT_JOB_URL_INVALID)
+            return
+
+        self._next_job_id += 1
+        job_id = self._next_job_id
+        self._jobs[job_id] = job
+        self._spans[job_id] = tracer.begin(f"typhoon-api {url.path}", "network")
+        job.destroyed.connect(lambda *_: self._jobs.pop(job_id, None))
+        future = self._engine.submit(
+            self._engine.handle, url.path, parse_qsl(url.query)
+        )
+        future.add_done_callback(
+            lambda done: self._fetch_finished.emit(job_id, done)
+        )
+
+    def _on_fetch_finished(self, job_id, future):
+        tracer.end(self._spans.pop(job_id, None))
+        job = self._jobs.pop(job_id, None)
+        if job is None:
+            # The page went away before the response arrived.
+            return
+        try:
+            body = future.result()
+        except Exception as e:
+            logger.warning("API request failed: %s", e)
+            job.fail(QT_JOB_REQUEST_FAILED)
+            return
+
+        buffer = QBuffer(job)
+        buffer.setData(body)
+        buffer.open(QT_IODEVICE_READ_ONLY)
+        job.reply(b"application/json", buffer)
+
+
+class TyphoonBridge(QObject):
+    """Page <-> host channel, exposed to the page as ``typhoonHost``."""
+
+    # Host -> page. Changes made during one event-loop turn are coalesced and
+    # emitted once; the full map is also readable through ``state``.
+    stateChanged = pyqtSignal("QVariantMap")
+
+    def __init__(self, window):
+        super().__init__(window)
+        self._window = window
+        self._state = {}
+        self._changed = {}
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(0)
+        self._flush_timer.timeout.connect(self._flush)
+
+    def _get_state(self):
+        return self._state
+
+    state = pyqtProperty("QVariantMap", fget=_get_state, notify=stateChanged)
+
+    def push(self, **changes):
+        for key, value in changes.items():
+            if key in self._state and self._state[key] == value:
+                continue
+            self._state[key] = value
+            self._changed[key] = value
+        if self._changed:
+            self._flush_timer.start()
+
+    def _flush(self):
+        changed, self._changed = self._changed, {}
+        if changed:
+            self.stateChanged.emit(changed)
+
+    @pyqtSlot("QVariantMap")
+    def updateState(self, state):
+        self._window._apply_page_state(state)
+
+    @pyqtSlot(str)
+    def notify(self, message):
+        if self._window._primary is None:
+            self._window._alert(message)
+
+    @pyqtSlot(str)
+    def windowAction(self, action):
+        self._window._handle_window_action(action)
+
+    @pyqtSlot(float, "QVariantList")
+    def trace(self, time_origin, entries):
+        tracer.add_page_entries(time_origin, entries)
+        tracer.write()
+
+    @pyqtSlot()
+    def refreshAccentColor(self):
+        self._window._detect_wallpaper_color()
+
+    @pyqtSlot()
+    def weatherFetched(self):
+        self._window._on_page_weather_fetched()
+
+    @pyqtSlot()
+    def rendered(self):
+        self._window._on_page_rendered()
+
+    @pyqtSlot(str)
+    def forgetLocation(self, location):
+        engine = self._window.fetch_engine
+        engine.submit(engine.forget, location)
+
+
+def create_dbus_service(window):
+    """Export the launcher entry and weather interface; None without dbus-python."""
+    dbus = load_dbus()
+    if dbus is None:
+        return None
+
     class Service(dbus.service.Object):
         def __init__(self):
             dbus.mainloop.glib.DBusGMainLoop(set_as_default=True)
-            bus_name = dbus.service.BusName(
-                "io.github.archisman_panigrahi.typhoon", dbus.SessionBus()
-            )
-            super().__init__(bus_name, "/io/github/archisman_panigrahi/typhoon")
+            bus_name = dbus.service.BusName(DBUS_NAME, dbus.SessionBus())
+            super().__init__(bus_name, DBUS_PATH)
 
         @dbus.service.signal(
             dbus_interface="com.canonical.Unity.LauncherEntry", signature="sa{sv}"
         )
         def Update(self, app_uri, properties):
             logger.info("Launcher update %s %s", app_uri, properties)
-else:
-    Service = None
+
+        # Each getter takes a saved location ("" for the one shown) and
+        # returns JSON, read from the cache without going to the network.
+        @dbus.service.method(WEATHER_INTERFACE, in_signature="s", out_signature="s")
+        def GetCurrent(self, location):
+            return self._cached("current", location)
+
+        @dbus.service.method(WEATHER_INTERFACE, in_signature="s", out_signature="s")
+        def GetHourly(self, location):
+            return self._cached("hourly", location)
+
+        @dbus.service.method(WEATHER_INTERFACE, in_signature="s", out_signature="s")
+        def GetDaily(self, location):
+            return self._cached("daily", location)
+
+        @dbus.service.method(WEATHER_INTERFACE, in_signature="", out_signature="b")
+        def Refresh(self):
+            return window.request_refresh()
+
+        @dbus.service.signal(dbus_interface=WEATHER_INTERFACE, signature="s")
+        def WeatherChanged(self, location):
+            pass
+
+        def _cached(self, kind, location):
+            weather = window.cached_weather(kind, location)
+            if weather is None:
+                raise dbus.DBusException(
+                    f"No weather cached for {location or 'the shown location'}",
+                    name=f"{DBUS_NAME}.Error.NoData",
+                )
+            return json.dumps(weather, ensure_ascii=False)
+
+    return Service()
+
+
+class InstanceServer(QObject):
+    """Receives the arguments of later launches (see typhoon_instance)."""
+
+    # Arguments and, if the launcher had one, its Wayland activation token.
+    activated = pyqtSignal(list, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._server = QLocalServer(self)
+        self._server.setSocketOptions(QT_LOCAL_USER_ACCESS)
+        self._server.newConnection.connect(self._on_new_connection)
+
+    def listen(self, replace_stale=False):
+        """Claim the instance address; False if another instance holds it."""
+        address = instance_address()
+        if replace_stale:
+            QLocalServer.removeServer(address)
+        if self._server.listen(address):
+            return True
+        if not replace_stale:
+            return False
+        logger.warning("Could not listen for other launches: %s", self._server.errorString())
+        return True
+
+    def _on_new_connection(self):
+        while self._server.hasPendingConnections():
+            connection = self._server.nextPendingConnection()
+            buffer = bytearray()
+
+            def on_ready_read(connection=connection, buffer=buffer):
+                buffer.extend(bytes(connection.readAll()))
+                if b"\n" in buffer:
+                    connection.disconnectFromServer()
+                    self._dispatch(bytes(buffer).split(b"\n", 1)[0])
+
+            connection.readyRead.connect(on_ready_read)
+            connection.disconnected.connect(connection.deleteLater)
+            if connection.bytesAvailable():
+                on_ready_read()
+
+    def _dispatch(self, data):
+        message = decode_message(data)
+        if message is None:
+            logger.warning("Ignoring a malformed message from another launch")
+            return
+        args = [str(arg) for arg in message.get("args", [])]
+        self.activated.emit(args, str(message.get("activationToken") or ""))
+
+
+# Logical sizes rendered into each tray icon; tray hosts pick the closest.
+TRAY_ICON_SIZES = (16, 22, 24, 32, 48, 64, 128)
+# Badge colours (background, text) per desktop theme.
+TRAY_BADGE_COLORS = {
+    "dark": (QColor(32, 32, 40, 225), QColor(255, 255, 255)),
+    "light": (QColor(250, 250, 250, 235), QColor(32, 32, 40)),
+}
+
+
+class TrayIconRenderer:
+    """Renders the temperature badge over the app icon at every tray size.
+
+    Pixmaps are cached by text, size, device pixel ratio and theme, so
+    switching back to a recent temperature or re-enabling the tray does not
+    paint anything.
+    """
+
+    def __init__(self, base_icon, max_entries=64):
+        self._base_icon = base_icon
+        self._max_entries = max_entries
+        self._pixmaps = OrderedDict()
+
+    def icon(self, text, device_pixel_ratio, theme):
+        icon = QIcon()
+        for size in TRAY_ICON_SIZES:
+            icon.addPixmap(self._pixmap(text, size, device_pixel_ratio, theme))
+        return icon
+
+    def _pixmap(self, text, size, device_pixel_ratio, theme):
+        key = (text, size, device_pixel_ratio, theme)
+        pixmap = self._pixmaps.get(key)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(key)
+            return pixmap
+
+        pixmap = self._render(text, size, device_pixel_ratio, theme)
+        self._pixmaps[key] = pixmap
+        if len(self._pixmaps) > self._max_entries:
+            self._pixmaps.popitem(last=False)
+        return pixmap
+
+    def _render(self, text, size, device_pixel_ratio, theme):
+        pixels = max(1, round(size * device_pixel_ratio))
+        pixmap = self._base_icon.pixmap(pixels, pixels)
+        if pixmap.isNull() or pixmap.width() != pixels:
+            canvas = QPixmap(pixels, pixels)
+            canvas.fill(QT_COLOR_TRANSPARENT)
+            if not pixmap.isNull():
+                painter = QPainter(canvas)
+                painter.drawPixmap(0, 0, pixels, pixels, pixmap)
+                painter.end()
+            pixmap = canvas
+
+        badge_color, text_color = TRAY_BADGE_COLORS.get(theme, TRAY_BADGE_COLORS["dark"])
+        scale = pixels / 64
+        if size < 32:
+            # Too small for the icon to stay recognisable under a badge;
+            # use the whole square so the temperature remains legible.
+            x, y, width, height, radius = 0, 0, pixels, pixels, 4 * scale
+        else:
+            x, y, width, height, radius = 1 * scale, 27 * scale, 62 * scale, 36 * scale, 9 * scale
+
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QT_TEXT_ANTIALIAS, True)
+        painter.setPen(text_color)
+        painter.setBrush(badge_color)
+        painter.drawRoundedRect(int(x), int(y), int(width), int(height), radius, radius)
+        font = QFont()
+        font.setBold(True)
+        # Largest font that fits the badge, starting from the original sizes.
+        pixel_size = max(1, round((23 if len(text) <= 4 else 19) * height / 36))
+        font.setPixelSize(pixel_size)
+        while pixel_size > 6 and QFontMetrics(font).horizontalAdvance(text) > width * 0.94:
+            pixel_size -= 1
+            font.setPixelSize(pixel_size)
+        painter.setFont(font)
+        painter.drawText(int(x), int(y), int(width), int(height), QT_ALIGN_CENTER, text)
+        painter.end()
+        pixmap.setDevicePixelRatio(device_pixel_ratio)
+        return pixmap
 
 
 class ResizeHandle(QWidget):
@@ -327,7 +756,18 @@ class ResizeHandle(QWidget):
 
 
 class TyphoonWindow(QWidget):
-    def __init__(self):
+    # Emitted from fetch worker threads with the finished future.
+    _weather_ready = pyqtSignal(object)
+    _wallpaper_color_ready = pyqtSignal(object)
+
+    def __init__(
+        self,
+        low_memory_tray=False,
+        settings=None,
+        primary=None,
+        widget_location=None,
+        widget_mode=False,
+    ):
         super().__init__()
         self.aspect_ratio = 3 / 5
         self.drag_enabled = True
@@ -344,16 +784,61 @@ class TyphoonWindow(QWidget):
         self._tray_enabled = False
         self._tray_temperature = None
         self._rendered_tray_temperature = None
-
+        self._tray_icon_renderer = None
+        self._low_memory_tray = low_memory_tray
+        self._launcher_visible = False
+        # Whether this run has shown a weather alert; the first one skips
+        # the throttle, as the page used to do once per session.
+        self._alerted_this_run = False
+        self._weather_revision = 0
+        self.webview = None
+        self.web_profile = None
+        self._snapshot_overlay = None
+        self._page_loaded = False
+        self._page_rendered = False
+        # In widget mode each window is pinned to one saved location. The
+        # first window owns everything the widgets share: settings, fetch
+        # engine, refresh scheduler, web profile, tray and launcher.
+        self._primary = primary
+        self._widget_mode = widget_mode
+        self._widget_location = widget_location
+        self._widgets = []
+        self._shared_profile = None
+        self._profile_users = 0
+
+        if primary is None:
+            self._setup_settings(settings)
+            self._setup_refresh_scheduler()
+            if widget_mode:
+                # The main window shows the first saved location.
+                self._widget_location = next(iter(self._saved_locations()), None)
+        else:
+            self._share_services(primary)
         self._initialize_window()
         # Windows notifications use QSystemTrayIcon as their backend, so it
         # must remain present for the entire lifetime of the application.
-        if IS_WINDOWS:
+        if IS_WINDOWS and primary is None:
             self._setup_notification_tray()
+        if primary is None:
+            self._setup_fetch_engine()
+        self._setup_theme_watcher()
+        self.bridge = TyphoonBridge(self)
+        # Asks the page to report its performance marks and measures.
+        self.bridge.push(traceEnabled=tracer.enabled)
+        if primary is None:
+            self._setup_system_watcher()
+        else:
+            self.bridge.push(online=primary._system_watcher.online)
+        self.bridge.push(weatherOverdueAfterMs=self.refresh_scheduler.overdue_after_ms())
         self._setup_webview()
-        self._setup_dbus_launcher()
+        # Filled in by start_platform_integration() once the window is up.
+        self.launchers = []
+        self.dbus_service = None
         self._restore_size_and_position()
         self._set_size_constraints()
+        self._setup_snapshots()
+        self._setup_page_lifecycle()
+        self._show_snapshot()
         QApplication.instance().installEventFilter(self)
 
     def _clamp(self, value, min_value, max_value):
@@ -428,23 +913,37 @@ class TyphoonWindow(QWidget):
         if os.path.exists(icon_path):
             self.setWindowIcon(QIcon(icon_path))
 
+    @tracer.traced(category="startup")
+    def _setup_fetch_engine(self):
+        config_dir = get_config_dir()
+        self.fetch_engine = FetchEngine(
+            LocationRegistry(os.path.join(config_dir, "locations.json")),
+            WeatherStore(os.path.join(config_dir, "weather.sqlite3")),
+        )
+        # Time the first refresh from the age of the cached weather.
+        location = self._page_preferences.get("location")
+        cached = self.fetch_engine.store.get(location) if location else None
+        if cached is not None:
+            self.refresh_scheduler.restore(*cached)
+
+    def _setup_theme_watcher(self):
+        self._wallpaper_color_ready.connect(self._on_wallpaper_color)
+        if self._primary is not None:
+            self._wallpaper_color_cache = self._primary._wallpaper_color_cache
+            return
+        self._wallpaper_color_cache = WallpaperColorCache(
+            os.path.join(get_config_dir(), "wallpaper_colors.json")
+        )
+        self._theme_watcher = ThemeWatcher(self)
+        self._theme_watcher.changed.connect(self._on_theme_changed)
+
+    @tracer.traced(category="startup")
     def _setup_webview(self):
         self.webview = QWebEngineView(self)
         self.webview.setAttribute(QT_WA_TRANSLUCENT_BG, True)
         self.webview.setAttribute(QT_WA_ACCEPT_TOUCH, True)
         self.webview.setStyleSheet("background: transparent;")
-        profile_root = os.path.join(self._get_config_dir(), "qtwebengine")
-        os.makedirs(profile_root, exist_ok=True)
-        # Use a named profile to ensure persistence across runs
-        # The profile name should remain consistent for localStorage to persist
-        self.web_profile = QWebEngineProfile("persistent", self)
-        self.web_profile.setPersistentStoragePath(
-            os.path.join(profile_root, "storage")
-        )
-        self.web_profile.setCachePath(os.path.join(profile_root, "cache"))
-        self.web_profile.setPersistentCookiesPolicy(
-            QT_COOKIE_FORCE_PERSIST
-        )
+        self.web_profile = self._acquire_web_profile()
 
         self.webview.setPage(TyphoonWebPage(self.web_profile, self.webview))
         self.webview.page().setBackgroundColor(QT_COLOR_TRANSPARENT)
@@ -455,23 +954,413 @@ class TyphoonWindow(QWidget):
         settings.setAttribute(QT_ATTR_LOCAL_STORAGE, True)
         settings.setAttribute(QT_ATTR_LOCAL_TO_REMOTE, True)
         settings.setAttribute(QT_ATTR_LOCAL_TO_FILE, True)
-        self.webview.page().profile().setHttpUserAgent(
-            "Typhoon Weather App (https://github.com/archisman-panigrahi/typhoon)"
-        )
 
-        self.webview.titleChanged.connect(self._handle_title_change)
+        self._setup_web_channel()
+        self.webview.loadStarted.connect(self._on_load_started)
         self.webview.loadFinished.connect(self._on_load_finished)
 
-        html_path = app_resource_path("typhoon.html")
-        self.webview.setUrl(QUrl.fromLocalFile(html_path))
+        url = QUrl.fromLocalFile(app_resource_path("typhoon.html"))
+        query = {}
+        if self._widget_location:
+            query["widget"] = self._widget_location
+        if self._primary is not None:
+            # Weather alerts come from the main window only.
+            query["alerts"] = "0"
+        if query:
+            url.setQuery(urlencode(query))
+        self.webview.setUrl(url)
+
+    def _acquire_web_profile(self):
+        """Return the profile shared by all windows, creating it if needed."""
+        owner = self._primary or self
+        if owner._shared_profile is None:
+            profile_root = os.path.join(get_config_dir(), "qtwebengine")
+            os.makedirs(profile_root, exist_ok=True)
+            # Use a named profile to ensure persistence across runs
+            # The profile name should remain consistent for localStorage to persist
+            profile = QWebEngineProfile("persistent", owner)
+            profile.setPersistentStoragePath(os.path.join(profile_root, "storage"))
+            profile.setCachePath(os.path.join(profile_root, "cache"))
+            profile.setPersistentCookiesPolicy(QT_COOKIE_FORCE_PERSIST)
+            profile.setHttpUserAgent(
+                "Typhoon Weather App (https://github.com/archisman-panigrahi/typhoon)"
+            )
+            owner._api_handler = ApiSchemeHandler(owner.fetch_engine, profile)
+            profile.installUrlSchemeHandler(API_SCHEME, owner._api_handler)
+            owner._shared_profile = profile
+        owner._profile_users += 1
+        return owner._shared_profile
+
+    def _release_web_profile(self):
+        owner = self._primary or self
+        owner._profile_users -= 1
+        if owner._profile_users == 0:
+            owner._shared_profile.deleteLater()
+            owner._shared_profile = None
+
+    def _setup_web_channel(self):
+        self.web_channel = QWebChannel(self.webview.page())
+        self.web_channel.registerObject("typhoonHost", self.bridge)
+        self.webview.page().setWebChannel(self.web_channel)
+
+        # Make qwebchannel.js available before script.js runs.
+        source = QFile(":/qtwebchannel/qwebchannel.js")
+        if not source.open(QT_IODEVICE_READ_ONLY):
+            logger.error("Could not load qwebchannel.js; the page cannot reach the host")
+            return
+        script = QWebEngineScript()
+        script.setName("qwebchannel")
+        script.setSourceCode(bytes(source.readAll()).decode("utf-8"))
+        source.close()
+        script.setInjectionPoint(QT_SCRIPT_DOCUMENT_CREATION)
+        script.setWorldId(QT_SCRIPT_MAIN_WORLD)
+        script.setRunsOnSubFrames(False)
+        self.webview.page().scripts().insert(script)
+
+    def _release_webview(self):
+        """Destroy the web view and profile so Chromium's renderer and GPU processes exit."""
+        if self.webview is None:
+            return
+        logger.info("Releasing web view")
+        webview = self.webview
+        self.webview = None
+        self.web_profile = None
+        self.drag_enabled = True
+        webview.hide()
+        # The page is a child of the view; both must go before the profile,
+        # which is released once no other window uses it.
+        webview.deleteLater()
+        self._release_web_profile()
+
+    def _restore_webview(self):
+        if self.webview is not None:
+            return
+        logger.info("Rebuilding web view")
+        self._setup_webview()
+        self.webview.setGeometry(0, 0, self.width(), self.height())
+        self.webview.show()
+        self._show_snapshot()
+        self._update_resize_handles()
+
+    def _setup_page_lifecycle(self):
+        self._discard_timer = QTimer(self)
+        self._discard_timer.setSingleShot(True)
+        self._discard_timer.timeout.connect(self._discard_page)
+
+    def _page_is_live(self):
+        """Whether the page runs and keeps the tray and alerts current itself."""
+        if self.webview is None:
+            return False
+        if QT_LIFECYCLE is None:
+            return True
+        return self.webview.page().lifecycleState() == QT_LIFECYCLE.Active
+
+    def _update_page_lifecycle(self):
+        if self.webview is None or QT_LIFECYCLE is None:
+            return
+        page = self.webview.page()
+        if not self.isVisible() or self.isMinimized():
+            if page.lifecycleState() != QT_LIFECYCLE.Active:
+                return
+            # A visible page cannot be frozen; a minimized view still counts
+            # as visible to WebEngine.
+            page.setVisible(False)
+            page.setLifecycleState(QT_LIFECYCLE.Frozen)
+            logger.info("Froze the hidden page")
+            try:
+                delay = int(self.settings.get("discardHiddenPageAfterMs", PAGE_DISCARD_DELAY_MS))
+            except (TypeError, ValueError):
+                delay = PAGE_DISCARD_DELAY_MS
+            if delay > 0:
+                self._discard_timer.start(delay)
+            return
+
+        self._discard_timer.stop()
+        state = page.lifecycleState()
+        if state == QT_LIFECYCLE.Active:
+            return
+        if state == QT_LIFECYCLE.Discarded:
+            # Activating a discarded page reloads it.
+            self._show_snapshot()
+        page.setLifecycleState(QT_LIFECYCLE.Active)
+        page.setVisible(True)
+        logger.info("Reactivated the page")
+        self.refresh_scheduler.refresh_if_stale()
+
+    def _discard_page(self):
+        if self.webview is None or (self.isVisible() and not self.isMinimized()):
+            return
+        page = self.webview.page()
+        if page.lifecycleState() == QT_LIFECYCLE.Frozen:
+            page.setLifecycleState(QT_LIFECYCLE.Discarded)
+            logger.info("Discarded the hidden page")
+
+    def _setup_snapshots(self):
+        self._snapshot_dir = os.path.join(get_config_dir(), "snapshots")
+        if self._widget_location:
+            digest = hashlib.sha1(self._widget_location.encode("utf-8")).hexdigest()
+            self._snapshot_dir = os.path.join(self._snapshot_dir, digest[:12])
+        # Wait for the page's fade-in animations before capturing a frame.
+        self._snapshot_timer = QTimer(self)
+        self._snapshot_timer.setSingleShot(True)
+        self._snapshot_timer.setInterval(1000)
+        self._snapshot_timer.timeout.connect(self._save_snapshot)
+        self._reveal_timer = QTimer(self)
+        self._reveal_timer.setSingleShot(True)
+        self._reveal_timer.setInterval(SNAPSHOT_REVEAL_TIMEOUT_MS)
+        self._reveal_timer.timeout.connect(self._reveal_webview)
+
+    def _desktop_theme(self):
+        color = QApplication.palette().window().color()
+        return "dark" if color.lightness() < 128 else "light"
+
+    def _snapshot_path(self):
+        name = "snapshot-{}x{}@{:g}-{}.png".format(
+            self.width(),
+            self.height(),
+            self.devicePixelRatioF(),
+            self._desktop_theme(),
+        )
+        return os.path.join(self._snapshot_dir, name)
+
+    @tracer.traced(category="startup")
+    def _show_snapshot(self):
+        path = self._snapshot_path()
+        if self._snapshot_overlay is not None or not os.path.exists(path):
+            return
+        pixmap = QPixmap(path)
+        if pixmap.isNull():
+            return
+        pixmap.setDevicePixelRatio(self.devicePixelRatioF())
+        self._snapshot_overlay = SnapshotOverlay(self, pixmap)
+        self._snapshot_overlay.destroyed.connect(self._on_snapshot_overlay_destroyed)
+        self._snapshot_overlay.setGeometry(0, 0, self.width(), self.height())
+        self._snapshot_overlay.show()
+        self._update_resize_handles()
+
+    def _on_snapshot_overlay_destroyed(self, *_):
+        self._snapshot_overlay = None
+
+    def _reveal_webview(self):
+        self._reveal_timer.stop()
+        if self._snapshot_overlay is not None:
+            self._snapshot_overlay.fade_out()
+
+    def _on_page_rendered(self):
+        self._page_rendered = True
+        if self._page_loaded:
+            self._reveal_webview()
+        self._snapshot_timer.start()
 
+    @tracer.traced()
+    def _save_snapshot(self):
+        if self.webview is None or not self.isVisible() or self.isMinimized():
+            return
+        image = self.webview.grab().toImage()
+        if image.isNull():
+            return
+        self.fetch_engine.submit(write_snapshot, image, self._snapshot_path())
+
+    def _setup_refresh_scheduler(self):
+        self.refresh_scheduler = RefreshScheduler(self, self._refresh_base_ms())
+        self.refresh_scheduler.due.connect(self._refresh_weather)
+        self._weather_ready.connect(self._on_weather_refreshed)
+        self.refresh_scheduler.overdue_after_changed.connect(self._on_overdue_after_changed)
+
+    @tracer.traced(category="startup")
+    def _setup_system_watcher(self):
+        self._system_watcher = SystemWatcher(self)
+        self._system_watcher.sleeping_changed.connect(self.refresh_scheduler.set_sleeping)
+        self._system_watcher.online_changed.connect(self._on_online_changed)
+        self._system_watcher.on_battery_changed.connect(self.refresh_scheduler.set_on_battery)
+
+    def start_platform_integration(self):
+        """Connect to D-Bus, gsettings and the launcher; called after show()."""
+        if self._primary is not None:
+            return
+        with tracer.span("platform integration", "startup"):
+            self._system_watcher.start()
+            self._theme_watcher.start()
+            self._setup_dbus_launcher()
+        if self._launcher_visible:
+            self._toggle_unity_launcher(True)
+
+    def _on_online_changed(self, online):
+        # The page skips its own fetches while offline instead of failing.
+        for window in self._windows():
+            window.bridge.push(online=online)
+        self.refresh_scheduler.set_online(online)
+
+    def _on_overdue_after_changed(self, overdue_after_ms):
+        for window in self._windows():
+            window.bridge.push(weatherOverdueAfterMs=overdue_after_ms)
+
+    def _refresh_base_ms(self):
+        try:
+            return int(self._page_preferences.get("refreshMs") or DEFAULT_REFRESH_MS)
+        except (TypeError, ValueError):
+            return DEFAULT_REFRESH_MS
+
+    def _windows(self):
+        """This window and its widgets, or all windows of the primary."""
+        owner = self._primary or self
+        return [owner] + owner._widgets
+
+    def _weather_shown(self):
+        """Whether anything currently displays the weather."""
+        if not self._page_preferences.get("location"):
+            return False
+        window_shown = any(
+            window.isVisible() and not window.isMinimized() for window in self._windows()
+        )
+        return window_shown or self._tray_enabled or self._launcher_visible
+
+    def _update_refresh_activity(self):
+        owner = self._primary or self
+        self.refresh_scheduler.set_active(owner._weather_shown())
+
+    def _refresh_weather(self):
+        location = self._page_preferences.get("location")
+        if not location:
+            self.refresh_scheduler.succeeded(None)
+            return
+        queries = [location]
+        if any(window.webview is not None for window in self._windows()):
+            # Keep the other saved locations warm so switching stays instant,
+            # and refresh every widget with the same request.
+            queries += [
+                query for query in self._page_preferences.get("locations") or []
+                if query and query != location
+            ]
+        days = self._page_preferences.get("forecastDays") or DEFAULT_FORECAST_DAYS
+        future = self.fetch_engine.submit(self.fetch_engine.weather, queries, False, days)
+        future.add_done_callback(self._weather_ready.emit)
+
+    def _on_weather_refreshed(self, future):
+        try:
+            locations = future.result()["locations"]
+        except Exception as e:
+            logger.warning("Weather refresh failed: %s", e)
+            self.refresh_scheduler.failed()
+            return
+        entry = locations[0]["entry"] if locations else None
+        if not entry:
+            self.refresh_scheduler.failed()
+            return
+        self.refresh_scheduler.succeeded(entry)
+        self._emit_weather_changed([item["query"] for item in locations if item["entry"]])
+
+        # Pages redraw from the updated cache once they run again.
+        self._weather_revision += 1
+        for window in self._windows():
+            if window.webview is not None:
+                window.bridge.push(weatherRevision=self._weather_revision)
+        if self._page_is_live():
+            # Drawing also updates the tray icon, launcher count and alerts.
+            return
+
+        preferences = self._page_preferences
+        unit = preferences.get("temperatureUnit") or "f"
+        temperature = entry["currentWeather"].get("temperature")
+        if temperature is not None:
+            if self._tray_enabled:
+                self._tray_temperature = tray_temperature(temperature, unit)
+                self._update_tray_icon()
+            if self._launcher_visible:
+                self._update_unity_count(display_temperature(temperature, unit))
+
+        self._alert(weather_alert(entry, notify_threshold(preferences)))
+
+    def _on_page_weather_fetched(self):
+        self.refresh_scheduler.postpone()
+        location = self._widget_location or self._page_preferences.get("location")
+        if location:
+            (self._primary or self)._emit_weather_changed([location])
+
+    def _emit_weather_changed(self, queries):
+        if self.dbus_service is None:
+            return
+        for query in queries:
+            try:
+                self.dbus_service.WeatherChanged(query)
+            except Exception as e:
+                logger.warning("Could not signal new weather for %s: %s", query, e)
+
+    def cached_weather(self, kind, location=""):
+        """Return "current", "hourly" or "daily" weather from the cache, or None."""
+        query = location or self._page_preferences.get("location")
+        cached = self.fetch_engine.store.get(query) if query else None
+        if cached is None:
+            return None
+        entry, fetched_at = cached
+        unit = self._page_preferences.get("temperatureUnit") or "f"
+        if kind == "current":
+            fresh = self.fetch_engine.store.is_fresh(query)
+            return current_conditions(
+                query, entry, fetched_at, fresh, unit, notify_threshold(self._page_preferences)
+            )
+        forecast = {
+            "query": query,
+            "location": location_name(entry.get("locationData")),
+            "updated": int(fetched_at),
+        }
+        if kind == "hourly":
+            forecast.update(hourly_forecast(entry, unit))
+        else:
+            forecast["unit"] = unit.upper()
+            forecast["days"] = daily_forecast(entry, unit)
+        return forecast
+
+    def request_refresh(self):
+        """Refresh for a D-Bus client, joining the scheduler's own refreshes."""
+        if not self._page_preferences.get("location"):
+            return False
+        return self.refresh_scheduler.request_refresh()
+
+    def _hide_to_tray(self):
+        self.hide()
+        if self._low_memory_tray and self._tray_enabled:
+            self._release_webview()
+
+    def _show_from_tray(self):
+        self._restore_webview()
+        if self.isMinimized():
+            self.showNormal()
+        else:
+            self.show()
+
+    def activate_from_launch(self, args, activation_token):
+        """Bring the window forward when Typhoon is launched again.
+
+        The flags of the new launch apply to this instance: ``--widgets``
+        enters widget mode and ``--low-memory`` the low-memory tray mode.
+        Widgets closed since are opened again.
+        """
+        logger.info("Activated by another launch %s", args)
+        if activation_token and not IS_WINDOWS:
+            # Qt's Wayland backend uses and then clears this on activation.
+            os.environ["XDG_ACTIVATION_TOKEN"] = activation_token
+        if "--low-memory" in args:
+            self._low_memory_tray = True
+        if "--widgets" in args:
+            self._widget_mode = True
+        self.sync_widgets()
+        for widget in self._widgets:
+            widget.show()
+            widget.raise_()
+        self._show_from_tray()
+        self.raise_()
+        self.activateWindow()
+
+    @tracer.traced(category="startup")
     def _setup_dbus_launcher(self):
         self.launchers = []
-        self.launcher_service = None
+        self.dbus_service = None
 
-        if dbus is None or Service is None:
+        if load_dbus() is None:
             return
 
+        Unity = load_gi("Unity", "7.0")
         if Unity is not None:
             for desktop_id in LAUNCHER_DESKTOP_IDS:
                 try:
@@ -486,13 +1375,13 @@ class TyphoonWindow(QWidget):
                     )
 
         try:
-            self.launcher_service = Service()
+            self.dbus_service = create_dbus_service(self)
         except Exception as e:
-            logger.warning("Could not initialize launcher D-Bus service: %s", e)
+            logger.warning("Could not initialize the D-Bus service: %s", e)
             return
         for desktop_id in LAUNCHER_DESKTOP_IDS:
             try:
-                self.launcher_service.Update(f"application://{desktop_id}", {})
+                self.dbus_service.Update(f"application://{desktop_id}", {})
             except Exception as e:
                 logger.warning(
                     "Could not initialize launcher D-Bus state for %s: %s",
@@ -559,23 +1448,20 @@ class TyphoonWindow(QWidget):
             # The setting is meaningful on Linux. Windows requires its tray
             # icon for notifications, so attempts to turn it off are ignored.
             self._setup_notification_tray()
-            if not enabled and hasattr(self, "webview"):
-                self.webview.page().runJavaScript(
-                    "if (window.setSystemTrayEnabled) setSystemTrayEnabled(true);"
-                )
+            self.bridge.push(trayEnabled=True)
             return
 
         if enabled:
-            if self._setup_notification_tray():
-                return
-            self.webview.page().runJavaScript(
-                "if (window.setSystemTrayAvailable) setSystemTrayAvailable(false);"
-            )
+            # Reports False back to the page when the desktop has no tray.
+            self.bridge.push(trayEnabled=self._setup_notification_tray())
+            self._update_refresh_activity()
             return
 
         if self._tray_enabled and self._notification_tray is not None:
             self._notification_tray.hide()
         self._tray_enabled = False
+        self.bridge.push(trayEnabled=False)
+        self._update_refresh_activity()
 
     def _update_tray_icon(self, force=False):
         if self._notification_tray is None or not self._tray_enabled:
@@ -590,25 +1476,18 @@ class TyphoonWindow(QWidget):
 
         # Keep Typhoon recognizable and paint the temperature as a badge over
         # the lower part of its normal application icon.
-        base_icon = self.windowIcon()
-        if base_icon.isNull():
-            base_icon = QApplication.style().standardIcon(QT_STYLE_INFO_ICON)
-        pixmap = base_icon.pixmap(64, 64)
-        if pixmap.isNull():
-            pixmap = QPixmap(64, 64)
-            pixmap.fill(QT_COLOR_TRANSPARENT)
-        painter = QPainter(pixmap)
-        painter.setRenderHint(QT_TEXT_ANTIALIAS, True)
-        painter.setPen(QT_COLOR_WHITE)
-        painter.setBrush(QColor(32, 32, 40, 225))
-        painter.drawRoundedRect(1, 27, 62, 36, 9, 9)
-        font = QFont()
-        font.setBold(True)
-        font.setPixelSize(23 if len(self._tray_temperature) <= 4 else 19)
-        painter.setFont(font)
-        painter.drawText(1, 27, 62, 36, QT_ALIGN_CENTER, self._tray_temperature)
-        painter.end()
-        self._notification_tray.setIcon(QIcon(pixmap))
+        if self._tray_icon_renderer is None:
+            base_icon = self.windowIcon()
+            if base_icon.isNull():
+                base_icon = QApplication.style().standardIcon(QT_STYLE_INFO_ICON)
+            self._tray_icon_renderer = TrayIconRenderer(base_icon)
+        screen = QApplication.primaryScreen()
+        icon = self._tray_icon_renderer.icon(
+            self._tray_temperature,
+            screen.devicePixelRatio() if screen else 1.0,
+            self._desktop_theme(),
+        )
+        self._notification_tray.setIcon(icon)
         self._notification_tray.setToolTip("Typhoon: " + self._tray_temperature)
         self._rendered_tray_temperature = self._tray_temperature
 
@@ -637,21 +1516,20 @@ class TyphoonWindow(QWidget):
 
     def _toggle_window_visibility(self):
         if self.isVisible() and not self.isMinimized():
-            self.hide()
-        elif self.isMinimized():
-            self.showNormal()
+            self._hide_to_tray()
         else:
-            self.show()
+            self._show_from_tray()
         if self.isVisible():
             self.raise_()
             self.activateWindow()
 
     def _quit_from_tray(self):
-        self._toggle_unity_launcher("disable_launcher")
+        self._toggle_unity_launcher(False)
         app = QApplication.instance()
         if app is not None:
             app.quit()
 
+    @tracer.traced(category="startup")
     def _restore_size_and_position(self):
         last_width, last_height = self._get_last_window_size()
         self.resize(last_width, last_height)
@@ -679,75 +1557,51 @@ class TyphoonWindow(QWidget):
         self.setMinimumSize(210, 350)
         self.setMaximumSize(int(screen_height * 0.9 * 3 / 5), int(screen_height * 0.9))
 
+    def _on_load_started(self):
+        # Hover state does not survive a reload.
+        self.drag_enabled = True
+        self._page_loaded = False
+        self._page_rendered = False
+
+    @tracer.traced(category="startup")
     def _on_load_finished(self, ok):
+        self._page_loaded = True
+        if self._page_rendered or not ok:
+            self._reveal_webview()
+        else:
+            self._reveal_timer.start()
         if not ok:
             logger.error("Failed to load local UI")
             return
 
-        try:
-            wallpaper_path = self.get_wallpaper_path()
-            dominant_color = self._extract_dominant_color(wallpaper_path)
-            if dominant_color and dominant_color.startswith("#"):
-                logger.info("Extracted hex color from wallpaper: %s", dominant_color)
-                self.send_message_to_webview(f"'{dominant_color[1:]}'")
-                return
-            raise ValueError("Invalid color format from wallpaper method")
-        except Exception as e:
-            logger.info("Error determining color from wallpaper: %s", e)
+        self._detect_wallpaper_color()
 
-        if IS_WINDOWS:
-            self._get_accent_color()
-            return
+    def _detect_wallpaper_color(self):
+        # Wallpaper lookup spawns desktop tools and decodes the image, so it
+        # runs on a worker thread; see typhoon_wallpaper.py.
+        future = self.fetch_engine.submit(
+            detect_wallpaper_color, self._wallpaper_color_cache
+        )
+        future.add_done_callback(self._wallpaper_color_ready.emit)
 
+    def _on_theme_changed(self):
+        logger.info("Wallpaper or accent colour changed")
+        for window in self._windows():
+            window._detect_wallpaper_color()
+        self._update_tray_icon(force=True)
+
+    def _on_wallpaper_color(self, future):
         try:
-            output = subprocess.check_output(["xprop", "-root"], text=True)
-            line = next(
-                (
-                    ln
-                    for ln in output.splitlines()
-                    if "_GNOME_BACKGROUND_REPRESENTATIVE_COLORS" in ln
-                ),
-                None,
-            )
-            if not line:
-                raise RuntimeError("No representative colors found in xprop output")
-
-            rgb_string = line.split('"')[1].strip()
-            rgb_values = rgb_string[4:-1].split(",")
-            rgb = tuple(map(int, rgb_values))
-            hex_color = "{:02x}{:02x}{:02x}".format(rgb[0], rgb[1], rgb[2])
-            logger.info("Extracted hex color from xprop: #%s", hex_color)
-            self.send_message_to_webview(f"'{hex_color}'")
+            hex_color = future.result()
         except Exception as e:
-            logger.info("Falling back to accent color: %s", e)
-            self._get_accent_color()
-
-    def _extract_dominant_color(self, wallpaper_path):
-        image = QImage()
-        if wallpaper_path.lower().endswith(".svg"):
-            if not cairosvg:
-                return None
-            png_bytes = cairosvg.svg2png(
-                url=wallpaper_path, output_width=16, output_height=16
-            )
-            image.loadFromData(png_bytes, "PNG")
+            logger.info("Error determining color from wallpaper: %s", e)
+            hex_color = None
+        if hex_color:
+            self._send_accent_color(hex_color[1:])
         else:
-            image = QImage(wallpaper_path)
-
-        if image.isNull():
-            return None
-
-        tiny = image.scaled(
-            1,
-            1,
-            QT_ASPECT_IGNORE,
-            QT_SMOOTH_TRANSFORM,
-        )
-        if tiny.isNull():
-            return None
-        color = tiny.pixelColor(0, 0)
-        return "#{:02x}{:02x}{:02x}".format(color.red(), color.green(), color.blue())
+            self._get_accent_color()
 
+    @tracer.traced(category="startup")
     def _get_accent_color(self):
         logger.info("Getting system accent color")
         if IS_WINDOWS:
@@ -757,6 +1611,7 @@ class TyphoonWindow(QWidget):
         hex_color = "575591"
         used_source = None
 
+        Xdp = load_gi("Xdp", "1.0")
         if Xdp is not None:
             try:
                 portal = Xdp.Portal()
@@ -775,7 +1630,8 @@ class TyphoonWindow(QWidget):
             except Exception as e:
                 logger.warning("libportal accent lookup failed: %s", e)
 
-        if used_source is None:
+        dbus = load_dbus()
+        if used_source is None and dbus is not None:
             try:
                 bus = dbus.SessionBus()
                 obj = bus.get_object(
@@ -801,7 +1657,7 @@ class TyphoonWindow(QWidget):
         else:
             logger.warning("Accent color not found, using default '#%s'", hex_color)
 
-        self.send_message_to_webview(f"'{hex_color}'")
+        self._send_accent_color(hex_color)
 
     def _registry_read_dword(self, path, name):
         if winreg is None:
@@ -852,13 +1708,13 @@ class TyphoonWindow(QWidget):
             used_source = "qt-palette"
 
         logger.info("Accent color found via %s: '#%s'", used_source, hex_color)
-        self.send_message_to_webview(f"'{hex_color}'")
+        self._send_accent_color(hex_color)
 
-    def send_message_to_webview(self, message):
-        js_code = f"receiveMessage({message});"
-        self.webview.page().runJavaScript(js_code)
+    def _send_accent_color(self, hex_color):
+        self.bridge.push(accentColor=hex_color)
 
     def _send_dbus_notification(self, message):
+        dbus = load_dbus()
         if dbus is None:
             logger.info("D-Bus unavailable; skipping Linux notification backend")
             return
@@ -898,103 +1754,117 @@ class TyphoonWindow(QWidget):
             message,
         )
 
-    def _handle_title_change(self, title):
-        if not title:
-            return
-
-        logger.info("%s", title)
-
-        if title.startswith("notify:"):
-            message = title[len("notify:"):] or "Weather alert"
-            if IS_WINDOWS:
-                if not self._send_qt_notification(message):
-                    self._send_windows_notification(message)
-            else:
-                threading.Thread(
-                    target=self._send_dbus_notification, args=(message,), daemon=True
-                ).start()
-            return
+    def _alert(self, message):
+        """Show a weather alert unless one was shown within the refresh interval.
 
-        if title.startswith("height="):
-            try:
-                height = int(title.split("=")[1])
-                width = int(0.6 * height)
-                self.resize(width, height)
-            except ValueError:
-                logger.warning("Invalid height value in title: %s", title)
+        Alerts proposed by the page and by the host's own refreshes meet
+        here, and the time of the last one is kept in settings.json, so an
+        alert is not repeated when a frozen or discarded page comes back.
+        """
+        if not message or not self._page_preferences.get("notificationsEnabled", True):
             return
-
-        if title == "enable_tray":
-            self._set_tray_enabled(True)
+        now = time.time()
+        try:
+            last = float(self.settings.get("lastNotifyTime") or 0)
+        except (TypeError, ValueError):
+            last = 0
+        interval = self.refresh_scheduler.base_ms / 1000
+        if self._alerted_this_run and now - last < interval:
             return
-        if title == "disable_tray":
-            self._set_tray_enabled(False)
+        self._alerted_this_run = True
+        self.settings.set("lastNotifyTime", now)
+        self._notify(message)
+
+    def _notify(self, message):
+        if self._primary is not None:
+            # Sent through the main window, which owns the tray icon.
+            self._primary._notify(message)
             return
-        if title.startswith("tray_temperature="):
-            self._tray_temperature = title.split("=", 1)[1][:8]
+        message = message or "Weather alert"
+        logger.info("Notification: %s", message)
+        if IS_WINDOWS:
+            if not self._send_qt_notification(message):
+                self._send_windows_notification(message)
+        else:
+            threading.Thread(
+                target=self._send_dbus_notification, args=(message,), daemon=True
+            ).start()
+
+    def _apply_page_state(self, state):
+        logger.debug("Page state: %s", state)
+        preferences = {key: state[key] for key in PAGE_PREFERENCE_KEYS if key in state}
+        if self._primary is not None:
+            # The tray, launcher and alerts follow the main window's location;
+            # shared settings changed in a widget still apply everywhere.
+            preferences.pop("location", None)
+            state = {
+                key: value for key, value in state.items()
+                if key not in ("trayEnabled", "launcherVisible", "launcherCount", "trayTemperature")
+            }
+        if preferences:
+            self._page_preferences.update(preferences)
+            self.settings.set("page", self._page_preferences)
+            if "refreshMs" in preferences:
+                self.refresh_scheduler.set_base_interval(self._refresh_base_ms())
+            if "locations" in preferences:
+                (self._primary or self).sync_widgets()
+        # Launcher visibility must be applied before a count sent with it.
+        if "trayEnabled" in state:
+            self._set_tray_enabled(bool(state["trayEnabled"]))
+        if "launcherVisible" in state:
+            self._toggle_unity_launcher(bool(state["launcherVisible"]))
+        if "launcherCount" in state:
+            self._update_unity_count(state["launcherCount"])
+        if "trayTemperature" in state:
+            self._tray_temperature = str(state["trayTemperature"] or "")[:8]
             self._update_tray_icon()
-            return
-
-        if title == "close":
+        if "opacity" in state:
+            self._set_opacity(state["opacity"])
+        if "dragEnabled" in state:
+            self.drag_enabled = bool(state["dragEnabled"])
+        self._update_refresh_activity()
+
+    def _handle_window_action(self, action):
+        logger.info("%s", action)
+        if action == "close" and self._primary is not None:
+            self.close()
+        elif action == "close":
             if not IS_WINDOWS and self._tray_enabled:
-                self.hide()
+                self._hide_to_tray()
             else:
-                self._toggle_unity_launcher("disable_launcher")
+                self._toggle_unity_launcher(False)
                 self.close()
-        elif title == "minimize":
+        elif action == "minimize":
             self.showMinimized()
-        elif title == "disabledrag":
-            self.drag_enabled = False
-        elif title == "enabledrag":
-            self.drag_enabled = True
-        elif title.startswith("o"):
-            self._set_opacity_from_title(title)
-        elif title == "reset":
-            self._toggle_unity_launcher("disable_launcher")
+        elif action == "reset":
+            self._toggle_unity_launcher(False)
             self.resize(300, 500)
-        elif title in ["enable_launcher", "disable_launcher"]:
-            self._toggle_unity_launcher(title)
-        elif title.lstrip("-").isdigit():
-            self._update_unity_count(title)
 
-    def _set_opacity_from_title(self, title):
+    def _set_opacity(self, value):
         try:
-            opacity = self._clamp(float(title[1:]), 0.1, 1.0)
-            if self._prefer_per_pixel_alpha:
-                self._set_webview_alpha(opacity)
-            else:
-                self.setWindowOpacity(opacity)
-        except ValueError:
-            pass
-
-    def _set_webview_alpha(self, opacity):
-        js_code = (
-            "(function(){"
-            f"var o={opacity:.3f};"
-            "if (window.setWindowAlpha) {"
-            "window.setWindowAlpha(o);"
-            "} else {"
-            "document.documentElement.style.setProperty('--window-alpha', o);"
-            "}"
-            "})();"
-        )
-        self.webview.page().runJavaScript(js_code)
-
-    def _toggle_unity_launcher(self, title):
-        visible = title == "enable_launcher"
+            opacity = self._clamp(float(value), 0.1, 1.0)
+        except (TypeError, ValueError):
+            return
+        if self._prefer_per_pixel_alpha:
+            self.bridge.push(windowAlpha=round(opacity, 3))
+        else:
+            self.setWindowOpacity(opacity)
 
+    def _toggle_unity_launcher(self, visible):
+        self._launcher_visible = visible
+        self._update_refresh_activity()
         for launcher_entry in getattr(self, "launchers", []):
             try:
                 launcher_entry.set_property("count_visible", visible)
             except Exception as e:
                 logger.warning("Failed to toggle Unity launcher visibility: %s", e)
 
-        if not self.launcher_service:
+        if not self.dbus_service:
             return
 
         for desktop_id in LAUNCHER_DESKTOP_IDS:
             try:
-                self.launcher_service.Update(
+                self.dbus_service.Update(
                     f"application://{desktop_id}",
                     {"count-visible": visible},
                 )
@@ -1005,10 +1875,10 @@ class TyphoonWindow(QWidget):
                     e,
                 )
 
-    def _update_unity_count(self, title):
+    def _update_unity_count(self, value):
         try:
-            count = int(title)
-        except ValueError:
+            count = int(value)
+        except (TypeError, ValueError):
             return
 
         for launcher_entry in getattr(self, "launchers", []):
@@ -1017,13 +1887,14 @@ class TyphoonWindow(QWidget):
             except Exception as e:
                 logger.warning("Failed to update Unity launcher count: %s", e)
 
-        if not self.launcher_service:
+        if not self.dbus_service:
             return
 
+        dbus = load_dbus()
         count_payload = dbus.Int64(count) if dbus is not None else count
         for desktop_id in LAUNCHER_DESKTOP_IDS:
             try:
-                self.launcher_service.Update(
+                self.dbus_service.Update(
                     f"application://{desktop_id}",
                     {"count": count_payload},
                 )
@@ -1034,169 +1905,105 @@ class TyphoonWindow(QWidget):
                     e,
                 )
 
-    def _get_config_dir(self):
-        if IS_WINDOWS:
-            config_dir = os.getenv("APPDATA", os.path.expanduser("~"))
-        else:
-            config_dir = os.getenv("XDG_CONFIG_HOME", os.path.expanduser("~/.config"))
-        app_config_dir = os.path.join(config_dir, "io.github.archisman_panigrahi.typhoon")
-        os.makedirs(app_config_dir, exist_ok=True)
-        return app_config_dir
+    def _saved_geometry(self):
+        if self._primary is None:
+            return self.settings.get("window", {})
+        return self.settings.get("widgets", {}).get(self._widget_location, {})
+
+    def _save_geometry(self, **values):
+        if self._primary is None:
+            self.settings.update("window", **values)
+            return
+        # Widgets are keyed by location, so they keep their place when
+        # locations are reordered.
+        widgets = self.settings.get("widgets", {})
+        widgets.setdefault(self._widget_location, {}).update(values)
+        self.settings.set("widgets", widgets)
 
     def _get_last_window_size(self):
-        config_file = os.path.join(self._get_config_dir(), "typhoon_size_qt.conf")
+        window = self._saved_geometry()
         try:
-            with open(config_file, "r", encoding="utf-8") as file:
-                size = file.read().strip().split("x")
-                width, height = int(size[0]), int(size[1])
-                return width, height
-        except (FileNotFoundError, ValueError):
+            return int(window["width"]), int(window["height"])
+        except (KeyError, TypeError, ValueError):
             return 300, 500
 
     def _save_window_size(self, width, height):
-        config_file = os.path.join(self._get_config_dir(), "typhoon_size_qt.conf")
-        with open(config_file, "w", encoding="utf-8") as file:
-            file.write(f"{width}x{height}")
+        self._save_geometry(width=width, height=height)
 
     def _get_last_window_position(self):
-        config_file = os.path.join(self._get_config_dir(), "typhoon_position_qt.conf")
+        window = self._saved_geometry()
         try:
-            with open(config_file, "r", encoding="utf-8") as file:
-                position = file.read().strip().split(",")
-                x, y = int(position[0]), int(position[1])
-                return x, y
-        except (FileNotFoundError, ValueError):
+            return int(window["x"]), int(window["y"])
+        except (KeyError, TypeError, ValueError):
             return None
 
     def _save_window_position(self):
-        config_file = os.path.join(self._get_config_dir(), "typhoon_position_qt.conf")
-        with open(config_file, "w", encoding="utf-8") as file:
-            file.write(f"{self.x()},{self.y()}")
-
-    def _get_primary_monitor(self):
-        try:
-            xrandr_output = subprocess.check_output(
-                "xrandr --current | grep -w connected", shell=True, text=True
-            )
-            primary_monitor = None
-            for line in xrandr_output.splitlines():
-                if "primary" in line:
-                    primary_monitor = line.split()[0]
-                    break
-            if not primary_monitor and xrandr_output.splitlines():
-                primary_monitor = xrandr_output.splitlines()[0].split()[0]
-            return primary_monitor
-        except Exception:
-            return None
-
-    def get_wallpaper_path(self):
-        if IS_WINDOWS:
-            return self._get_windows_wallpaper_path()
-
-        if os.environ.get("FLATPAK_ID") is not None or os.environ.get("SNAP") is not None:
-            raise RuntimeError("Flatpak or Snap detected, use xprop/accent fallback.")
-
-        de = os.environ.get("XDG_CURRENT_DESKTOP", "").lower()
-        wallpaper = None
-
-        if "gnome" in de:
-            command = "gsettings get org.gnome.desktop.background picture-uri"
-            wallpaper = (
-                subprocess.check_output(command, shell=True)
-                .decode()
-                .strip()
-                .strip("'")
-                .split("file://")[-1]
-            )
-        elif "cinnamon" in de:
-            command = "gsettings get org.cinnamon.desktop.background picture-uri"
-            wallpaper = (
-                subprocess.check_output(command, shell=True)
-                .decode()
-                .strip()
-                .strip("'")
-                .split("file://")[-1]
-            )
-        elif "mate" in de:
-            command = "gsettings get org.mate.background picture-filename"
-            wallpaper = (
-                subprocess.check_output(command, shell=True)
-                .decode()
-                .strip()
-                .strip("'")
-                .split("file://")[-1]
-            )
-        elif "xfce" in de:
-            primary_monitor = self._get_primary_monitor()
-            if not primary_monitor:
-                raise RuntimeError("Could not detect primary monitor for XFCE")
-            key = f"/backdrop/screen0/monitor{primary_monitor}/workspace0/last-image"
-            wallpaper = subprocess.check_output(
-                ["xfconf-query", "-c", "xfce4-desktop", "-p", key], text=True
-            ).strip()
-        elif "kde" in de:
-            config_file = os.path.expanduser(
-                "~/.config/plasma-org.kde.plasma.desktop-appletsrc"
-            )
-            with open(config_file, "r", encoding="utf-8") as file:
-                for line in file:
-                    if line.strip().startswith("Image="):
-                        wallpaper = line.strip().split("=", 1)[1]
-                        parsed = urlparse(wallpaper)
-                        if parsed.scheme == "file":
-                            wallpaper = unquote(parsed.path)
-                        if os.path.isdir(wallpaper):
-                            images_dir = wallpaper
-                            if os.path.basename(os.path.normpath(images_dir)) != "images":
-                                images_dir = os.path.join(wallpaper, "contents", "images")
-                            if os.path.isdir(images_dir):
-                                for candidate in os.listdir(images_dir):
-                                    if candidate.lower().endswith((".jpg", ".jpeg", ".png", ".webp", ".bmp")):
-                                        wallpaper = os.path.join(images_dir, candidate)
-                                        break
-                        break
-        elif "lxde" in de or "labwc:wlroots" in de:
-            config_pattern = os.path.expanduser(
-                "~/.config/pcmanfm/*/desktop-items-*.conf"
-            )
-            config_files = glob.glob(config_pattern)
-            primary_monitor = self._get_primary_monitor()
-            if primary_monitor:
-                config_files.sort(key=lambda path: 0 if primary_monitor in path else 1)
-            for config_file in config_files:
-                try:
-                    config = configparser.ConfigParser()
-                    config.read(config_file)
-                    if config.has_option("*", "wallpaper"):
-                        wallpaper = config.get("*", "wallpaper")
-                        break
-                except Exception:
-                    continue
-            if not wallpaper:
-                raise RuntimeError("Could not find wallpaper in PCManFM config")
-        else:
-            raise RuntimeError(f"Unsupported desktop environment: {de}")
-
-        parsed = urlparse(wallpaper)
-        if parsed.scheme == "file":
-            wallpaper = unquote(parsed.path)
-        logger.info("Wallpaper path: %s", wallpaper)
-        return wallpaper
-
-    def _get_windows_wallpaper_path(self):
-        if winreg is None:
-            raise RuntimeError("winreg module unavailable")
-        try:
-            with winreg.OpenKey(winreg.HKEY_CURRENT_USER, r"Control Panel\Desktop") as key:
-                wallpaper, _ = winreg.QueryValueEx(key, "WallPaper")
-        except Exception as e:
-            raise RuntimeError(f"Could not read Windows wallpaper path: {e}") from e
-
-        wallpaper = str(wallpaper).strip()
-        if not wallpaper:
-            raise RuntimeError("Windows wallpaper path is empty")
-        logger.info("Wallpaper path: %s", wallpaper)
-        return wallpaper
+        self._save_geometry(x=self.x(), y=self.y())
+
+    def _share_services(self, primary):
+        self.settings = primary.settings
+        self._settings_timer = primary._settings_timer
+        self._page_preferences = primary._page_preferences
+        self.refresh_scheduler = primary.refresh_scheduler
+        self.fetch_engine = primary.fetch_engine
+
+    def _saved_locations(self):
+        return [
+            query for query in dict.fromkeys(self._page_preferences.get("locations") or [])
+            if query
+        ]
+
+    def sync_widgets(self):
+        """Open a widget per other saved location and close removed ones."""
+        if not self._widget_mode:
+            return
+        locations = self._saved_locations()
+        if self._widget_location not in locations:
+            # E.g. the first location was only just added, or the main
+            # window's location was removed.
+            self._widget_location = locations[0] if locations else None
+            self.bridge.push(widgetLocation=self._widget_location or "")
+        locations = [query for query in locations if query != self._widget_location]
+        for widget in list(self._widgets):
+            if widget._widget_location not in locations:
+                # closeEvent() forgets and releases it.
+                widget.close()
+        shown = {widget._widget_location for widget in self._widgets}
+        for query in locations:
+            if query in shown:
+                continue
+            logger.info("Opening widget for %s", query)
+            widget = TyphoonWindow(primary=self, widget_location=query)
+            self._widgets.append(widget)
+            if widget._get_last_window_position() is None:
+                offset = WIDGET_CASCADE_PX * len(self._widgets)
+                widget.move(self.x() + offset, self.y() + offset)
+            widget.show()
+        self._update_refresh_activity()
+
+    def _forget_widget(self, widget):
+        if widget not in self._widgets:
+            return
+        logger.info("Closing widget for %s", widget._widget_location)
+        self._widgets.remove(widget)
+        widget._release_webview()
+        widget.deleteLater()
+        self._update_refresh_activity()
+
+    def _setup_settings(self, settings=None):
+        self.settings = settings or SettingsStore(os.path.join(get_config_dir(), "settings.json"))
+        # Geometry changes arrive continuously during a drag or resize; they
+        # are only written once things have been quiet for a moment.
+        self._settings_timer = QTimer(self)
+        self._settings_timer.setSingleShot(True)
+        self._settings_timer.setInterval(SETTINGS_WRITE_DELAY_MS)
+        self._settings_timer.timeout.connect(self.settings.flush)
+        self.settings.on_change = self._settings_timer.start
+        self._page_preferences = self.settings.get("page", {})
+
+    def flush_settings(self):
+        self._settings_timer.stop()
+        self.settings.flush()
 
     def _start_window_drag(self):
         window = self.windowHandle()
@@ -1221,6 +2028,8 @@ class TyphoonWindow(QWidget):
         return os.environ.get("XDG_SESSION_TYPE", "").lower() == "wayland"
 
     def _event_from_webview(self, obj):
+        if self.webview is None:
+            return False
         if obj is self.webview:
             return True
         if not isinstance(obj, QWidget):
@@ -1321,7 +2130,10 @@ class TyphoonWindow(QWidget):
                 return
 
         super().resizeEvent(event)
-        self.webview.setGeometry(0, 0, self.width(), self.height())
+        if self.webview is not None:
+            self.webview.setGeometry(0, 0, self.width(), self.height())
+        if self._snapshot_overlay is not None:
+            self._snapshot_overlay.setGeometry(0, 0, self.width(), self.height())
         self._update_resize_handles()
 
         self._save_window_size(self.width(), self.height())
@@ -1330,13 +2142,43 @@ class TyphoonWindow(QWidget):
         super().moveEvent(event)
         self._save_window_position()
 
+    def closeEvent(self, event):
+        super().closeEvent(event)
+        if not event.isAccepted():
+            return
+        if self._primary is not None:
+            self._primary._forget_widget(self)
+            return
+        # The main window owns the scheduler, fetch engine and instance
+        # server, so closing it (rather than hiding it to the tray) closes
+        # the widgets too and Typhoon quits.
+        for widget in list(self._widgets):
+            widget.close()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._update_page_lifecycle()
+        self._update_refresh_activity()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._update_page_lifecycle()
+        self._update_refresh_activity()
+
     def changeEvent(self, event):
         super().changeEvent(event)
-        if event.type() == QT_EVENT_WINDOW_STATE_CHANGE and self.isMaximized():
-            self.showNormal()
+        if event.type() == QT_EVENT_WINDOW_STATE_CHANGE:
+            if self.isMaximized():
+                self.showNormal()
+            self._update_page_lifecycle()
+            self._update_refresh_activity()
 
 
 def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(message)s",
+    )
     if IS_WINDOWS and ctypes is not None:
         try:
             ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID(
@@ -1345,6 +2187,18 @@ def main():
         except Exception:
             pass
 
+    settings = SettingsStore(os.path.join(get_config_dir(), "settings.json"))
+    # Widget mode shows one window per saved location in this process; the
+    # first location goes to the main window.
+    widget_mode = "--widgets" in sys.argv[1:] or bool(settings.get("widgetMode", False))
+    if widget_mode:
+        # Lets the widgets' pages share one renderer process.
+        flags = os.environ.get("QTWEBENGINE_CHROMIUM_FLAGS", "").split()
+        if "--process-per-site" not in flags:
+            os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] = " ".join(flags + ["--process-per-site"])
+
+    register_api_scheme()
+    startup_span = tracer.begin("QApplication", "startup")
     app = QApplication(sys.argv)
     app.setOrganizationDomain("io.github.archisman_panigrahi")
     app.setOrganizationName("io.github.archisman_panigrahi")
@@ -1352,8 +2206,32 @@ def main():
     app.setQuitOnLastWindowClosed(True)
     if hasattr(app, "setDesktopFileName") and not IS_WINDOWS:
         app.setDesktopFileName("io.github.archisman_panigrahi.typhoon")
-    window = TyphoonWindow()
-    window.show()
+    # typhoon_main hands off to a running instance before Qt is loaded; this
+    # covers two launches racing each other and running this file directly.
+    instance_server = InstanceServer()
+    if not instance_server.listen():
+        if forward_to_running_instance(sys.argv[1:]):
+            sys.exit(0)
+        instance_server.listen(replace_stale=True)
+    tracer.end(startup_span)
+    with tracer.span("TyphoonWindow", "startup"):
+        window = TyphoonWindow(
+            # Hiding to the tray tears down the web engine; a Python refresher
+            # keeps the tray icon and alerts current until it is shown again.
+            low_memory_tray="--low-memory" in sys.argv[1:],
+            settings=settings,
+            widget_mode=widget_mode,
+        )
+    with tracer.span("show window", "startup"):
+        window.show()
+    window.sync_widgets()
+    # D-Bus, PyGObject and the wallpaper watchers are loaded only now, so
+    # they don't delay the first frame.
+    QTimer.singleShot(0, window.start_platform_integration)
+    instance_server.activated.connect(window.activate_from_launch)
+    app.aboutToQuit.connect(window.flush_settings)
+    app.aboutToQuit.connect(window.fetch_engine.shutdown)
+    app.aboutToQuit.connect(tracer.write)
 
     # Let Python process SIGINT while Qt owns the event loop, then use Qt's
     # normal shutdown path so WebEngine and other application objects clean up.